@@ -1,7 +1,7 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, File, UploadFile, HTTPException, WebSocket, WebSocketDisconnect, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from typing import Optional, Tuple, Dict, List
+from fastapi.responses import JSONResponse, StreamingResponse, Response
+from typing import Optional, Tuple, Dict, List, Callable, Union
 import logging
 import os
 import tempfile
@@ -11,24 +11,79 @@ import json
 import struct
 import numpy as np
 import asyncio
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
 
 # Utils import
-from utils.audio import convert_to_wav
+from utils.audio import convert_to_wav, StreamingDecoder
 from utils.arabic_norm import normalize_ar
 from utils.quran_index import (
     get_verses, 
-    match_verses,
-    get_surah_ayahs,
-    get_context,
-    get_surah_meta
+    get_ayah_count,
+    match_verses_batch
 )
 from utils.tracking import (
     build_target_window,
+    identify_start,
     asr_words_with_timestamps,
+    transcribe_text,
     build_ayah_timeline
 )
-from utils.seq_align import align_words
+from utils.seq_align import align_words, align_words_blockwise
 from utils.wav_io import write_wav_int16
+from utils.model_manager import ModelManager
+from utils.cpu_topology import (
+    plan_topology,
+    apply_env_overrides,
+    apply_topology,
+    autotune_pools,
+    benchmark_clip,
+    pool_cores
+)
+from utils.live_protocol import DeltaEncoder
+from utils.live_tracker import LiveTracker, transcribe_window
+from utils.session_recorder import SessionRecorder
+from utils.quran_responses import get_quran_responses, cached_response
+from utils.quran_search import get_search_index, SEARCH_MODES
+from utils.span_match import get_span_index
+from utils.verse_retrieval import get_block_retriever, retrieve_verses, TOP_BLOCKS as RETRIEVAL_TOP_BLOCKS
+from utils.long_audio import (
+    transcribe_long,
+    audio_duration_seconds,
+    shutdown_pool,
+    configure_pool as configure_long_audio_pool,
+)
+from utils.jobs import JobManager, JobQueueFull
+from utils.batch_infer import decode_clips, transcribe_batch
+from utils.asr_workers import AsrWorkerPool, SharedAudio, worker_specs
+from utils.metrics import (
+    REGISTRY,
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    MetricsMiddleware,
+    LIVE_TICK_LAG_SECONDS,
+    LIVE_SKIPPED_TICKS,
+    LIVE_ACTIVE_SESSIONS,
+    QUEUE_DEPTH,
+    current_endpoint,
+    observe_stage,
+    stage_timer,
+    cache_result
+)
+from utils.tracing import SlowLog, TracingMiddleware, Trace, current_trace, record_span, span
+from utils.admission import (
+    AdmissionController,
+    AdmissionRejected,
+    PRIORITY_LIVE,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_BATCH,
+    PRIORITY_BACKGROUND
+)
+from utils.budget import (
+    Deadline,
+    LOW_BUDGET_SECONDS,
+    STOP_DEADLINE,
+    STOP_CANCELLED
+)
 
 # Faster Whisper import
 from faster_whisper import WhisperModel
@@ -36,7 +91,182 @@ from faster_whisper import WhisperModel
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Voice Quran ML Service")
+# Model havuzu: "offline" (/infer, /track) ve "live" (/ws/live)
+model_manager = ModelManager({
+    # "base" modeli kullan (CPU'da çalışır, daha hızlı)
+    # "small" daha iyi ama daha yavaş
+    "offline": {"model_size_or_path": "base", "device": "cpu", "compute_type": "int8"},
+    # Live için tiny model (hızlı)
+    "live": {"model_size_or_path": "tiny", "device": "cpu", "compute_type": "int8"},
+    # Cascade'in tiny katmanı: live ile aynı boyut, ayrı örnek (offline çekirdek payında);
+    # /infer'in tiny decode'u live tick'lerinin modelini ve slotunu tutmaz
+    "cascade": {"model_size_or_path": "tiny", "device": "cpu", "compute_type": "int8"},
+})
+
+# CPU topolojisi: çekirdekler havuzlar arasında bölünür (cpu_threads x num_workers),
+# MODEL_<HAVUZ>_{CPU_THREADS,NUM_WORKERS,COMPUTE_TYPE,CPU_AFFINITY} ile override edilir
+# (havuzlar: live, offline, long_audio, cascade)
+MODEL_CPU_PINNING = os.environ.get("MODEL_CPU_PINNING", "0") == "1"
+CPU_TOPOLOGY = apply_env_overrides(plan_topology(pin=MODEL_CPU_PINNING))
+apply_topology(model_manager.specs, CPU_TOPOLOGY)
+configure_long_audio_pool(CPU_TOPOLOGY["long_audio"])
+# Başlangıçta kısa bir klip ile cpu_threads/num_workers ölçülüp seçilir (sonuç cache'lenir)
+MODEL_AUTOTUNE = os.environ.get("MODEL_AUTOTUNE", "0") == "1"
+MODEL_AUTOTUNE_CLIP = os.environ.get("MODEL_AUTOTUNE_CLIP")
+MODEL_AUTOTUNE_CACHE = os.environ.get(
+    "MODEL_AUTOTUNE_CACHE", str(Path(__file__).parent / "autotune.json")
+)
+
+# Başlangıçta arka planda yüklenecek modeller (örn. "live,offline"; boş = lazy load)
+PRELOAD_MODELS = [m.strip() for m in os.environ.get("PRELOAD_MODELS", "live,offline").split(",") if m.strip()]
+# Bu kadar saniye kullanılmayan modeller bellekten atılır (0 = kapalı)
+MODEL_IDLE_EVICT_SECONDS = float(os.environ.get("MODEL_IDLE_EVICT_SECONDS", "0"))
+
+# Ayrı process'lerde ASR (0 = API process'inde, thread pool'da). Her worker offline/live
+# modellerini bir kez yükler; offline çekirdek payı worker'lar arasında bölünür
+ASR_WORKERS = int(os.environ.get("ASR_WORKERS", "0"))
+asr_pool = None
+if ASR_WORKERS > 0:
+    asr_pool = AsrWorkerPool(
+        worker_specs(
+            model_manager.specs,
+            ["offline", "live", "cascade"],
+            cpu_threads=max(1, pool_cores(model_manager.specs["offline"]) // ASR_WORKERS)
+        ),
+        ASR_WORKERS,
+        preload=["offline"]
+    )
+
+# Admission control: model başına eşzamanlı decode sınırı, öncelikli kuyruk, doluysa 503 + Retry-After
+# (varsayılan sınır = havuzun num_workers'ı; model aynı anda bu kadar decode'u paralel yürütür)
+admission = AdmissionController(
+    {
+        "offline": int(os.environ.get("ADMISSION_OFFLINE_CONCURRENCY", "0"))
+        or ASR_WORKERS or model_manager.specs["offline"]["num_workers"],
+        "live": int(os.environ.get("ADMISSION_LIVE_CONCURRENCY", "1")),
+    },
+    total_limit=int(os.environ.get("ADMISSION_TOTAL_CONCURRENCY", "0"))
+    or (ASR_WORKERS or model_manager.specs["offline"]["num_workers"]) + 1,
+    max_wait=float(os.environ.get("ADMISSION_MAX_WAIT_SECONDS", "10")),
+    max_queue=int(os.environ.get("ADMISSION_MAX_QUEUE", "16"))
+)
+# Live tick slot için en fazla bu kadar bekler; açılmazsa tick atlanır (sn)
+LIVE_ADMISSION_WAIT_SECONDS = 0.25
+
+# Bu süreyi aşan HTTP istekleri / live tick'leri span dökümüyle JSONL'e yazılır (ms, 0 = kapalı);
+# dosya SLOW_LOG_MAX_BYTES'ı aşınca döndürülür
+slow_log = SlowLog(
+    os.environ.get("SLOW_LOG_PATH", str(Path(__file__).parent / "logs" / "slow_requests.jsonl")),
+    threshold_ms=float(os.environ.get("SLOW_REQUEST_MS", "5000")),
+    max_bytes=int(os.environ.get("SLOW_LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+    backups=int(os.environ.get("SLOW_LOG_BACKUPS", "5"))
+)
+SLOW_TICK_MS = float(os.environ.get("SLOW_TICK_MS", "2000"))
+
+# Live oturum kaydı (PCM + tick kararları, scripts/replay_session.py ile replay edilir).
+# Dizin verilmezse kapalı; verilirse start mesajında "record": true olan oturumlar
+# (LIVE_RECORD_ALL=1 ise tüm oturumlar) kaydedilir
+LIVE_RECORD_DIR = os.environ.get("LIVE_RECORD_DIR", "")
+LIVE_RECORD_ALL = os.environ.get("LIVE_RECORD_ALL", "0") == "1"
+
+# Asenkron işler (/jobs): sonuçlar JOBS_DIR altında saklanır
+job_manager = JobManager(
+    os.environ.get("JOBS_DIR", str(Path(__file__).parent / "jobs")),
+    workers=int(os.environ.get("JOB_WORKERS", "1")),
+    max_pending=int(os.environ.get("JOB_MAX_PENDING", "16"))
+)
+
+def tune_models() -> None:
+    """
+    Auto-tune: env ile sabitlenmemiş havuzlar için cpu_threads/num_workers ölçülüp seçilir
+    
+    Offline havuzu toplam throughput'a, live havuzu tek decode latency'sine göre ayarlanır.
+    Admission sınırları env ile verilmemişse yeni num_workers'a çekilir.
+    """
+    objectives = {
+        name: objective
+        for name, objective in (("offline", "throughput"), ("live", "latency"))
+        if not os.environ.get(f"MODEL_{name.upper()}_CPU_THREADS")
+        and not os.environ.get(f"MODEL_{name.upper()}_NUM_WORKERS")
+    }
+    if not objectives:
+        return
+    
+    chosen = autotune_pools(
+        model_manager.specs,
+        objectives,
+        benchmark_clip(MODEL_AUTOTUNE_CLIP),
+        cache_path=MODEL_AUTOTUNE_CACHE
+    )
+    for name, best in chosen.items():
+        logger.info(
+            f"✓ Auto-tune {name}: {best['num_workers']} worker x {best['cpu_threads']} thread, "
+            f"{best['compute_type']} ({best['audio_seconds_per_second']} sn/sn)"
+        )
+    
+    if "offline" in chosen and not ASR_WORKERS and not os.environ.get("ADMISSION_OFFLINE_CONCURRENCY"):
+        admission.limits["offline"] = chosen["offline"]["num_workers"]
+        if not os.environ.get("ADMISSION_TOTAL_CONCURRENCY"):
+            admission.total_limit = chosen["offline"]["num_workers"] + admission.limits["live"]
+
+def register_queue_gauges(executor: ThreadPoolExecutor) -> None:
+    """/metrics kuyruk derinlikleri: scrape anında okunur"""
+    # ThreadPoolExecutor başlamamış işleri _work_queue'da tutar
+    QUEUE_DEPTH.set_function(lambda: executor._work_queue.qsize(), queue="executor")
+    QUEUE_DEPTH.set_function(lambda: admission.waiting("offline"), queue="admission_offline")
+    QUEUE_DEPTH.set_function(lambda: admission.waiting("live"), queue="admission_live")
+    QUEUE_DEPTH.set_function(job_manager.pending_count, queue="jobs")
+    if asr_pool is not None:
+        QUEUE_DEPTH.set_function(lambda: asr_pool.status()["pending"], queue="asr_workers")
+
+def in_process_preload() -> List[str]:
+    """API process'inde önceden yüklenecek modeller (ASR worker'ları varsa offline orada yüklenir)"""
+    if asr_pool is None:
+        return PRELOAD_MODELS
+    return [name for name in PRELOAD_MODELS if name != "offline"]
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Uygulama başlangıcı: Kuran metni ve modelleri önceden yükle, job worker'larını başlat"""
+    quran_loaded = check_quran_loaded()
+    
+    # Varsayılan executor açıkça oluşturulur (kuyruk derinliği /metrics'te izlenir)
+    executor = ThreadPoolExecutor(
+        max_workers=min(32, (os.cpu_count() or 1) + 4),
+        thread_name_prefix="executor"
+    )
+    asyncio.get_running_loop().set_default_executor(executor)
+    register_queue_gauges(executor)
+    
+    if quran_loaded:
+        # /quran/* yanıtları bir kez serileştirilip sıkıştırılır (metin çalışma sırasında değişmez)
+        await asyncio.get_running_loop().run_in_executor(None, get_quran_responses)
+        await asyncio.get_running_loop().run_in_executor(None, get_search_index)
+        await asyncio.get_running_loop().run_in_executor(None, get_span_index)
+        if RETRIEVAL_TOP_BLOCKS > 0:
+            await asyncio.get_running_loop().run_in_executor(None, get_block_retriever)
+    
+    if asr_pool is not None:
+        asr_pool.start()
+    if PRELOAD_MODELS or MODEL_AUTOTUNE:
+        # Auto-tune modeller yüklenmeden önce aynı arka plan thread'inde çalışır
+        model_manager.preload(
+            in_process_preload(),
+            warmup=True,
+            before=tune_models if MODEL_AUTOTUNE else None
+        )
+    if MODEL_IDLE_EVICT_SECONDS > 0:
+        # Önceden yüklenen modeller hazır tutulur
+        model_manager.start_idle_reaper(MODEL_IDLE_EVICT_SECONDS, keep=PRELOAD_MODELS)
+    job_manager.start(run_job)
+    yield
+    await job_manager.stop()
+    model_manager.stop()
+    shutdown_pool()
+    if asr_pool is not None:
+        asr_pool.stop()
+
+app = FastAPI(title="Voice Quran ML Service", lifespan=lifespan)
 
 # CORS ayarları - web 3000'den gelecek
 app.add_middleware(
@@ -46,38 +276,26 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Span'ler -> Server-Timing header'ı + slow log (endpoint etiketi için MetricsMiddleware'in içinde)
+app.add_middleware(TracingMiddleware, slow_log=slow_log)
+# Endpoint etiketi + istek süresi (/metrics)
+app.add_middleware(MetricsMiddleware)
 
 @app.get("/")
 async def root():
     """Root endpoint: helpful message and pointer to docs."""
     return JSONResponse({"ok": True, "message": "Voice Quran ML Service - see /docs and /health"})
 
-# Global model (lazy load)
-_model: Optional[WhisperModel] = None
-_model_live: Optional[WhisperModel] = None  # Live için tiny model
 _verses = None
 _live_connection_active = False  # Tek bağlantı desteği
 
-def get_model():
-    """Whisper modelini lazy load eder (offline için base)"""
-    global _model
-    if _model is None:
-        logger.info("Whisper modeli yükleniyor (ilk çalıştırmada indirilecek)...")
-        # "base" modeli kullan (CPU'da çalışır, daha hızlı)
-        # "small" daha iyi ama daha yavaş
-        _model = WhisperModel("base", device="cpu", compute_type="int8")
-        logger.info("✓ Whisper modeli yüklendi")
-    return _model
-
-def get_model_live():
+def get_model() -> WhisperModel:
+    """Offline Whisper modelini döndürür (base; yüklü değilse yükler)"""
+    return model_manager.get("offline")
+
+def get_model_live() -> WhisperModel:
     """Live tracking için tiny model (hızlı)"""
-    global _model_live
-    if _model_live is None:
-        logger.info("Live Whisper modeli yükleniyor (tiny)...")
-        # cpu_threads=4 ile performansı artır
-        _model_live = WhisperModel("tiny", device="cpu", compute_type="int8", cpu_threads=4)
-        logger.info("✓ Live Whisper modeli yüklendi")
-    return _model_live
+    return model_manager.get("live")
 
 def check_quran_loaded():
     """Kuran metninin yüklenip yüklenmediğini kontrol eder"""
@@ -93,55 +311,324 @@ async def process_audio_to_wav(audio: UploadFile) -> Tuple[str, str]:
     Returns:
         (temp_input_path, temp_wav_path)
     """
-    suffix = Path(audio.filename).suffix if audio.filename else ".webm"
-    fd, temp_input = tempfile.mkstemp(suffix=suffix)
-    os.close(fd)
+    with span("process_audio_to_wav"):
+        suffix = Path(audio.filename).suffix if audio.filename else ".webm"
+        fd, temp_input = tempfile.mkstemp(suffix=suffix)
+        os.close(fd)
+        
+        with open(temp_input, "wb") as f:
+            content = await audio.read()
+            f.write(content)
+        
+        logger.info(f"Dosya alındı: {audio.filename}, {len(content)} bytes")
+        
+        # WAV'a dönüştür
+        with stage_timer("ffmpeg"):
+            temp_wav = convert_to_wav(temp_input)
+    
+    return temp_input, temp_wav
+
+def _json_default(value):
+    # numpy skalerleri (skorlar, süreler)
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"JSON'a çevrilemez: {type(value).__name__}")
+
+def dumps_timed(content) -> str:
+    """json.dumps; süre "serialize" aşaması olarak metriklere yazılır"""
+    with stage_timer("serialize"):
+        return json.dumps(content, ensure_ascii=False, default=_json_default)
+
+def json_response(content: Dict) -> Response:
+    """JSON yanıtı (serileştirme süresi ölçülür)"""
+    return Response(dumps_timed(content), media_type="application/json")
+
+# Cascade: önce tiny (greedy), güven düşükse base (beam) ile tekrar decode. İki katman da
+# offline admission slotu kullanır: live slotu (sınırı 1) sadece /ws/live tick'lerine kalır
+CASCADE_TIERS = [
+    {"tier": "tiny", "model": "cascade", "admission": "offline", "beam_size": 1},
+    {"tier": "base", "model": "offline", "admission": "offline", "beam_size": 3},
+]
+CASCADE_MIN_SCORE = 85.0      # En iyi eşleşme skoru
+CASCADE_MIN_MARGIN = 8.0      # En iyi ile (farklı metinli) ikinci arasındaki skor farkı
+CASCADE_MIN_LOGPROB = -0.7    # Segment avg_logprob ortalaması
+
+# İstek başına varsayılan decode bütçesi (sn, 0 = sınırsız)
+INFER_DEADLINE_SECONDS = float(os.environ.get("INFER_DEADLINE_SECONDS", "30"))
+# Bu kadar normalize kelime üretildiyse eşleşme için yeterli metin var (early_exit açıkken)
+ENOUGH_WORDS = 16
+# Segment bazında erken çıkış: en iyi skor ve marj bu eşikleri geçince decode durur
+EARLY_EXIT_MIN_SCORE = 90.0
+EARLY_EXIT_MIN_MARGIN = 10.0
+
+def new_deadline(deadline_ms: Optional[int]) -> Deadline:
+    """İstek parametresinden (yoksa INFER_DEADLINE_SECONDS'tan) Deadline oluşturur"""
+    seconds = deadline_ms / 1000 if deadline_ms is not None else INFER_DEADLINE_SECONDS
+    return Deadline(seconds if seconds and seconds > 0 else None)
+
+async def cancel_on_disconnect(request: Request, deadline: Deadline, poll_seconds: float = 0.5):
+    """Client bağlantısı koparsa deadline'ı iptal eder (arka plan task'ı)"""
+    while not deadline.cancelled:
+        if await request.is_disconnected():
+            logger.info("Client bağlantısı koptu, decode iptal ediliyor")
+            deadline.cancel()
+            return
+        await asyncio.sleep(poll_seconds)
+
+def budget_report(deadline: Optional[Deadline], stop_reason: Optional[str]) -> Dict:
+    """Yanıt için bütçe özeti"""
+    return {
+        "deadline_seconds": deadline.seconds if deadline else None,
+        "truncated": stop_reason in (STOP_DEADLINE, STOP_CANCELLED),
+        "stop_reason": stop_reason
+    }
+
+def overloaded(e: AdmissionRejected) -> HTTPException:
+    """Reddedilen admission için 503 + Retry-After"""
+    return HTTPException(
+        status_code=503,
+        detail=f"Sunucu yoğun ({e.reason}), lütfen tekrar deneyin",
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+def admission_check(model_name: str, priority: int) -> None:
+    """Erken yük atma: kuyruk doluysa ffmpeg/ASR'ye hiç başlamadan 503"""
+    try:
+        admission.check(model_name, priority)
+    except AdmissionRejected as e:
+        raise overloaded(e)
+
+@asynccontextmanager
+async def admission_slot(model_name: str, priority: int, slots: int = 1):
+    """Model decode slot'u (öncelik sırasıyla bekler); slot açılmazsa 503"""
+    try:
+        slots = await admission.acquire(model_name, priority, slots=slots)
+    except AdmissionRejected as e:
+        raise overloaded(e)
+    
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        admission.release(model_name, time.monotonic() - start, slots)
+
+def match_confidence(
+    matches: List[Dict],
+    avg_logprob: Optional[float],
+    min_score: float = CASCADE_MIN_SCORE,
+    min_margin: float = CASCADE_MIN_MARGIN
+) -> Dict:
+    """Cascade / erken çıkış kararı için güven ölçütleri (skor, marj, avg_logprob)"""
+    top_score = matches[0]["score"] if matches else 0.0
     
-    with open(temp_input, "wb") as f:
-        content = await audio.read()
-        f.write(content)
+    # Aynı metne sahip (tekrarlanan) ayetler marjı sıfırlamasın
+    runner_up = next(
+        (m["score"] for m in matches[1:] if m["text_ar"] != matches[0]["text_ar"]),
+        0.0
+    )
+    margin = top_score - runner_up
     
-    logger.info(f"Dosya alındı: {audio.filename}, {len(content)} bytes")
+    confident = (
+        top_score >= min_score and
+        margin >= min_margin and
+        (avg_logprob is None or avg_logprob >= CASCADE_MIN_LOGPROB)
+    )
     
-    # WAV'a dönüştür
-    temp_wav = convert_to_wav(temp_input)
+    return {
+        "score": round(top_score, 2),
+        "margin": round(margin, 2),
+        "avg_logprob": round(avg_logprob, 3) if avg_logprob is not None else None,
+        "confident": confident
+    }
+
+@asynccontextmanager
+async def asr_input(wav_path: Union[str, SharedAudio]):
+    """
+    ASR girdisi: worker havuzu varsa ses bir kez paylaşılan belleğe yazılır, yoksa WAV yolu kullanılır
     
-    return temp_input, temp_wav
+    Zaten SharedAudio verilirse (örn. /track'te eşleştirme + word timestamps) aynen kullanılır.
+    """
+    if asr_pool is None or isinstance(wav_path, SharedAudio):
+        yield wav_path
+        return
+    
+    shared = await asyncio.get_running_loop().run_in_executor(None, SharedAudio.from_wav, wav_path)
+    try:
+        yield shared
+    finally:
+        shared.close()
+
+async def asr_text(
+    model_name: str,
+    audio: Union[str, SharedAudio],
+    beam_size: int,
+    deadline: Optional[Deadline] = None,
+    enough_words: Optional[int] = None,
+    on_segment: Optional[Callable[[str, Optional[float]], bool]] = None
+) -> Tuple[str, Optional[float], Optional[str]]:
+    """transcribe_text: ASR worker'ında (paylaşılan bellek) veya executor thread'inde"""
+    with stage_timer("asr", model=model_name, span="transcribe_text"):
+        if isinstance(audio, SharedAudio):
+            return await asr_pool.transcribe_text(model_name, audio, beam_size, deadline, enough_words, on_segment)
+        
+        model = model_manager.get(model_name)
+        return await asyncio.get_running_loop().run_in_executor(
+            None, transcribe_text, model, audio, beam_size, deadline, enough_words, on_segment
+        )
 
-async def find_best_match(wav_path: str) -> dict:
+async def asr_words(
+    audio: Union[str, SharedAudio],
+    deadline: Optional[Deadline] = None,
+    on_segment: Optional[Callable[[List[Dict], float], None]] = None
+) -> List[Dict]:
+    """asr_words_with_timestamps (offline model): ASR worker'ında veya executor thread'inde"""
+    with stage_timer("asr", model="offline", span="asr_words_with_timestamps"):
+        if isinstance(audio, SharedAudio):
+            return await asr_pool.asr_words("offline", audio, deadline, on_segment)
+        
+        return await asyncio.get_running_loop().run_in_executor(
+            None, asr_words_with_timestamps, audio, get_model(), deadline, on_segment
+        )
+
+async def asr_long(
+    wav_path: str,
+    deadline: Optional[Deadline] = None,
+    on_chunk: Optional[Callable[[List[Dict], float], None]] = None
+) -> Tuple[List[Dict], Dict]:
+    """transcribe_long: parçalar ASR worker'larına veya long-audio process pool'una dağıtılır"""
+    with stage_timer("asr", model="offline", span="transcribe_long"):
+        if asr_pool is not None:
+            async with asr_input(wav_path) as shared:
+                return await asr_pool.transcribe_long("offline", shared, deadline=deadline, on_chunk=on_chunk)
+        
+        return await asyncio.get_running_loop().run_in_executor(
+            None, lambda: transcribe_long(wav_path, deadline=deadline, on_chunk=on_chunk)
+        )
+
+async def find_best_match(
+    wav_path: Union[str, SharedAudio],
+    cascade: bool = False,
+    deadline: Optional[Deadline] = None,
+    early_exit: bool = True,
+    on_candidate: Optional[Callable[[Dict], None]] = None,
+    priority: int = PRIORITY_INTERACTIVE
+) -> dict:
     """
     WAV dosyasından ASR yapar ve en iyi eşleşmeyi bulur
     
+    Segmentler geldikçe eşleştirme yapılır; en iyi skor ve marj erken çıkış
+    eşiklerini geçerse kalan ses decode edilmez.
+    
+    Args:
+        wav_path: WAV dosya yolu (veya asr_input ile hazırlanmış paylaşılan ses)
+        cascade: True ise önce tiny ile greedy decode, güven düşükse base ile tekrar
+        deadline: Decode bütçesi; dolarsa o ana kadarki metinle eşleştirilir
+        early_exit: Segment bazında güvenli eşleşmede (veya ENOUGH_WORDS kelimede) decode'u durdur
+        on_candidate: Her segment sonrası ara aday ile çağrılır (executor thread'inden)
+        priority: Admission önceliği (decode slot'u bu öncelikle beklenir)
+    
     Returns:
         {
             "transcript_ar": str,
             "best": {"surah_no": int, "ayah_no": int, "text_ar": str, "score": float},
-            "top3": [...]
+            "top3": [...],
+            "tier": "tiny" | "base",
+            "confidence": {"score", "margin", "avg_logprob", "confident"},
+            "budget": {"deadline_seconds", "truncated", "stop_reason"}
         }
     """
-    model = get_model()
-    asr_start = time.time()
-    
-    # ASR yap (word timestamps olmadan, sadece transcript)
-    segments, info = model.transcribe(
-        wav_path,
-        language="ar",
-        beam_size=3,
-        vad_filter=True
-    )
-    
-    # Transcript'i birleştir
-    transcript_parts = []
-    for segment in segments:
-        transcript_parts.append(segment.text.strip())
-    
-    transcript_ar = " ".join(transcript_parts)
-    asr_seconds = time.time() - asr_start
-    
-    logger.info(f"ASR tamamlandı: {transcript_ar[:50]}...")
+    with span("find_best_match"):
+        async with asr_input(wav_path) as audio:
+            return await _find_best_match(audio, cascade, deadline, early_exit, on_candidate, priority)
+
+async def _find_best_match(
+    audio: Union[str, SharedAudio],
+    cascade: bool,
+    deadline: Optional[Deadline],
+    early_exit: bool,
+    on_candidate: Optional[Callable[[Dict], None]],
+    priority: int
+) -> dict:
+    """find_best_match gövdesi (ses cascade katmanları boyunca bir kez hazırlanır)"""
+    tiers = CASCADE_TIERS if cascade else CASCADE_TIERS[-1:]
+    # on_segment executor/worker thread'inde çalışır; ContextVar'lar oraya taşınmaz
+    endpoint = current_endpoint.get()
+    trace = current_trace.get()
     
-    # Normalize et
-    transcript_norm = normalize_ar(transcript_ar)
+    for tier_idx, tier in enumerate(tiers):
+        is_last = tier_idx == len(tiers) - 1
+        # Son segment eşleşmesi (transcript değişmediyse tekrar hesaplanmaz)
+        incremental = {"transcript_norm": None, "matches": []}
+        
+        def on_segment(text: str, logprob: Optional[float]) -> bool:
+            if not early_exit and on_candidate is None:
+                return False
+            text_norm = normalize_ar(text)
+            if not text_norm or not text_norm.strip():
+                return False
+            
+            match_start = time.perf_counter()
+            seg_matches = retrieve_verses(text_norm, top_k=5)
+            match_end = time.perf_counter()
+            observe_stage("match_verses", match_end - match_start, endpoint=endpoint)
+            if trace is not None:
+                trace.record("match_verses", match_start, match_end)
+            incremental["transcript_norm"] = text_norm
+            incremental["matches"] = seg_matches
+            seg_confidence = match_confidence(
+                seg_matches, None, EARLY_EXIT_MIN_SCORE, EARLY_EXIT_MIN_MARGIN
+            )
+            
+            if on_candidate is not None and seg_matches:
+                on_candidate({
+                    "type": "candidate",
+                    "tier": tier["tier"],
+                    "transcript_ar": text,
+                    "best": {
+                        "surah_no": seg_matches[0]["surah"],
+                        "ayah_no": seg_matches[0]["ayah"],
+                        "text_ar": seg_matches[0]["text_ar"],
+                        "score": seg_matches[0]["score"]
+                    },
+                    "margin": seg_confidence["margin"]
+                })
+            
+            return early_exit and seg_confidence["confident"]
+        
+        # ASR yap (word timestamps olmadan, sadece transcript); event loop'u bloklamadan
+        # early_exit kapalıysa kayıt sonuna kadar decode edilir
+        async with admission_slot(tier["admission"], priority):
+            transcript_ar, avg_logprob, stop_reason = await asr_text(
+                tier["model"], audio, tier["beam_size"], deadline,
+                ENOUGH_WORDS if early_exit else None, on_segment
+            )
+        logger.info(f"ASR tamamlandı ({tier['tier']}, {stop_reason}): {transcript_ar[:50]}...")
+        
+        # Normalize et ve Kuran'da eşleştir
+        transcript_norm = normalize_ar(transcript_ar)
+        matches = []
+        if incremental["transcript_norm"] is not None:
+            cache_result("incremental_match", transcript_norm == incremental["transcript_norm"])
+        if transcript_norm == incremental["transcript_norm"]:
+            matches = incremental["matches"]
+        elif transcript_norm and transcript_norm.strip():
+            # Marj için birkaç ek aday al
+            with stage_timer("match_verses"):
+                matches = retrieve_verses(transcript_norm, top_k=5)
+        
+        confidence = match_confidence(matches, avg_logprob)
+        if matches and (confidence["confident"] or is_last):
+            break
+        
+        # Bütçe bittiyse veya yükseltmeye yetmiyorsa mevcut sonuçla dön
+        if matches and deadline is not None and (
+            deadline.stop_reason() or
+            (deadline.remaining() is not None and deadline.remaining() < LOW_BUDGET_SECONDS)
+        ):
+            break
+        
+        if not is_last:
+            logger.info(f"Cascade: {tier['tier']} güveni düşük ({confidence}), yükseltiliyor...")
     
     if not transcript_norm or not transcript_norm.strip():
         raise HTTPException(
@@ -149,10 +636,6 @@ async def find_best_match(wav_path: str) -> dict:
             detail="ASR çıktısı boş veya normalize edilemedi"
         )
     
-    # Kuran'da eşleştir
-    verses = get_verses()
-    matches = match_verses(transcript_norm, verses, top_k=3)
-    
     if not matches:
         raise HTTPException(
             status_code=400,
@@ -181,7 +664,10 @@ async def find_best_match(wav_path: str) -> dict:
                 "score": m["score"]
             }
             for m in top3
-        ]
+        ],
+        "tier": tier["tier"],
+        "confidence": confidence,
+        "budget": budget_report(deadline, stop_reason)
     }
 
 @app.get("/health")
@@ -193,21 +679,44 @@ async def health():
         "quran_loaded": quran_loaded
     }
 
+@app.get("/ready")
+async def ready():
+    """Readiness probe: Kuran metni ve önceden yüklenen modeller hazır mı?"""
+    quran_loaded = check_quran_loaded()
+    models_ready = model_manager.is_ready(in_process_preload())
+    workers_ready = asr_pool is None or asr_pool.status()["alive"] == asr_pool.workers
+    is_ready = quran_loaded and models_ready and workers_ready
+    
+    content = {
+        "ready": is_ready,
+        "quran_loaded": quran_loaded,
+        "models": model_manager.status(),
+        "admission": admission.status()
+    }
+    if asr_pool is not None:
+        content["asr_workers"] = asr_pool.status()
+    
+    return JSONResponse(status_code=200 if is_ready else 503, content=content)
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrikleri (aşama süreleri, live tick gecikmesi, kuyruklar, cache isabetleri)"""
+    return Response(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
 @app.get("/quran/meta")
-async def quran_meta():
-    """Kuran sure meta bilgilerini döndürür"""
+async def quran_meta(request: Request):
+    """Kuran sure meta bilgilerini döndürür (hazır gövde)"""
     if not check_quran_loaded():
         raise HTTPException(
             status_code=400,
             detail="Quran text not found. Run: python scripts/fetch_quran_text.py"
         )
     
-    meta = get_surah_meta()
-    return {"surahs": meta}
+    return cached_response(get_quran_responses().meta, request.headers)
 
 @app.get("/quran/surah/{surah_no}")
-async def quran_surah(surah_no: int):
-    """Belirli bir surenin ayetlerini döndürür"""
+async def quran_surah(surah_no: int, request: Request):
+    """Belirli bir surenin ayetlerini döndürür (hazır gövde)"""
     if not check_quran_loaded():
         raise HTTPException(
             status_code=400,
@@ -220,28 +729,19 @@ async def quran_surah(surah_no: int):
             detail="Surah number must be between 1 and 114"
         )
     
-    ayahs = get_surah_ayahs(surah_no)
+    body = get_quran_responses().surah(surah_no)
     
-    if not ayahs:
+    if body is None:
         raise HTTPException(
             status_code=404,
             detail=f"Surah {surah_no} not found"
         )
     
-    # Sure meta bilgisini al
-    meta_list = get_surah_meta()
-    surah_info = next((s for s in meta_list if s["surah_no"] == surah_no), None)
-    
-    return {
-        "surah_no": surah_no,
-        "name_ar": surah_info["name_ar"] if surah_info else "",
-        "name_tr": surah_info["name_tr"] if surah_info else "",
-        "ayahs": ayahs
-    }
+    return cached_response(body, request.headers)
 
 @app.get("/quran/context")
-async def quran_context(surah_no: int, ayah_no: int, before: int = 2, after: int = 10):
-    """Belirli bir ayetin etrafındaki ayetleri döndürür"""
+async def quran_context(request: Request, surah_no: int, ayah_no: int, before: int = 2, after: int = 10):
+    """Belirli bir ayetin etrafındaki ayetleri döndürür (hazır ayet parçalarından)"""
     if not check_quran_loaded():
         raise HTTPException(
             status_code=400,
@@ -254,19 +754,136 @@ async def quran_context(surah_no: int, ayah_no: int, before: int = 2, after: int
             detail="Surah number must be between 1 and 114"
         )
     
-    context = get_context(surah_no, ayah_no, before, after)
+    return cached_response(
+        get_quran_responses().context(surah_no, ayah_no, before, after),
+        request.headers
+    )
+
+# /quran/search sonuç sınırı
+SEARCH_MAX_LIMIT = 100
+
+@app.get("/quran/search")
+async def quran_search(q: str, mode: str = "prefix", limit: int = 20):
+    """
+    Kuran metninde arama (search-as-you-type)
     
-    return {
-        "surah_no": surah_no,
-        "ayah_no": ayah_no,
-        "items": context
-    }
+    mode: "exact" (tam kelimeler), "prefix" (son kelime önek), "fuzzy" (yazım farklarına toleranslı).
+    Çok kelimeli sorgular ardışık ifade olarak aranır (ayet sınırını geçebilir).
+    """
+    if not check_quran_loaded():
+        raise HTTPException(
+            status_code=400,
+            detail="Quran text not found. Run: python scripts/fetch_quran_text.py"
+        )
+    
+    if mode not in SEARCH_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"mode must be one of: {', '.join(SEARCH_MODES)}"
+        )
+    
+    with stage_timer("search"):
+        result = get_search_index().search(q, mode, max(1, min(limit, SEARCH_MAX_LIMIT)))
+    
+    if result is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Query must contain Arabic text"
+        )
+    
+    return json_response({"q": q, "mode": mode, **result})
+
+async def infer_ndjson(
+    request: Request,
+    temp_files: List[str],
+    wav_path: str,
+    cascade: bool,
+    deadline: Deadline,
+    start_time: float,
+    audio_seconds: float
+):
+    """
+    /infer?stream=true için NDJSON üretir: her segmentte bir "candidate",
+    sonunda "result" (veya "error") satırı. Temp dosyalar stream bitince silinir.
+    """
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+    
+    def on_candidate(event: Dict):
+        # Executor thread'inden event loop'a aktar
+        loop.call_soon_threadsafe(events.put_nowait, event)
+    
+    watcher = asyncio.create_task(cancel_on_disconnect(request, deadline))
+    task = asyncio.create_task(
+        find_best_match(wav_path, cascade=cascade, deadline=deadline, on_candidate=on_candidate)
+    )
+    
+    try:
+        while True:
+            getter = asyncio.ensure_future(events.get())
+            done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+            if getter in done:
+                yield dumps_timed(getter.result()) + "\n"
+                continue
+            getter.cancel()
+            break
+        
+        try:
+            result = task.result()
+            total_seconds = time.time() - start_time
+            final = {
+                "type": "result",
+                **result,
+                "meta": {
+                    "audio_seconds": round(audio_seconds, 2),
+                    "asr_seconds": round(total_seconds - audio_seconds, 2),
+                    "total_seconds": round(total_seconds, 2),
+                    "tier": result["tier"],
+                    "note": "search-only; tracking next sprint"
+                }
+            }
+        except HTTPException as e:
+            final = {"type": "error", "status_code": e.status_code, "detail": e.detail}
+        except Exception as e:
+            logger.error(f"Beklenmeyen hata: {e}", exc_info=True)
+            final = {"type": "error", "status_code": 500, "detail": f"Sunucu hatası: {str(e)}"}
+        
+        yield dumps_timed(final) + "\n"
+    finally:
+        watcher.cancel()
+        if not task.done():
+            # Client stream'i bıraktı
+            deadline.cancel()
+        for temp_file in temp_files:
+            if temp_file and os.path.exists(temp_file):
+                try:
+                    os.remove(temp_file)
+                except:
+                    pass
 
 @app.post("/infer")
-async def infer(audio: UploadFile = File(...)):
+async def infer(
+    request: Request,
+    audio: UploadFile = File(...),
+    mode: str = "base",
+    deadline_ms: Optional[int] = None,
+    early_exit: bool = True,
+    stream: bool = False
+):
     """
     Ses kaydını alır, ASR yapar ve Kuran'da eşleştirme yapar
+    
+    mode: "base" (her zaman base model) veya "cascade" (tiny -> gerekirse base)
+    deadline_ms: Decode bütçesi (varsayılan INFER_DEADLINE_SECONDS)
+    early_exit: Segment bazında güvenli eşleşmede decode'u durdur
+    stream: True ise ara adaylar NDJSON olarak stream edilir
     """
+    if mode not in ("base", "cascade"):
+        raise HTTPException(
+            status_code=400,
+            detail="mode must be 'base' or 'cascade'"
+        )
+    
     start_time = time.time()
     
     # Kuran yüklü mü kontrol et
@@ -276,6 +893,8 @@ async def infer(audio: UploadFile = File(...)):
             detail="Quran text not found. Run: python scripts/fetch_quran_text.py"
         )
     
+    admission_check("offline", PRIORITY_INTERACTIVE)
+    
     temp_input = None
     temp_wav = None
     
@@ -290,21 +909,45 @@ async def infer(audio: UploadFile = File(...)):
                 detail=f"Ses dönüştürme hatası: {str(e)}"
             )
         
-        # Best match bul
-        result = await find_best_match(temp_wav)
+        deadline = new_deadline(deadline_ms)
+        
+        if stream:
+            # Temp dosyaların sahipliği stream'e geçer
+            temp_files = [temp_input, temp_wav]
+            temp_input = temp_wav = None
+            return StreamingResponse(
+                infer_ndjson(
+                    request, temp_files, temp_files[1], mode == "cascade",
+                    deadline, start_time, audio_seconds
+                ),
+                media_type="application/x-ndjson"
+            )
+        
+        # Best match bul (client koparsa decode iptal edilir)
+        watcher = asyncio.create_task(cancel_on_disconnect(request, deadline))
+        try:
+            result = await find_best_match(
+                temp_wav,
+                cascade=(mode == "cascade"),
+                deadline=deadline,
+                early_exit=early_exit
+            )
+        finally:
+            watcher.cancel()
         
         total_seconds = time.time() - start_time
         
         # Sonucu döndür
-        return {
+        return json_response({
             **result,
             "meta": {
                 "audio_seconds": round(audio_seconds, 2),
                 "asr_seconds": round(total_seconds - audio_seconds, 2),
                 "total_seconds": round(total_seconds, 2),
+                "tier": result["tier"],
                 "note": "search-only; tracking next sprint"
             }
-        }
+        })
         
     except HTTPException:
         raise
@@ -323,6 +966,142 @@ async def infer(audio: UploadFile = File(...)):
                 except:
                     pass
 
+# /infer/batch: istek başına en fazla dosya
+BATCH_MAX_FILES = int(os.environ.get("BATCH_MAX_FILES", "32"))
+
+@app.post("/infer/batch")
+async def infer_batch(
+    audios: List[UploadFile] = File(...),
+    beam_size: int = 3
+):
+    """
+    Birden fazla kısa kaydı tek istekte tanır (örn. bir sınıfın kayıtları)
+    
+    Dosyalar paralel decode edilir, tek batched ASR çağrısıyla transcribe edilir ve
+    tüm transcript'ler tek vektörel geçişte (match_verses_batch) eşleştirilir.
+    Sonuçlar dosya sırasıyla döner; bir dosyanın hatası diğerlerini etkilemez.
+    """
+    if not audios:
+        raise HTTPException(status_code=400, detail="En az bir dosya gerekli")
+    if len(audios) > BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"En fazla {BATCH_MAX_FILES} dosya gönderilebilir"
+        )
+    
+    if not check_quran_loaded():
+        raise HTTPException(
+            status_code=400,
+            detail="Quran text not found. Run: python scripts/fetch_quran_text.py"
+        )
+    
+    admission_check("offline", PRIORITY_BATCH)
+    
+    start_time = time.time()
+    loop = asyncio.get_running_loop()
+    timing = {}
+    temp_inputs = []
+    
+    try:
+        # Dosyaları diske yaz
+        for audio in audios:
+            suffix = Path(audio.filename).suffix if audio.filename else ".webm"
+            fd, temp_input = tempfile.mkstemp(suffix=suffix)
+            os.close(fd)
+            temp_inputs.append(temp_input)
+            with open(temp_input, "wb") as f:
+                f.write(await audio.read())
+        timing["receive_seconds"] = round(time.time() - start_time, 3)
+        
+        # Paralel decode (ffmpeg + VAD)
+        stage_start = time.time()
+        with stage_timer("ffmpeg"):
+            decoded = await loop.run_in_executor(None, decode_clips, temp_inputs)
+        timing["decode_seconds"] = round(time.time() - stage_start, 3)
+        
+        ok = [i for i, (clip, error) in enumerate(decoded) if clip is not None]
+        
+        # Batched ASR (ASR worker'ları varsa worker'da)
+        stage_start = time.time()
+        clips = [decoded[i][0] for i in ok]
+        async with admission_slot("offline", PRIORITY_BATCH):
+            with stage_timer("asr", model="offline", span="transcribe_batch"):
+                if asr_pool is not None:
+                    asr_results = await asr_pool.transcribe_batch("offline", clips, beam_size)
+                else:
+                    asr_results = await loop.run_in_executor(
+                        None, transcribe_batch, get_model(), clips, beam_size
+                    )
+        timing["asr_seconds"] = round(time.time() - stage_start, 3)
+        
+        # Tek geçişte eşleştirme (marj için 5 aday)
+        stage_start = time.time()
+        transcripts_norm = [normalize_ar(r["text"]) for r in asr_results]
+        with stage_timer("match_verses"):
+            all_matches = await loop.run_in_executor(None, match_verses_batch, transcripts_norm, 5)
+        timing["match_seconds"] = round(time.time() - stage_start, 3)
+        
+        results = [
+            {"filename": audio.filename, "error": f"Ses dönüştürme hatası: {decoded[i][1]}"}
+            for i, audio in enumerate(audios)
+        ]
+        for i, asr, matches in zip(ok, asr_results, all_matches):
+            clip = decoded[i][0]
+            entry = {
+                "filename": audios[i].filename,
+                "transcript_ar": asr["text"],
+                "speech_seconds": round(len(clip) / 16000, 2),
+                "avg_logprob": asr["avg_logprob"],
+                "batched": asr["batched"]
+            }
+            if not matches:
+                entry["error"] = "Eşleşme bulunamadı"
+            else:
+                entry["best"] = {
+                    "surah_no": matches[0]["surah"],
+                    "ayah_no": matches[0]["ayah"],
+                    "text_ar": matches[0]["text_ar"],
+                    "score": matches[0]["score"]
+                }
+                entry["top3"] = [
+                    {
+                        "surah_no": m["surah"],
+                        "ayah_no": m["ayah"],
+                        "text_ar": m["text_ar"],
+                        "score": m["score"]
+                    }
+                    for m in matches[:3]
+                ]
+                entry["confidence"] = match_confidence(matches, asr["avg_logprob"])
+            results[i] = entry
+        
+        timing["total_seconds"] = round(time.time() - start_time, 3)
+        
+        return json_response({
+            "results": results,
+            "meta": {
+                "files": len(audios),
+                "failed": sum(1 for r in results if "error" in r),
+                "timing": timing
+            }
+        })
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Beklenmeyen hata: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Sunucu hatası: {str(e)}"
+        )
+    finally:
+        for temp_file in temp_inputs:
+            if os.path.exists(temp_file):
+                try:
+                    os.remove(temp_file)
+                except:
+                    pass
+
 @app.websocket("/ws/live")
 async def websocket_live(websocket: WebSocket):
     """
@@ -338,6 +1117,9 @@ async def websocket_live(websocket: WebSocket):
     
     await websocket.accept()
     _live_connection_active = True
+    LIVE_ACTIVE_SESSIONS.inc()
+    decoder: Optional[StreamingDecoder] = None  # Sıkıştırılmış ses (webm/ogg) geliyorsa
+    recorder: Optional[SessionRecorder] = None  # Oturum kaydı (opt-in)
     
     try:
         # Kuran yüklü mü kontrol et
@@ -357,20 +1139,27 @@ async def websocket_live(websocket: WebSocket):
         sample_rate = 16000
         window_sec = 8  # Daha kısa sliding window -> daha düşük gecikme
         target_ayahs = 12
+        fast_start = True  # Kısa önekle ayet başlangıçlarından geçici eşleşme
+        fast_start_ms = 2500
+        warmup_ms = 6000  # fast_start kapalıyken beklenen süre
+        min_opening_score = 70
+        encoder: Optional[DeltaEncoder] = None  # protocol 2 (delta) seçildiyse
+        backpressure_wait = 0.02  # Decoder kuyruğu doluyken bekleme (sn)
+        tick_budget_ms = 2000  # Tick başına decode bütçesi
 
         # Ring buffer
         max_buffer_seconds = 45
         buffer = bytearray()
         total_samples_received = 0
-        rec_words_global: List[Dict] = []  # Global word listesi
 
-        # State
-        best_match: Optional[Dict] = None
-        tgt_words: List[Dict] = []
-        ayahs: List[Dict] = []
+        # State (best match, hedef pencere, global kelimeler; start mesajında yeniden oluşturulur)
+        tracker = LiveTracker(target_ayahs=target_ayahs, min_opening_score=min_opening_score)
         last_update_time = time.monotonic()
         update_interval = 0.1  # 0.1 saniyede bir güncelle (daha hızlı güncelleme)
         temp_wav_files = []
+        # Admission slot'u açılmadığı için atlanan tick sayısı
+        skipped_ticks = 0
+        timing_enabled = False  # Update'lere tick span süreleri eklensin mi
         
         while True:
             try:
@@ -387,12 +1176,48 @@ async def websocket_live(websocket: WebSocket):
                         sample_rate = data.get("sample_rate", 16000)
                         window_sec = data.get("window_sec", 14)
                         target_ayahs = data.get("target_ayahs", 12)
+                        fast_start = data.get("fast_start", True)
+                        fast_start_ms = data.get("fast_start_ms", 2500)
+                        tick_budget_ms = data.get("tick_budget_ms", 2000)
+                        timing_enabled = bool(data.get("timing", False))
+                        tracker = LiveTracker(target_ayahs=target_ayahs, min_opening_score=min_opening_score)
+                        
+                        # Ses formatı: "pcm16" (varsayılan) veya sıkıştırılmış ("webm", "ogg")
+                        audio_format = data.get("format", "pcm16")
+                        if audio_format != "pcm16" and decoder is None:
+                            decoder = StreamingDecoder(input_format=audio_format)
+                            sample_rate = decoder.sample_rate
                         
-                        await websocket.send_json({
+                        # Protokol: 1 = tam update (varsayılan), 2 = delta
+                        if data.get("protocol", 1) == 2:
+                            encoder = DeltaEncoder(data.get("encoding", "json"))
+                        
+                        status = {
                             "type": "status",
                             "state": "warming_up",
                             "elapsed_ms": 0
-                        })
+                        }
+                        if encoder:
+                            status["protocol"] = 2
+                            status["encoding"] = encoder.encoding
+                        
+                        if LIVE_RECORD_DIR and recorder is None and (LIVE_RECORD_ALL or data.get("record")):
+                            try:
+                                recorder = SessionRecorder(LIVE_RECORD_DIR, {
+                                    "sample_rate": sample_rate,
+                                    "window_sec": window_sec,
+                                    "target_ayahs": target_ayahs,
+                                    "fast_start": fast_start,
+                                    "fast_start_ms": fast_start_ms,
+                                    "tick_budget_ms": tick_budget_ms,
+                                    "min_opening_score": min_opening_score,
+                                    "format": audio_format,
+                                    "model": model_manager.specs["live"]["model_size_or_path"]
+                                })
+                                status["recording"] = recorder.session_id
+                            except OSError as e:
+                                logger.warning(f"Oturum kaydı açılamadı: {e}")
+                        await websocket.send_json(status)
                         
                     elif data.get("type") == "stop":
                         break
@@ -404,33 +1229,45 @@ async def websocket_live(websocket: WebSocket):
                             audio_base64 = data.get("data", "")
                             pcm_bytes = base64.b64decode(audio_base64)
                             buffer.extend(pcm_bytes)
+                            if recorder is not None:
+                                recorder.write_pcm(pcm_bytes)
                             total_samples_received += len(pcm_bytes) // 2
                         except Exception as e:
                             logger.error(f"Base64 decode hatası: {e}")
                 
                 elif "bytes" in message:
-                    # PCM binary data
-                    pcm_bytes = message["bytes"]
+                    if decoder is not None:
+                        # Sıkıştırılmış stream: kuyruk doluysa soketten okumayı beklet
+                        while not decoder.feed(message["bytes"]):
+                            await asyncio.sleep(backpressure_wait)
+                        pcm_bytes = decoder.read()
+                    else:
+                        # PCM binary data
+                        pcm_bytes = message["bytes"]
                     buffer.extend(pcm_bytes)
+                    if recorder is not None:
+                        recorder.write_pcm(pcm_bytes)
                     total_samples_received += len(pcm_bytes) // 2  # int16 = 2 bytes
                     
                     # Buffer overflow kontrolü
                     max_samples = max_buffer_seconds * sample_rate
                     if len(buffer) > max_samples * 2:
                         # Eski veriyi sil (son max_samples kadar tut)
+                        # total_samples_received monoton kalır (global zaman ekseni)
                         keep_bytes = max_samples * 2
                         buffer = buffer[-keep_bytes:]
-                        total_samples_received = max_samples
                     
                     # Update loop (her 1 saniyede bir)
                     current_time = time.monotonic()
                     elapsed_ms = int((total_samples_received / sample_rate) * 1000)
                     
                     if current_time - last_update_time >= update_interval:
+                        # Tick'in zamanı (gecikme metriği bundan ölçülür)
+                        tick_due = last_update_time + update_interval
                         last_update_time = current_time
                         
-                        # Warming up (ilk 4-6 saniye)
-                        if elapsed_ms < 6000:
+                        # Warming up (fast_start ile ~2.5 sn, aksi halde 6 sn)
+                        if elapsed_ms < (fast_start_ms if fast_start else warmup_ms):
                             await websocket.send_json({
                                 "type": "status",
                                 "state": "warming_up",
@@ -441,13 +1278,30 @@ async def websocket_live(websocket: WebSocket):
                         # Window samples hesapla
                         window_samples = int(window_sec * sample_rate)
                         window_bytes = window_samples * 2
-                        
-                        if len(buffer) < window_bytes:
+                        if len(buffer) < window_bytes and not (fast_start and tracker.searching):
                             # Yeterli veri yok
                             continue
                         
-                        # Son window_sec kadar sample al
+                        # Live slot'u (en yüksek öncelik, kısa bekleme); açılmazsa bu tick atlanır,
+                        # ses buffer'da kalır ve bir sonraki tick daha uzun pencereyle devam eder
+                        tick_trace = Trace("live_tick")
+                        try:
+                            with tick_trace.span("admission_wait"):
+                                await admission.acquire(
+                                    "live", PRIORITY_LIVE, max_wait=LIVE_ADMISSION_WAIT_SECONDS
+                                )
+                        except AdmissionRejected:
+                            skipped_ticks += 1
+                            LIVE_SKIPPED_TICKS.inc(reason="admission")
+                            continue
+                        tick_slot = True
+                        tick_start = time.monotonic()
+                        # Tick boyunca stage_timer'lar span'lerini bu trace'e yazar
+                        trace_token = current_trace.set(tick_trace)
+                        
+                        # Son window_sec kadar sample al (fast_start'ta o ana kadarki önek)
                         window_buffer = buffer[-window_bytes:]
+                        short_window = len(window_buffer) < window_bytes
                         
                         # WAV dosyasına yaz
                         samples_int16 = np.frombuffer(window_buffer, dtype=np.int16)
@@ -456,155 +1310,67 @@ async def websocket_live(websocket: WebSocket):
                         temp_wav_files.append(temp_wav)
                         
                         try:
-                            write_wav_int16(temp_wav, samples_int16, sample_rate)
+                            with span("write_wav"):
+                                write_wav_int16(temp_wav, samples_int16, sample_rate)
                             
-                            # ASR yap
-                            segments, info = model.transcribe(
-                                temp_wav,
-                                language="ar",
-                                beam_size=1,            # Greedy decoding (En hızlı)
-                                best_of=1,              # Tek deneme
-                                temperature=0.0,        # Rastgelelik yok
-                                condition_on_previous_text=False, # Önceki metne bakma (Hız artırır)
-                                word_timestamps=True,
-                                vad_filter=False        # VAD kapalı (Gecikme olmasın)
+                            # ASR yap (tick bütçesi dolarsa kalan segmentler atlanır)
+                            asr_start = time.perf_counter()
+                            tick_deadline = Deadline(tick_budget_ms / 1000)
+                            window_ms = int(len(window_buffer) // 2 * 1000 / sample_rate)
+                            transcript_partial, rec_words_window = transcribe_window(
+                                model, temp_wav, elapsed_ms - window_ms, tick_deadline
                             )
                             
-                            # Transcript ve words çıkar
-                            transcript_parts = []
-                            rec_words_window = []
+                            # Decode bitti: slot'u matching/alignment'tan önce bırak
+                            asr_seconds = time.monotonic() - tick_start
+                            observe_stage("asr", asr_seconds, model="live")
+                            record_span("asr", asr_start, time.perf_counter(), model="live")
+                            admission.release("live", asr_seconds)
+                            tick_slot = False
                             
-                            global_offset_ms = elapsed_ms - (window_sec * 1000)
-                            
-                            for segment in segments:
-                                transcript_parts.append(segment.text.strip())
-                                
-                                for word_info in segment.words:
-                                    word_text = word_info.word.strip()
-                                    if not word_text:
-                                        continue
-                                    
-                                    word_norm = normalize_ar(word_text)
-                                    
-                                    # Global timestamp'e çevir
-                                    start_ms = int((word_info.start * 1000) + global_offset_ms)
-                                    end_ms = int((word_info.end * 1000) + global_offset_ms)
-                                    
-                                    rec_words_window.append({
-                                        "w": word_norm,
-                                        "raw": word_text,
-                                        "start_ms": start_ms,
-                                        "end_ms": end_ms
-                                    })
-                            
-                            transcript_partial = " ".join(transcript_parts)
-                            
-                            # Best match bul (henüz yoksa)
-                            if best_match is None:
-                                transcript_norm = normalize_ar(transcript_partial)
-                                if transcript_norm and transcript_norm.strip():
-                                    global _verses
-                                    if _verses is None:
-                                        _verses = get_verses()
-                                    matches = match_verses(transcript_norm, _verses, top_k=1)
-                                    if matches:
-                                        best_match = {
-                                            "surah_no": matches[0]["surah"],
-                                            "ayah_no": matches[0]["ayah"],
-                                            "text_ar": matches[0]["text_ar"],
-                                            "score": matches[0]["score"]
-                                        }
-                                        
-                                        # Target window oluştur
-                                        tgt_words, ayahs = build_target_window(
-                                            best_match["surah_no"],
-                                            best_match["ayah_no"],
-                                            window_ayahs=target_ayahs
-                                        )
-                            
-                            # Global word listesini güncelle (son 25 saniye)
-                            cutoff_ms = elapsed_ms - 25000
-                            rec_words_global = [
-                                w for w in rec_words_global
-                                if w["end_ms"] >= cutoff_ms
-                            ]
-                            
-                            # Yeni words ekle (duplike kontrolü)
-                            for new_word in rec_words_window:
-                                # Aynı start_ms varsa ekleme
-                                if not any(
-                                    abs(w["start_ms"] - new_word["start_ms"]) < 50
-                                    for w in rec_words_global
-                                ):
-                                    rec_words_global.append(new_word)
-                            
-                            # Alignment ve timeline (best match varsa)
-                            timeline = []
-                            current_ayah = None
-                            state = "tracking"
-                            
-                            if best_match and tgt_words and rec_words_global:
-                                try:
-                                    # Alignment
-                                    pairs = align_words(rec_words_global, tgt_words)
-                                    
-                                    # Timeline
-                                    timeline = build_ayah_timeline(
-                                        pairs, rec_words_global, tgt_words, ayahs
-                                    )
-                                    
-                                    # Current ayah bul
-                                    for ayah in timeline:
-                                        if (
-                                            ayah["start_ms"] is not None and
-                                            ayah["end_ms"] is not None and
-                                            elapsed_ms >= ayah["start_ms"] and
-                                            elapsed_ms < ayah["end_ms"]
-                                        ):
-                                            current_ayah = ayah
-                                            break
-                                    
-                                    # Bulunamazsa matched_ratio en yüksek olanı seç
-                                    if current_ayah is None and timeline:
-                                        current_ayah = max(
-                                            timeline,
-                                            key=lambda x: x.get("matched_ratio", 0)
-                                        )
-                                        state = "uncertain"
-                                    
-                                    # Mismatch/Jump Tespiti
-                                    if timeline:
-                                        # En iyi eşleşen ayetin oranına bak
-                                        max_ratio = max(a.get("matched_ratio", 0) for a in timeline)
-                                        
-                                        # Eğer oran çok düşükse (%15 altı) ve yeterli kelime varsa kullanıcı baka bir sureye zıplamış olabilir
-                                        if max_ratio < 0.15 and len(transcript_partial.split()) > 3:
-                                            mismatch_count += 1
-                                        else:
-                                            mismatch_count = 0
-                                        
-                                        # 4 kez üst üste düşük oran gelirse sureyi sıfırla (global re-search tetikle)
-                                        if mismatch_count >= 4:
-                                            logger.info("Zıplama tespit edildi! Sure sıfırlanıyor...")
-                                            best_match = None
-                                            tgt_words = []
-                                            ayahs = []
-                                            mismatch_count = 0
-                                            rec_words_global = [] # Geçmişi temizle ki yeni sure temiz başlasın
-                                    
-                                except Exception as e:
-                                    logger.error(f"Alignment/timeline hatası: {e}")
+                            # Eşleştirme, alignment, timeline ve zıplama tespiti
+                            tick_result = tracker.step(
+                                elapsed_ms, transcript_partial, rec_words_window, short_window
+                            )
                             
                             # Client'a gönder
-                            await websocket.send_json({
+                            update = {
                                 "type": "update",
                                 "elapsed_ms": elapsed_ms,
-                                "best": best_match,
-                                "current": current_ayah,
-                                "timeline": timeline,
-                                "transcript_partial": transcript_partial,
-                                "state": state
-                            })
+                                **tick_result,
+                                "truncated": tick_deadline.expired(),
+                                "skipped_ticks": skipped_ticks
+                            }
+                            if timing_enabled:
+                                update["timing"] = {
+                                    **{name: entry["ms"] for name, entry in tick_trace.summary().items()},
+                                    "total_ms": tick_trace.elapsed_ms()
+                                }
+                            if encoder is None:
+                                await websocket.send_text(dumps_timed(update))
+                            else:
+                                with stage_timer("serialize", model="live"):
+                                    payload = encoder.encode(update)
+                                if encoder.binary:
+                                    await websocket.send_bytes(payload)
+                                else:
+                                    await websocket.send_text(payload)
+                            LIVE_TICK_LAG_SECONDS.observe(time.monotonic() - tick_due, model="live")
+                            
+                            if recorder is not None:
+                                recorder.write_tick({
+                                    "samples": total_samples_received,
+                                    "window_samples": len(window_buffer) // 2,
+                                    "elapsed_ms": elapsed_ms,
+                                    "short_window": short_window,
+                                    "words": rec_words_window,
+                                    "transcript": transcript_partial,
+                                    "truncated": update["truncated"],
+                                    "result": tick_result,
+                                    "timing": {
+                                        name: entry["ms"] for name, entry in tick_trace.summary().items()
+                                    }
+                                })
                             
                         except Exception as e:
                             logger.error(f"ASR/timeline hatası: {e}")
@@ -613,6 +1379,17 @@ async def websocket_live(websocket: WebSocket):
                                 "message": f"Processing error: {str(e)}"
                             })
                         finally:
+                            if tick_slot:
+                                admission.release("live", time.monotonic() - tick_start)
+                            current_trace.reset(trace_token)
+                            slow_log.maybe_write(
+                                tick_trace,
+                                threshold_ms=SLOW_TICK_MS,
+                                kind="live_tick",
+                                endpoint="/ws/live",
+                                elapsed_ms=elapsed_ms
+                            )
+                            
                             # Temp WAV dosyasını sil
                             if os.path.exists(temp_wav):
                                 try:
@@ -636,6 +1413,12 @@ async def websocket_live(websocket: WebSocket):
         logger.error(f"WebSocket connection hatası: {e}", exc_info=True)
     finally:
         _live_connection_active = False
+        LIVE_ACTIVE_SESSIONS.dec()
+        
+        if decoder is not None:
+            decoder.close()
+        if recorder is not None:
+            recorder.close()
         
         # Temp dosyaları temizle
         for temp_wav in temp_wav_files:
@@ -650,115 +1433,359 @@ async def websocket_live(websocket: WebSocket):
         except:
             pass
 
-@app.post("/track")
-async def track(audio: UploadFile = File(...), window_ayahs: int = 12):
-    """
-    Ses kaydını alır, ASR word timestamps çıkarır ve ayet bazında timeline oluşturur
+# Bu süreden uzun kayıtlar /track'te parçalanıp paralel transcribe edilir (sn)
+LONG_AUDIO_SECONDS = float(os.environ.get("LONG_AUDIO_SECONDS", "120"))
+# İlerleme event'lerinde kısmi timeline en fazla bu sıklıkta hesaplanır (sn)
+PROGRESS_TIMELINE_INTERVAL = 2.0
+# Long modda başlangıç ayetini belirlemek için beklenen kelime sayısı
+LONG_AUDIO_HEAD_WORDS = 40
+
+def surah_target_window(surah_no: int, ayah_no: int, window_ayahs: int) -> Tuple[List[Dict], List[Dict]]:
+    """Başlangıç ayetinden en az sure sonuna kadar uzanan hedef pencere"""
+    rest_of_surah = get_ayah_count(surah_no) - ayah_no + 1
+    return build_target_window(surah_no, ayah_no, window_ayahs=max(window_ayahs, rest_of_surah))
+
+def track_progress_reporter(
+    on_progress: Callable[[Dict], None],
+    resolve_target: Callable[[List[Dict]], Tuple[Optional[List[Dict]], Optional[List[Dict]]]],
+    align: Callable = align_words,
+    interval: float = PROGRESS_TIMELINE_INTERVAL
+) -> Callable[[List[Dict], float], None]:
     """
-    start_time = time.time()
+    ASR ilerlemesini on_progress'e ileten callback üretir (executor thread'inde çağrılır)
     
-    # Kuran yüklü mü kontrol et
-    if not check_quran_loaded():
-        raise HTTPException(
-            status_code=400,
-            detail="Quran text not found. Run: python scripts/fetch_quran_text.py"
-        )
+    Her segment/parçada decode edilen süre, en fazla interval'de bir kısmi timeline gönderilir.
     
-    temp_input = None
-    temp_wav = None
+    Args:
+        on_progress: Event callback'i (thread-safe)
+        resolve_target: rec_words -> (tgt_words, ayahs); hedef henüz belli değilse (None, None)
+        align: Alignment fonksiyonu (align_words / align_words_blockwise)
+    """
+    last_timeline_at = [0.0]
     
-    try:
-        # Audio'yu WAV'a çevir
-        try:
-            temp_input, temp_wav = await process_audio_to_wav(audio)
-            audio_seconds = time.time() - start_time
-        except Exception as e:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Ses dönüştürme hatası: {str(e)}"
-            )
+    def on_segment(rec_words: List[Dict], decoded_seconds: float):
+        event = {
+            "type": "progress",
+            "decoded_seconds": round(decoded_seconds, 2),
+            "asr_words": len(rec_words)
+        }
         
-        # Önce best match bul (infer mantığı)
-        best_result = await find_best_match(temp_wav)
-        best = best_result["best"]
+        now = time.monotonic()
+        if now - last_timeline_at[0] >= interval:
+            last_timeline_at[0] = now
+            tgt_words, ayahs = resolve_target(rec_words)
+            if tgt_words:
+                pairs = align(rec_words, tgt_words)
+                event["timeline"] = build_ayah_timeline(pairs, rec_words, tgt_words, ayahs)
         
-        # Target window oluştur
-        tgt_words, ayahs = build_target_window(
-            best["surah_no"],
-            best["ayah_no"],
-            window_ayahs=window_ayahs
-        )
+        on_progress(event)
+    
+    return on_segment
+
+def align_long_words(rec_words: List[Dict], window_ayahs: int = 12, word_confidence: bool = False) -> Dict:
+    """
+    Uzun kaydın kelimelerinden timeline: başlangıç ayeti + sure ölçeğinde blok bazında alignment
+    
+    Başlangıç ayeti ilk kelimelerden bulunur (ayrı bir find_best_match geçişi yok).
+    word_confidence: Timeline'a kelime bazında hizalama güveni eklenir
+    
+    Returns:
+        {"best", "window", "timeline", "align_seconds"}
+    
+    Raises:
+        HTTPException: Eşleşme / pencere / timeline oluşturulamazsa (400)
+    """
+    # Başlangıç ayeti: kaydın ilk kelimelerinden
+    match = identify_start(rec_words, head_words=LONG_AUDIO_HEAD_WORDS)
+    if not match:
+        raise HTTPException(status_code=400, detail="Eşleşme bulunamadı")
+    best = {
+        "surah_no": match["surah"],
+        "ayah_no": match["ayah"],
+        "text_ar": match["text_ar"],
+        "score": match["score"]
+    }
+    
+    tgt_words, ayahs = surah_target_window(best["surah_no"], best["ayah_no"], window_ayahs)
+    if not tgt_words or not ayahs:
+        raise HTTPException(status_code=400, detail="Target window oluşturulamadı")
+    
+    align_start = time.time()
+    with stage_timer("align_words"):
+        pairs = align_words_blockwise(rec_words, tgt_words)
+    align_seconds = time.time() - align_start
+    logger.info(f"Blok alignment tamamlandı: {len(pairs)} pair ({align_seconds:.2f} sn)")
+    
+    with stage_timer("build_ayah_timeline"):
+        timeline = build_ayah_timeline(pairs, rec_words, tgt_words, ayahs, word_confidence)
+    if not timeline:
+        raise HTTPException(status_code=400, detail="Timeline oluşturulamadı")
+    
+    return {
+        "best": best,
+        "window": {
+            "start_surah": best["surah_no"],
+            "start_ayah": best["ayah_no"],
+            "count": len(ayahs)
+        },
+        "timeline": timeline,
+        "align_seconds": round(align_seconds, 2)
+    }
+
+async def track_long(
+    wav_path: str,
+    window_ayahs: int,
+    deadline: Optional[Deadline] = None,
+    on_progress: Optional[Callable[[Dict], None]] = None,
+    priority: int = PRIORITY_INTERACTIVE,
+    word_confidence: bool = False
+) -> Dict:
+    """
+    Uzun kayıt için /track: parçalı paralel ASR + sure ölçeğinde blok bazında alignment
+    
+    Tek word-timestamps geçişi yapılır (align_long_words). Deadline parçalar arasında kontrol edilir.
+    """
+    on_chunk = None
+    if on_progress is not None:
+        # Hedef pencere ilk LONG_AUDIO_HEAD_WORDS kelimeden bir kez belirlenir
+        target = {}
         
-        if not tgt_words or not ayahs:
-            raise HTTPException(
-                status_code=400,
-                detail="Target window oluşturulamadı"
-            )
+        def resolve_target(rec_words):
+            if "window" not in target:
+                start = identify_start(rec_words) if len(rec_words) >= LONG_AUDIO_HEAD_WORDS else None
+                if start is None:
+                    return None, None
+                target["window"] = surah_target_window(start["surah"], start["ayah"], window_ayahs)
+            return target["window"]
         
-        # ASR word timestamps çıkar
-        try:
-            model = get_model()
-            asr_start = time.time()
-            rec_words = asr_words_with_timestamps(temp_wav, model)
-            asr_seconds = time.time() - asr_start
-            
-            if not rec_words:
-                raise HTTPException(
-                    status_code=400,
-                    detail="ASR word timestamps çıkarılamadı. Word timestamps desteklenmiyor olabilir."
-                )
-            
-        except Exception as e:
+        on_chunk = track_progress_reporter(on_progress, resolve_target, align=align_words_blockwise)
+    
+    asr_start = time.time()
+    # Long-audio pool'u (veya ASR worker'ları) offline havuzunun çekirdek payını kullanır
+    # (bkz. plan_topology): çalışırken offline slotlarının hepsi tutulur
+    async with admission_slot("offline", priority, slots=admission.limits["offline"]):
+        rec_words, long_info = await asr_long(wav_path, deadline, on_chunk)
+    asr_seconds = time.time() - asr_start
+    
+    if not rec_words:
+        raise HTTPException(
+            status_code=400,
+            detail="ASR word timestamps çıkarılamadı. Word timestamps desteklenmiyor olabilir."
+        )
+    
+    aligned = align_long_words(rec_words, window_ayahs, word_confidence)
+    
+    return {
+        "best": aligned["best"],
+        "window": aligned["window"],
+        "timeline": aligned["timeline"],
+        "transcript_ar": " ".join(w["raw"] for w in rec_words),
+        "meta": {
+            "note": "offline tracking via chunked parallel ASR + blockwise alignment",
+            "mode": "long",
+            "asr_seconds": round(asr_seconds, 2),
+            "align_seconds": aligned["align_seconds"],
+            "asr_words": len(rec_words),
+            "duration_seconds": long_info["audio_seconds"],
+            "chunks": long_info["chunks"],
+            "workers": long_info["workers"],
+            "budget": budget_report(deadline, deadline.stop_reason() if deadline else None)
+        }
+    }
+
+async def run_track(
+    wav_path: str,
+    window_ayahs: int = 12,
+    deadline: Optional[Deadline] = None,
+    long_audio: Optional[bool] = None,
+    on_progress: Optional[Callable[[Dict], None]] = None,
+    priority: int = PRIORITY_INTERACTIVE,
+    word_confidence: bool = False
+) -> Dict:
+    """
+    Track pipeline'ı (best match + ASR word timestamps + alignment + timeline)
+    
+    /track ve /jobs tarafından kullanılır.
+    
+    Args:
+        long_audio: Parçalı paralel mod; None ise LONG_AUDIO_SECONDS'tan uzun kayıtlarda otomatik
+        on_progress: İlerleme event'leri için thread-safe callback (decode edilen sn + kısmi timeline)
+        priority: Admission önceliği
+        word_confidence: Timeline ayetlerine kelime bazında hizalama güveni (confidence, words) eklenir
+    
+    Raises:
+        HTTPException: Pipeline adımlarından biri başarısızsa (400) veya sunucu yoğunsa (503)
+    """
+    if long_audio is None:
+        long_audio = audio_duration_seconds(wav_path) >= LONG_AUDIO_SECONDS
+    if long_audio:
+        return await track_long(
+            wav_path, window_ayahs, deadline=deadline, on_progress=on_progress, priority=priority,
+            word_confidence=word_confidence
+        )
+    
+    # Ses (worker havuzu varsa) bir kez paylaşılan belleğe yazılır; iki ASR geçişi de kullanır
+    async with asr_input(wav_path) as audio:
+        return await track_standard(audio, window_ayahs, deadline, on_progress, priority, word_confidence)
+
+async def track_standard(
+    audio: Union[str, SharedAudio],
+    window_ayahs: int,
+    deadline: Optional[Deadline],
+    on_progress: Optional[Callable[[Dict], None]],
+    priority: int,
+    word_confidence: bool = False
+) -> Dict:
+    """Kısa kayıt için /track: best match + word timestamps + alignment + timeline"""
+    # Önce best match bul (infer mantığı)
+    best_result = await find_best_match(audio, deadline=deadline, priority=priority)
+    best = best_result["best"]
+    
+    # Target window oluştur
+    tgt_words, ayahs = build_target_window(
+        best["surah_no"],
+        best["ayah_no"],
+        window_ayahs=window_ayahs
+    )
+    
+    if not tgt_words or not ayahs:
+        raise HTTPException(
+            status_code=400,
+            detail="Target window oluşturulamadı"
+        )
+    
+    on_segment = None
+    if on_progress is not None:
+        on_segment = track_progress_reporter(on_progress, lambda rec_words: (tgt_words, ayahs))
+    
+    # ASR word timestamps çıkar
+    try:
+        asr_start = time.time()
+        async with admission_slot("offline", priority):
+            rec_words = await asr_words(audio, deadline, on_segment)
+        asr_seconds = time.time() - asr_start
+        # Word timestamps geçişi bütçe yüzünden kesildiyse
+        words_stop_reason = deadline.stop_reason() if deadline else None
+        
+        if not rec_words:
             raise HTTPException(
                 status_code=400,
-                detail=f"ASR word timestamps hatası: {str(e)}"
+                detail="ASR word timestamps çıkarılamadı. Word timestamps desteklenmiyor olabilir."
             )
         
-        # Sequence alignment
-        try:
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"ASR word timestamps hatası: {str(e)}"
+        )
+    
+    # Sequence alignment
+    try:
+        with stage_timer("align_words"):
             pairs = align_words(rec_words, tgt_words)
-            logger.info(f"Alignment tamamlandı: {len(pairs)} pair")
-        except Exception as e:
+        logger.info(f"Alignment tamamlandı: {len(pairs)} pair")
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Alignment hatası: {str(e)}"
+        )
+    
+    # Timeline oluştur
+    try:
+        with stage_timer("build_ayah_timeline"):
+            timeline = build_ayah_timeline(pairs, rec_words, tgt_words, ayahs, word_confidence)
+        
+        if not timeline:
             raise HTTPException(
                 status_code=400,
-                detail=f"Alignment hatası: {str(e)}"
+                detail="Timeline oluşturulamadı"
             )
-        
-        # Timeline oluştur
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Timeline oluşturma hatası: {str(e)}"
+        )
+    
+    return {
+        "best": best,
+        "window": {
+            "start_surah": best["surah_no"],
+            "start_ayah": best["ayah_no"],
+            "count": len(ayahs)
+        },
+        "timeline": timeline,
+        "transcript_ar": best_result["transcript_ar"],
+        "meta": {
+            "note": "offline tracking via ASR-word alignment",
+            "mode": "standard",
+            "asr_seconds": round(asr_seconds, 2),
+            "asr_words": len(rec_words),
+            "budget": budget_report(
+                deadline,
+                words_stop_reason or best_result["budget"]["stop_reason"]
+            )
+        }
+    }
+
+@app.post("/track")
+async def track(
+    request: Request,
+    audio: UploadFile = File(...),
+    window_ayahs: int = 12,
+    deadline_ms: Optional[int] = None,
+    long_audio: Optional[bool] = None,
+    word_confidence: bool = False
+):
+    """
+    Ses kaydını alır, ASR word timestamps çıkarır ve ayet bazında timeline oluşturur
+    
+    deadline_ms: İki ASR geçişi için toplam decode bütçesi (varsayılan INFER_DEADLINE_SECONDS)
+    long_audio: Parçalı paralel mod; None ise LONG_AUDIO_SECONDS'tan uzun kayıtlarda otomatik
+    word_confidence: Timeline ayetlerine kelime bazında hizalama güveni eklenir
+    """
+    start_time = time.time()
+    
+    # Kuran yüklü mü kontrol et
+    if not check_quran_loaded():
+        raise HTTPException(
+            status_code=400,
+            detail="Quran text not found. Run: python scripts/fetch_quran_text.py"
+        )
+    
+    admission_check("offline", PRIORITY_INTERACTIVE)
+    
+    temp_input = None
+    temp_wav = None
+    deadline = new_deadline(deadline_ms)
+    watcher = None
+    
+    try:
+        # Audio'yu WAV'a çevir
         try:
-            timeline = build_ayah_timeline(pairs, rec_words, tgt_words, ayahs)
-            
-            if not timeline:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Timeline oluşturulamadı"
-                )
+            temp_input, temp_wav = await process_audio_to_wav(audio)
+            audio_seconds = time.time() - start_time
         except Exception as e:
             raise HTTPException(
                 status_code=400,
-                detail=f"Timeline oluşturma hatası: {str(e)}"
+                detail=f"Ses dönüştürme hatası: {str(e)}"
             )
         
-        total_seconds = time.time() - start_time
+        # Client koparsa decode iptal edilir
+        watcher = asyncio.create_task(cancel_on_disconnect(request, deadline))
         
-        # Sonucu döndür
-        return {
-            "best": best,
-            "window": {
-                "start_surah": best["surah_no"],
-                "start_ayah": best["ayah_no"],
-                "count": len(ayahs)
-            },
-            "timeline": timeline,
-            "transcript_ar": best_result["transcript_ar"],
-            "meta": {
-                "note": "offline tracking via ASR-word alignment",
-                "audio_seconds": round(audio_seconds, 2),
-                "asr_seconds": round(asr_seconds, 2),
-                "total_seconds": round(total_seconds, 2),
-                "asr_words": len(rec_words)
-            }
-        }
+        result = await run_track(
+            temp_wav,
+            window_ayahs=window_ayahs,
+            deadline=deadline,
+            long_audio=long_audio,
+            word_confidence=word_confidence
+        )
+        
+        result["meta"]["audio_seconds"] = round(audio_seconds, 2)
+        result["meta"]["total_seconds"] = round(time.time() - start_time, 2)
+        return json_response(result)
         
     except HTTPException:
         raise
@@ -769,6 +1796,9 @@ async def track(audio: UploadFile = File(...), window_ayahs: int = 12):
             detail=f"Sunucu hatası: {str(e)}"
         )
     finally:
+        if watcher is not None:
+            watcher.cancel()
+        
         # Temp dosyaları temizle
         for temp_file in [temp_input, temp_wav]:
             if temp_file and os.path.exists(temp_file):
@@ -777,295 +1807,150 @@ async def track(audio: UploadFile = File(...), window_ayahs: int = 12):
                 except:
                     pass
 
-@app.websocket("/ws/live")
-async def websocket_live(websocket: WebSocket):
+async def run_job(job: Dict, report: Callable[[Dict], None], deadline: Deadline) -> Dict:
     """
-    WebSocket live tracking endpoint
-    Client PCM stream gönderir, server timeline döner
-    """
-    global _live_connection_active
+    JobManager runner: iş girdisini WAV'a çevirir ve ilgili pipeline'ı çalıştırır
     
-    # Tek bağlantı kontrolü
-    if _live_connection_active:
-        await websocket.close(code=1008, reason="Another connection is active")
-        return
+    "infer" işleri ara adayları ("candidate"), "track" işleri decode edilen süre ve
+    kısmi timeline'ı ("progress") report() ile yayınlar.
+    """
+    params = job["params"]
+    loop = asyncio.get_running_loop()
     
-    await websocket.accept()
-    _live_connection_active = True
+    try:
+        with stage_timer("ffmpeg"):
+            temp_wav = await loop.run_in_executor(None, convert_to_wav, job["input_path"])
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Ses dönüştürme hatası: {str(e)}")
     
     try:
-        # Kuran yüklü mü kontrol et
-        if not check_quran_loaded():
-            await websocket.send_json({
-                "type": "error",
-                "message": "Quran text not found. Run: python scripts/fetch_quran_text.py"
-            })
-            await websocket.close()
-            return
+        report({
+            "type": "progress",
+            "decoded_seconds": 0.0,
+            "audio_seconds": round(audio_duration_seconds(temp_wav), 2)
+        })
         
-        # Model yükle
-        model = get_model_live()
-        
-        # Config (ilk mesajdan gelecek)
-        config = None
-        sample_rate = 16000
-        window_sec = 14
-        target_ayahs = 12
-        
-        # Ring buffer
-        max_buffer_seconds = 45
-        buffer = bytearray()
-        total_samples_received = 0
-        rec_words_global: List[Dict] = []  # Global word listesi
-        
-        # State
-        best_match: Optional[Dict] = None
-        tgt_words: List[Dict] = []
-        ayahs: List[Dict] = []
-        last_update_time = time.monotonic()
-        update_interval = 1.0  # 1 saniye
-        
-        # Temp dosya listesi (temizleme için)
-        temp_wav_files = []
+        if job["kind"] == "infer":
+            return await find_best_match(
+                temp_wav,
+                cascade=(params.get("mode") == "cascade"),
+                deadline=deadline,
+                early_exit=params.get("early_exit", True),
+                on_candidate=report,
+                priority=PRIORITY_BACKGROUND
+            )
         
-        while True:
+        return await run_track(
+            temp_wav,
+            window_ayahs=params.get("window_ayahs", 12),
+            deadline=deadline,
+            long_audio=params.get("long_audio"),
+            on_progress=report,
+            priority=PRIORITY_BACKGROUND,
+            word_confidence=params.get("word_confidence", False)
+        )
+    finally:
+        if os.path.exists(temp_wav):
             try:
-                # Mesaj al
-                message = await websocket.receive()
-                
-                if "text" in message:
-                    # JSON mesaj
-                    data = json.loads(message["text"])
-                    
-                    if data.get("type") == "start":
-                        # Config al
-                        config = data
-                        sample_rate = data.get("sample_rate", 16000)
-                        window_sec = data.get("window_sec", 14)
-                        target_ayahs = data.get("target_ayahs", 12)
-                        
-                        await websocket.send_json({
-                            "type": "status",
-                            "state": "warming_up",
-                            "elapsed_ms": 0
-                        })
-                        
-                    elif data.get("type") == "stop":
-                        break
-                
-                elif "bytes" in message:
-                    # PCM binary data
-                    pcm_bytes = message["bytes"]
-                    buffer.extend(pcm_bytes)
-                    total_samples_received += len(pcm_bytes) // 2  # int16 = 2 bytes
-                    
-                    # Buffer overflow kontrolü
-                    max_samples = max_buffer_seconds * sample_rate
-                    if len(buffer) > max_samples * 2:
-                        # Eski veriyi sil (son max_samples kadar tut)
-                        keep_bytes = max_samples * 2
-                        buffer = buffer[-keep_bytes:]
-                        total_samples_received = max_samples
-                    
-                    # Update loop (her 1 saniyede bir)
-                    current_time = time.monotonic()
-                    elapsed_ms = int((total_samples_received / sample_rate) * 1000)
-                    
-                    if current_time - last_update_time >= update_interval:
-                        last_update_time = current_time
-                        
-                        # Warming up (ilk 4-6 saniye)
-                        if elapsed_ms < 6000:
-                            await websocket.send_json({
-                                "type": "status",
-                                "state": "warming_up",
-                                "elapsed_ms": elapsed_ms
-                            })
-                            continue
-                        
-                        # Window samples hesapla
-                        window_samples = int(window_sec * sample_rate)
-                        window_bytes = window_samples * 2
-                        
-                        if len(buffer) < window_bytes:
-                            # Yeterli veri yok
-                            continue
-                        
-                        # Son window_sec kadar sample al
-                        window_buffer = buffer[-window_bytes:]
-                        
-                        # WAV dosyasına yaz
-                        samples_int16 = np.frombuffer(window_buffer, dtype=np.int16)
-                        fd, temp_wav = tempfile.mkstemp(suffix='.wav')
-                        os.close(fd)
-                        temp_wav_files.append(temp_wav)
-                        
-                        try:
-                            write_wav_int16(temp_wav, samples_int16, sample_rate)
-                            
-                            # ASR yap
-                            segments, info = model.transcribe(
-                                temp_wav,
-                                language="ar",
-                                beam_size=2,
-                                word_timestamps=True,
-                                vad_filter=True
-                            )
-                            
-                            # Transcript ve words çıkar
-                            transcript_parts = []
-                            rec_words_window = []
-                            
-                            global_offset_ms = elapsed_ms - (window_sec * 1000)
-                            
-                            for segment in segments:
-                                transcript_parts.append(segment.text.strip())
-                                
-                                for word_info in segment.words:
-                                    word_text = word_info.word.strip()
-                                    if not word_text:
-                                        continue
-                                    
-                                    word_norm = normalize_ar(word_text)
-                                    
-                                    # Global timestamp'e çevir
-                                    start_ms = int((word_info.start * 1000) + global_offset_ms)
-                                    end_ms = int((word_info.end * 1000) + global_offset_ms)
-                                    
-                                    rec_words_window.append({
-                                        "w": word_norm,
-                                        "raw": word_text,
-                                        "start_ms": start_ms,
-                                        "end_ms": end_ms
-                                    })
-                            
-                            transcript_partial = " ".join(transcript_parts)
-                            
-                            # Best match bul (henüz yoksa)
-                            if best_match is None:
-                                transcript_norm = normalize_ar(transcript_partial)
-                                if transcript_norm and transcript_norm.strip():
-                                    verses = get_verses()
-                                    matches = match_verses(transcript_norm, verses, top_k=1)
-                                    if matches:
-                                        best_match = {
-                                            "surah_no": matches[0]["surah"],
-                                            "ayah_no": matches[0]["ayah"],
-                                            "text_ar": matches[0]["text_ar"],
-                                            "score": matches[0]["score"]
-                                        }
-                                        
-                                        # Target window oluştur
-                                        tgt_words, ayahs = build_target_window(
-                                            best_match["surah_no"],
-                                            best_match["ayah_no"],
-                                            window_ayahs=target_ayahs
-                                        )
-                            
-                            # Global word listesini güncelle (son 25 saniye)
-                            cutoff_ms = elapsed_ms - 25000
-                            rec_words_global = [
-                                w for w in rec_words_global
-                                if w["end_ms"] >= cutoff_ms
-                            ]
-                            
-                            # Yeni words ekle (duplike kontrolü)
-                            for new_word in rec_words_window:
-                                # Aynı start_ms varsa ekleme
-                                if not any(
-                                    abs(w["start_ms"] - new_word["start_ms"]) < 50
-                                    for w in rec_words_global
-                                ):
-                                    rec_words_global.append(new_word)
-                            
-                            # Alignment ve timeline (best match varsa)
-                            timeline = []
-                            current_ayah = None
-                            state = "tracking"
-                            
-                            if best_match and tgt_words and rec_words_global:
-                                try:
-                                    # Alignment
-                                    pairs = align_words(rec_words_global, tgt_words)
-                                    
-                                    # Timeline
-                                    timeline = build_ayah_timeline(
-                                        pairs, rec_words_global, tgt_words, ayahs
-                                    )
-                                    
-                                    # Current ayah bul
-                                    for ayah in timeline:
-                                        if (
-                                            ayah["start_ms"] is not None and
-                                            ayah["end_ms"] is not None and
-                                            elapsed_ms >= ayah["start_ms"] and
-                                            elapsed_ms < ayah["end_ms"]
-                                        ):
-                                            current_ayah = ayah
-                                            break
-                                    
-                                    # Bulunamazsa matched_ratio en yüksek olanı seç
-                                    if current_ayah is None and timeline:
-                                        current_ayah = max(
-                                            timeline,
-                                            key=lambda x: x.get("matched_ratio", 0)
-                                        )
-                                        state = "uncertain"
-                                    
-                                except Exception as e:
-                                    logger.error(f"Alignment/timeline hatası: {e}")
-                            
-                            # Client'a gönder
-                            await websocket.send_json({
-                                "type": "update",
-                                "elapsed_ms": elapsed_ms,
-                                "best": best_match,
-                                "current": current_ayah,
-                                "timeline": timeline,
-                                "transcript_partial": transcript_partial,
-                                "state": state
-                            })
-                            
-                        except Exception as e:
-                            logger.error(f"ASR/timeline hatası: {e}")
-                            await websocket.send_json({
-                                "type": "error",
-                                "message": f"Processing error: {str(e)}"
-                            })
-                        finally:
-                            # Temp WAV dosyasını sil
-                            if os.path.exists(temp_wav):
-                                try:
-                                    os.remove(temp_wav)
-                                    if temp_wav in temp_wav_files:
-                                        temp_wav_files.remove(temp_wav)
-                                except:
-                                    pass
-                
-            except WebSocketDisconnect:
-                break
-            except Exception as e:
-                logger.error(f"WebSocket hatası: {e}", exc_info=True)
-                await websocket.send_json({
-                    "type": "error",
-                    "message": str(e)
-                })
+                os.remove(temp_wav)
+            except:
+                pass
+
+def format_sse(event: Dict) -> str:
+    """Server-sent event satırı (event adı = type)"""
+    return f"event: {event['type']}\ndata: {dumps_timed(event)}\n\n"
+
+@app.post("/jobs", status_code=202)
+async def create_job(
+    audio: UploadFile = File(...),
+    kind: str = "track",
+    window_ayahs: int = 12,
+    long_audio: Optional[bool] = None,
+    mode: str = "base",
+    early_exit: bool = True,
+    deadline_ms: Optional[int] = None,
+    word_confidence: bool = False
+):
+    """
+    Ses kaydını kuyruğa alır ve hemen iş ID'si döndürür (202)
+    
+    kind: "track" (/track parametreleri) veya "infer" (/infer parametreleri)
+    deadline_ms: İş başına decode bütçesi (varsayılan: sınırsız; iş DELETE ile iptal edilebilir)
+    """
+    if kind not in ("track", "infer"):
+        raise HTTPException(status_code=400, detail="kind must be 'track' or 'infer'")
+    if mode not in ("base", "cascade"):
+        raise HTTPException(status_code=400, detail="mode must be 'base' or 'cascade'")
+    
+    if not check_quran_loaded():
+        raise HTTPException(
+            status_code=400,
+            detail="Quran text not found. Run: python scripts/fetch_quran_text.py"
+        )
+    
+    if kind == "track":
+        params = {"window_ayahs": window_ayahs, "long_audio": long_audio, "word_confidence": word_confidence}
+    else:
+        params = {"mode": mode, "early_exit": early_exit}
+    if deadline_ms:
+        params["deadline_seconds"] = deadline_ms / 1000
+    
+    content = await audio.read()
+    suffix = Path(audio.filename).suffix if audio.filename else ".webm"
+    
+    try:
+        job = job_manager.submit(kind, params, content, suffix=suffix or ".webm")
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=f"İş kuyruğu dolu: {str(e)}")
+    
+    return {
+        **job,
+        "links": {
+            "status": f"/jobs/{job['id']}",
+            "events": f"/jobs/{job['id']}/events"
+        }
+    }
+
+@app.get("/jobs")
+async def list_jobs(limit: int = 50):
+    """Son işlerin özeti (sonuçlar hariç)"""
+    return {"jobs": job_manager.list(limit=limit)}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """İş durumu, son ilerleme ve (bittiyse) sonuç"""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="İş bulunamadı")
+    return job_manager.public(job)
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(request: Request, job_id: str):
+    """
+    İşin server-sent events akışı
+    
+    Event'ler: snapshot (bağlanınca anlık durum), status, progress, candidate (infer),
+    en son done / error / cancelled. Bağlantı koparsa tekrar bağlanılabilir; iş devam eder.
+    """
+    if job_manager.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="İş bulunamadı")
+    
+    async def stream():
+        async for event in job_manager.events(job_id):
+            if await request.is_disconnected():
                 break
-        
-    except Exception as e:
-        logger.error(f"WebSocket connection hatası: {e}", exc_info=True)
-    finally:
-        _live_connection_active = False
-        
-        # Temp dosyaları temizle
-        for temp_wav in temp_wav_files:
-            if os.path.exists(temp_wav):
-                try:
-                    os.remove(temp_wav)
-                except:
-                    pass
-        
-        try:
-            await websocket.close()
-        except:
-            pass
+            yield format_sse(event)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """İşi iptal eder (kuyruktaysa hemen, çalışıyorsa bir sonraki segmentte)"""
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="İş bulunamadı")
+    return job
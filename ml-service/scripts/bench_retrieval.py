@@ -0,0 +1,203 @@
+"""
+İki aşamalı ayet eşleştirmeyi (utils/verse_retrieval.py) tam taramayla (match_verses) karşılaştırır.
+
+Sorgular Kuran metninden rastgele kelime pencereleridir (ayet sınırını geçebilir); --noise ile
+kelimelerin bir kısmında tek harf değiştirilerek ASR hatası taklit edilir. Her top_blocks
+değeri için:
+- gecikme (p50 / p95) ve ince aşamaya giren ortalama ayet sayısı
+- top-1 uyuşma (aynı ayet) ve top-1 skor uyuşması (aynı en iyi skor; eşit skorlu farklı
+  ayetler de sayılır)
+- recall@k: tam taramanın top-k ayetlerinden kaçının bulunduğu
+- doğru başlangıç: top-1'in sorgunun başladığı ayet olma oranı (tam tarama da raporlanır)
+
+Kullanım:
+    python scripts/bench_retrieval.py
+    python scripts/bench_retrieval.py --queries 300 --blocks 4,8,12,24 --noise 0.3
+    python scripts/bench_retrieval.py --block-ayahs 8 --json > retrieval.json
+    python scripts/bench_retrieval.py --min-words 3 --short-verse-chars 0 --min-query-chars 0
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Proje root dizinini bul (utils import edilebilsin)
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+ARABIC_LETTERS = "ابتثجحخدذرزسشصضطظعغفقكلمنهوي"
+
+def make_queries(
+    n: int,
+    min_words: int,
+    max_words: int,
+    noise: float,
+    seed: int
+) -> List[Tuple[str, Tuple[int, int]]]:
+    """(sorgu, (sure, başlangıç ayeti)) listesi; pencere sure sınırını geçmez"""
+    from utils.quran_index import get_corpus_words
+    corpus_words, _ = get_corpus_words()
+    rng = random.Random(seed)
+    
+    def corrupt(word: str) -> str:
+        if len(word) > 2 and rng.random() < noise:
+            i = rng.randrange(len(word))
+            return word[:i] + rng.choice(ARABIC_LETTERS) + word[i + 1:]
+        return word
+    
+    queries = []
+    while len(queries) < n:
+        start = rng.randrange(len(corpus_words))
+        length = rng.randint(min_words, max_words)
+        surah_no = corpus_words[start]["surah_no"]
+        words = [w for w in corpus_words[start:start + length] if w["surah_no"] == surah_no]
+        if len(words) < min_words:
+            continue
+        queries.append((
+            " ".join(corrupt(w["w"]) for w in words),
+            (surah_no, corpus_words[start]["ayah_no"])
+        ))
+    return queries
+
+def run(
+    queries: List[Tuple[str, Tuple[int, int]]],
+    blocks: List[int],
+    top_k: int,
+    block_ayahs: int,
+    short_verse_chars: int,
+    min_query_chars: int
+) -> Dict:
+    from utils.quran_index import get_verses, get_corpus_words, match_verses
+    from utils.verse_retrieval import BlockRetriever
+    
+    verses = get_verses()
+    corpus_words, offsets = get_corpus_words()
+    build_start = time.perf_counter()
+    retriever = BlockRetriever(
+        verses, corpus_words, offsets,
+        block_ayahs=block_ayahs,
+        short_verse_chars=short_verse_chars,
+        min_query_chars=min_query_chars
+    )
+    build_ms = (time.perf_counter() - build_start) * 1000
+    
+    def key(m: Dict) -> Tuple[int, int]:
+        return m["surah"], m["ayah"]
+    
+    exhaustive, latencies = [], []
+    for query, _ in queries:
+        t0 = time.perf_counter()
+        exhaustive.append(match_verses(query, verses, top_k=top_k))
+        latencies.append((time.perf_counter() - t0) * 1000)
+    
+    rows = [{
+        "top_blocks": 0,
+        "candidates": len(verses),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        "top1_same": 1.0,
+        "top1_score_same": 1.0,
+        "recall_at_k": 1.0,
+        "start_correct": round(
+            sum(key(e[0]) == truth for e, (_, truth) in zip(exhaustive, queries)) / len(queries), 3
+        )
+    }]
+    
+    for top_blocks in blocks:
+        latencies, candidates = [], []
+        top1 = top1_score = recalled = correct = 0
+        for (query, truth), expected in zip(queries, exhaustive):
+            t0 = time.perf_counter()
+            got = retriever.match(query, top_k, top_blocks)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            
+            cand = retriever.candidate_verses(query, top_blocks)
+            candidates.append(len(verses) if cand is None else len(cand))
+            top1 += key(got[0]) == key(expected[0])
+            top1_score += got[0]["score"] == expected[0]["score"]
+            recalled += len({key(m) for m in got} & {key(m) for m in expected})
+            correct += key(got[0]) == truth
+        
+        n = len(queries)
+        rows.append({
+            "top_blocks": top_blocks,
+            "candidates": round(float(np.mean(candidates)), 1),
+            "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+            "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+            "top1_same": round(top1 / n, 3),
+            "top1_score_same": round(top1_score / n, 3),
+            "recall_at_k": round(recalled / sum(len(e) for e in exhaustive), 3),
+            "start_correct": round(correct / n, 3)
+        })
+    
+    return {
+        "queries": len(queries),
+        "top_k": top_k,
+        "block_ayahs": block_ayahs,
+        "blocks": retriever.n_blocks,
+        "build_ms": round(build_ms, 1),
+        "rows": rows
+    }
+
+def print_summary(summary: Dict) -> None:
+    print(
+        f"{summary['queries']} sorgu, top_k={summary['top_k']}, "
+        f"{summary['blocks']} blok ({summary['block_ayahs']} ayet), indeks {summary['build_ms']:.0f} ms\n"
+    )
+    print(f"{'top_blocks':>10}{'ayet':>8}{'p50 ms':>9}{'p95 ms':>9}{'top1':>7}{'skor':>7}{'recall@k':>10}{'doğru':>8}")
+    for row in summary["rows"]:
+        name = "tam" if row["top_blocks"] == 0 else str(row["top_blocks"])
+        print(
+            f"{name:>10}{row['candidates']:>8}{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}"
+            f"{row['top1_same']:>7.2f}{row['top1_score_same']:>7.2f}{row['recall_at_k']:>10.2f}"
+            f"{row['start_correct']:>8.2f}"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description="İki aşamalı ayet eşleştirme benchmark'ı (tam taramaya karşı)")
+    parser.add_argument("--queries", type=int, default=200, help="Sorgu sayısı (default: 200)")
+    parser.add_argument("--min-words", type=int, default=5)
+    parser.add_argument("--max-words", type=int, default=20)
+    parser.add_argument("--noise", type=float, default=0.2,
+                        help="Kelime başına tek harf hatası olasılığı (default: 0.2)")
+    parser.add_argument("--blocks", default="4,8,12,24,48", help="Denenecek top_blocks değerleri")
+    parser.add_argument("--block-ayahs", type=int, default=16, help="Blok boyutu (ayet)")
+    parser.add_argument("--short-verse-chars", type=int, default=30,
+                        help="Her zaman skorlanan kısa ayetlerin uzunluğu (0 = kapalı)")
+    parser.add_argument("--min-query-chars", type=int, default=40,
+                        help="Bu uzunluğa kadar sorgularda tam tarama (0 = kapalı)")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Özeti JSON olarak yazdır")
+    args = parser.parse_args()
+    
+    from utils.quran_index import get_verses
+    if not get_verses():
+        print("✗ Kuran metni bulunamadı. Önce: python scripts/fetch_quran_text.py")
+        return 1
+    
+    queries = make_queries(args.queries, args.min_words, args.max_words, args.noise, args.seed)
+    summary = run(
+        queries,
+        [int(b) for b in args.blocks.split(",") if b.strip()],
+        args.top_k,
+        args.block_ayahs,
+        args.short_verse_chars,
+        args.min_query_chars
+    )
+    
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+    else:
+        print_summary(summary)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,291 @@
+"""
+Kayıt arşivini toplu olarak indeksler: klasördeki her ses dosyası için ayet timeline'ı çıkarır.
+
+/track ile aynı pipeline kullanılır (find_best_match + build_target_window + align_words +
+build_ayah_timeline; uzun kayıtlarda sure ölçeğinde blok bazında alignment). Dosyalar
+çekirdek sayısına göre boyutlandırılmış bir process pool'da işlenir.
+
+Çıktı JSONL'dir (her satır bir dosya); aynı dosya checkpoint olarak kullanılır, yarıda
+kalan bir çalıştırma aynı komutla kaldığı yerden devam eder. --format parquet ile
+sonunda Parquet dosyası da yazılır (pyarrow gerekir).
+
+Kullanım:
+    python scripts/index_archive.py /data/recitations -o index.jsonl
+    python scripts/index_archive.py /data/recitations -o index.parquet --format parquet --workers 4
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterator, Set, Tuple
+
+# Proje root dizinini bul (main ve utils import edilebilsin)
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".m4a", ".aac", ".ogg", ".opus", ".webm", ".flac"}
+
+# Worker process başına ayarlar (initializer ile)
+_window_ayahs = 12
+
+def iter_audio_files(root: Path) -> Iterator[Path]:
+    """Klasörü (alt klasörler dahil) dolaşır, ses dosyalarını sıralı döndürür"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if Path(name).suffix.lower() in AUDIO_EXTENSIONS:
+                yield Path(dirpath) / name
+
+def file_key(path: Path, root: Path) -> Tuple[str, int, int]:
+    """Checkpoint anahtarı: (göreli yol, boyut, mtime) - değişen dosya yeniden işlenir"""
+    stat = path.stat()
+    return str(path.relative_to(root)), stat.st_size, int(stat.st_mtime)
+
+def load_checkpoint(output_jsonl: Path, retry_errors: bool) -> Set[Tuple[str, int, int]]:
+    """Önceki çalıştırmada işlenmiş dosyaların anahtarları (yarım yazılmış son satır atlanır)"""
+    done = set()
+    if not output_jsonl.exists():
+        return done
+    
+    with open(output_jsonl, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if retry_errors and record.get("status") != "ok":
+                continue
+            done.add((record["path"], record["size"], record["mtime"]))
+    return done
+
+def _init_worker(cpu_threads: int, window_ayahs: int):
+    """Worker process initializer: model thread sayısını çekirdek payına göre ayarlar"""
+    global _window_ayahs
+    _window_ayahs = window_ayahs
+    
+    logging.basicConfig(level=logging.WARNING)
+    import main
+    logging.getLogger().setLevel(logging.WARNING)
+    
+    # Worker'lar çekirdekleri paylaşır (oversubscription olmasın); model ilk dosyada yüklenir
+    for spec in main.model_manager.specs.values():
+        spec["cpu_threads"] = cpu_threads
+        spec["num_workers"] = 1
+        spec.pop("cpu_affinity", None)
+
+def index_file(path: str) -> Dict:
+    """
+    Tek dosyayı işler (worker process'inde)
+    
+    Returns:
+        {"status": "ok", "duration_seconds", "best", "window", "timeline", "meta"}
+        veya {"status": "error", "error", "duration_seconds"}
+    """
+    import main
+    from utils.audio import convert_to_wav
+    from utils.long_audio import audio_duration_seconds
+    from utils.tracking import asr_words_with_timestamps
+    from utils.admission import PRIORITY_BACKGROUND
+    
+    start = time.time()
+    wav_path = None
+    duration = None
+    
+    try:
+        wav_path = convert_to_wav(path)
+        duration = audio_duration_seconds(wav_path)
+        
+        if duration >= main.LONG_AUDIO_SECONDS:
+            # Uzun kayıt: tek word-timestamps geçişi + blok bazında alignment
+            # (paralellik dosyalar arasında; process pool içinde ikinci bir pool açılmaz)
+            rec_words = asr_words_with_timestamps(wav_path, main.get_model())
+            if not rec_words:
+                raise RuntimeError("ASR word timestamps çıkarılamadı")
+            result = main.align_long_words(rec_words, _window_ayahs)
+            result["meta"] = {"mode": "long", "asr_words": len(rec_words)}
+        else:
+            result = asyncio.run(main.run_track(
+                wav_path,
+                window_ayahs=_window_ayahs,
+                deadline=None,
+                long_audio=False,
+                priority=PRIORITY_BACKGROUND
+            ))
+        
+        return {
+            "status": "ok",
+            "duration_seconds": round(duration, 2),
+            "best": result["best"],
+            "window": result["window"],
+            "timeline": result["timeline"],
+            "meta": {**result.get("meta", {}), "processing_seconds": round(time.time() - start, 2)}
+        }
+    except Exception as e:
+        # HTTPException gibi hatalarda detail kullanılır
+        return {
+            "status": "error",
+            "error": getattr(e, "detail", None) or str(e),
+            "duration_seconds": round(duration, 2) if duration is not None else None
+        }
+    finally:
+        if wav_path and os.path.exists(wav_path):
+            try:
+                os.remove(wav_path)
+            except OSError:
+                pass
+
+def write_parquet(output_jsonl: Path, output_parquet: Path) -> bool:
+    """JSONL checkpoint'ini Parquet'e çevirir (pyarrow opsiyonel)"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("✗ Parquet için pyarrow gerekli: pip install pyarrow (JSONL çıktısı hazır)")
+        return False
+    
+    with open(output_jsonl, "r", encoding="utf-8") as f:
+        records = []
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    
+    # İç içe alanlar (timeline, best) Parquet struct/list tiplerine dönüşür; meta JSON string
+    for record in records:
+        record["meta"] = json.dumps(record.get("meta"), ensure_ascii=False) if record.get("meta") else None
+    
+    pq.write_table(pa.Table.from_pylist(records), output_parquet)
+    print(f"✓ Parquet yazıldı: {output_parquet} ({len(records)} kayıt)")
+    return True
+
+def format_hours(seconds: float) -> str:
+    return f"{seconds / 3600:.2f} sa"
+
+def main():
+    parser = argparse.ArgumentParser(description="Kayıt arşivini toplu indeksler (ayet timeline'ları)")
+    parser.add_argument("input_dir", help="Ses dosyalarının bulunduğu klasör (alt klasörler dahil)")
+    parser.add_argument("-o", "--output", required=True, help="Çıktı dosyası (.jsonl veya .parquet)")
+    parser.add_argument("--format", choices=["jsonl", "parquet"], default=None,
+                        help="Çıktı formatı (default: uzantıdan)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Process sayısı (default: çekirdek sayısının yarısı)")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="Worker başına model thread sayısı (default: çekirdek / worker)")
+    parser.add_argument("--window-ayahs", type=int, default=12, help="Kısa kayıtlar için hedef pencere")
+    parser.add_argument("--retry-errors", action="store_true", help="Hatalı kayıtları yeniden dene")
+    args = parser.parse_args()
+    
+    root = Path(args.input_dir).resolve()
+    if not root.is_dir():
+        print(f"✗ Klasör bulunamadı: {root}")
+        return 1
+    
+    output = Path(args.output)
+    fmt = args.format or ("parquet" if output.suffix == ".parquet" else "jsonl")
+    # JSONL her zaman yazılır (checkpoint); parquet sonunda bundan üretilir
+    output_jsonl = output if fmt == "jsonl" else output.with_suffix(".jsonl")
+    
+    from utils.cpu_topology import usable_cpus
+    cores = len(usable_cpus())
+    workers = args.workers or max(1, cores // 2)
+    threads = args.threads or max(1, cores // workers)
+    
+    done = load_checkpoint(output_jsonl, args.retry_errors)
+    pending = []
+    skipped = 0
+    for path in iter_audio_files(root):
+        key = file_key(path, root)
+        if key in done:
+            skipped += 1
+        else:
+            pending.append((path, key))
+    
+    print(f"Arşiv: {root}")
+    print(f"Dosya: {len(pending) + skipped} ({skipped} checkpoint'ten atlandı, {len(pending)} işlenecek)")
+    print(f"Pool: {workers} worker x {threads} thread")
+    
+    start = time.time()
+    audio_seconds = 0.0
+    processed = 0
+    failed = 0
+    
+    with open(output_jsonl, "a", encoding="utf-8") as out, ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(threads, args.window_ayahs)
+    ) as pool:
+        queue = iter(pending)
+        in_flight = {}
+        
+        def submit_next() -> bool:
+            item = next(queue, None)
+            if item is None:
+                return False
+            path, key = item
+            in_flight[pool.submit(index_file, str(path))] = (path, key)
+            return True
+        
+        # Bellekte en fazla 2 x workers iş tutulur
+        for _ in range(workers * 2):
+            if not submit_next():
+                break
+        
+        try:
+            while in_flight:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    path, (rel_path, size, mtime) = in_flight.pop(future)
+                    record = {"path": rel_path, "size": size, "mtime": mtime, **future.result()}
+                    
+                    # Her kayıt hemen diske (checkpoint)
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    out.flush()
+                    
+                    processed += 1
+                    audio_seconds += record.get("duration_seconds") or 0.0
+                    wall = time.time() - start
+                    if record["status"] == "ok":
+                        first = record["timeline"][0] if record["timeline"] else {}
+                        print(
+                            f"[{processed}/{len(pending)}] ✓ {rel_path} "
+                            f"({record['duration_seconds']:.0f} sn, "
+                            f"{first.get('surah_no')}:{first.get('ayah_no')}, "
+                            f"{len(record['timeline'])} ayet) - "
+                            f"{audio_seconds / wall:.1f} ses-sa/sa"
+                        )
+                    else:
+                        failed += 1
+                        error_line = (str(record["error"]).splitlines() or [""])[0]
+                        print(f"[{processed}/{len(pending)}] ✗ {rel_path}: {error_line}")
+                    
+                    submit_next()
+        except KeyboardInterrupt:
+            print("\nDurduruldu; aynı komutla kaldığı yerden devam edilebilir.")
+            for future in in_flight:
+                future.cancel()
+            return 130
+    
+    wall = time.time() - start
+    print(f"\n✓ {processed} dosya işlendi ({failed} hata), {wall:.0f} sn")
+    if wall > 0:
+        print(
+            f"✓ Throughput: {format_hours(audio_seconds)} ses / {format_hours(wall)} = "
+            f"{audio_seconds / wall:.1f} ses-saati / duvar-saati"
+        )
+    print(f"✓ Çıktı: {output_jsonl}")
+    
+    if fmt == "parquet":
+        write_parquet(output_jsonl, output)
+    
+    return 0 if failed == 0 else 2
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""
+Kayıtlı live oturumunu (LIVE_RECORD_DIR altındaki .qlr dosyası) tick tick yeniden çalıştırır.
+
+/ws/live ile aynı takip kodu (utils/live_tracker.py) kullanılır. Varsayılan olarak her tick'in
+kayıttaki ASR kelimeleri verilir (model gerekmez; eşleştirme / alignment / timeline
+deterministik olarak tekrar üretilir). --asr model ile kayıttaki PCM'den aynı pencereler live
+modeliyle yeniden decode edilir.
+
+Çıktı: kayıttaki kararlarla (best, current, state, timeline) uyuşma ve span bazında süreler
+(replay ile kayıt anındaki süreler yan yana). --json özeti makine tarafından okunur biçimde
+verir; aynı kayıt üzerinde değişiklik öncesi/sonrası karşılaştırmak için kullanılır.
+
+Kullanım:
+    python scripts/replay_session.py recordings/20261019-101500-ab12cd.qlr
+    python scripts/replay_session.py session.qlr --asr model --no-budget
+    python scripts/replay_session.py session.qlr --json > after.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Proje root dizinini bul (main ve utils import edilebilsin)
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+def decision(result: Dict) -> Tuple:
+    """Tick kararının karşılaştırılan kısmı (skorlar ve metinler hariç)"""
+    best = result.get("best") or {}
+    current = result.get("current") or {}
+    return (
+        (best.get("surah_no"), best.get("ayah_no"), bool(best.get("provisional"))),
+        (current.get("surah_no"), current.get("ayah_no")),
+        result.get("state"),
+        tuple(
+            (a["surah_no"], a["ayah_no"], a.get("start_ms"), a.get("end_ms"))
+            for a in result.get("timeline") or []
+        )
+    )
+
+def span_stats(samples: Dict[str, List[float]]) -> Dict[str, Dict]:
+    """Span adına göre ms istatistikleri"""
+    stats = {}
+    for name, values in samples.items():
+        arr = np.asarray(values, dtype=np.float64)
+        stats[name] = {
+            "count": int(arr.size),
+            "total_ms": round(float(arr.sum()), 2),
+            "mean_ms": round(float(arr.mean()), 2),
+            "p50_ms": round(float(np.percentile(arr, 50)), 2),
+            "p95_ms": round(float(np.percentile(arr, 95)), 2),
+            "max_ms": round(float(arr.max()), 2)
+        }
+    return stats
+
+def replay(
+    path: str,
+    asr: str = "recorded",
+    model_name: str = "live",
+    budget: bool = True,
+    ticks_out: Optional[str] = None
+) -> Dict:
+    """
+    Oturumu replay eder
+    
+    Args:
+        asr: "recorded" (kayıttaki kelimeler) veya "model" (PCM yeniden decode edilir)
+        model_name: --asr model için model havuzu
+        budget: Kayıttaki tick bütçesi decode'a uygulansın mı
+        ticks_out: Tick bazında replay sonuçlarının yazılacağı JSONL
+    
+    Returns:
+        Özet: tick sayısı, uyuşma, ilk ayrışma, span istatistikleri
+    """
+    from utils.budget import Deadline
+    from utils.live_tracker import LiveTracker, transcribe_window
+    from utils.session_recorder import SessionReader
+    from utils.tracing import tracing
+    from utils.wav_io import write_wav_int16
+    
+    model = None
+    if asr == "model":
+        import main
+        model = main.model_manager.get(model_name)
+    
+    replay_spans: Dict[str, List[float]] = {}
+    recorded_spans: Dict[str, List[float]] = {}
+    matched = 0
+    first_divergence = None
+    ticks = 0
+    
+    with SessionReader(path) as reader:
+        meta = reader.meta
+        sample_rate = reader.sample_rate
+        tracker = LiveTracker(
+            target_ayahs=meta.get("target_ayahs", 12),
+            min_opening_score=meta.get("min_opening_score", 70)
+        )
+        out = open(ticks_out, "w", encoding="utf-8") if ticks_out else None
+        
+        try:
+            for tick in reader.ticks():
+                ticks += 1
+                with tracing("replay_tick") as trace:
+                    if model is not None:
+                        samples = reader.pcm(tick["samples"] - tick["window_samples"], tick["samples"])
+                        fd, temp_wav = tempfile.mkstemp(suffix=".wav")
+                        os.close(fd)
+                        try:
+                            with trace.span("write_wav"):
+                                write_wav_int16(temp_wav, samples, sample_rate)
+                            window_ms = int(len(samples) * 1000 / sample_rate)
+                            deadline = Deadline(meta.get("tick_budget_ms", 2000) / 1000) if budget else None
+                            with trace.span("asr", model=model_name):
+                                transcript, words = transcribe_window(
+                                    model, temp_wav, tick["elapsed_ms"] - window_ms, deadline
+                                )
+                        finally:
+                            os.remove(temp_wav)
+                    else:
+                        transcript, words = tick["transcript"], tick["words"]
+                    
+                    with trace.span("tracker_step"):
+                        result = tracker.step(
+                            tick["elapsed_ms"], transcript, words, tick.get("short_window", False)
+                        )
+                
+                for name, entry in trace.summary().items():
+                    replay_spans.setdefault(name, []).append(entry["ms"])
+                for name, ms in (tick.get("timing") or {}).items():
+                    recorded_spans.setdefault(name, []).append(ms)
+                
+                same = decision(result) == decision(tick["result"])
+                if same:
+                    matched += 1
+                elif first_divergence is None:
+                    first_divergence = tick["elapsed_ms"]
+                
+                if out is not None:
+                    out.write(json.dumps({
+                        "elapsed_ms": tick["elapsed_ms"],
+                        "matches_recording": same,
+                        "transcript": transcript,
+                        **result,
+                        "timing": {name: entry["ms"] for name, entry in trace.summary().items()}
+                    }, ensure_ascii=False) + "\n")
+        finally:
+            if out is not None:
+                out.close()
+        
+        audio_seconds = reader.samples / sample_rate
+    
+    return {
+        "session": meta.get("session_id"),
+        "path": path,
+        "asr": asr,
+        "audio_seconds": round(audio_seconds, 2),
+        "ticks": ticks,
+        "matching_ticks": matched,
+        "first_divergence_ms": first_divergence,
+        "spans": span_stats(replay_spans),
+        "recorded_spans": span_stats(recorded_spans)
+    }
+
+def print_summary(summary: Dict) -> None:
+    print(f"Oturum: {summary['session']} ({summary['audio_seconds']:.1f} sn ses, {summary['ticks']} tick)")
+    print(f"ASR: {summary['asr']}")
+    if summary["ticks"]:
+        print(
+            f"Kayıtla uyuşan tick: {summary['matching_ticks']}/{summary['ticks']}"
+            + (f" (ilk ayrışma {summary['first_divergence_ms']} ms)"
+               if summary["first_divergence_ms"] is not None else "")
+        )
+    
+    names = list(summary["spans"]) + [n for n in summary["recorded_spans"] if n not in summary["spans"]]
+    if not names:
+        return
+    print(f"\n{'span':<22}{'replay p50':>12}{'p95':>10}{'toplam':>12}   {'kayıt p50':>10}{'p95':>10}")
+    for name in names:
+        replayed = summary["spans"].get(name)
+        recorded = summary["recorded_spans"].get(name)
+        left = (
+            f"{replayed['p50_ms']:>12.2f}{replayed['p95_ms']:>10.2f}{replayed['total_ms']:>12.1f}"
+            if replayed else f"{'-':>12}{'-':>10}{'-':>12}"
+        )
+        right = f"{recorded['p50_ms']:>10.2f}{recorded['p95_ms']:>10.2f}" if recorded else f"{'-':>10}{'-':>10}"
+        print(f"{name:<22}{left}   {right}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Kayıtlı live oturumunu tick tick yeniden çalıştırır")
+    parser.add_argument("session", help="Oturum kaydı (.qlr)")
+    parser.add_argument("--asr", choices=["recorded", "model"], default="recorded",
+                        help="recorded: kayıttaki ASR kelimeleri (model yok), model: PCM'i yeniden decode et")
+    parser.add_argument("--model", default="live", help="--asr model için model havuzu (default: live)")
+    parser.add_argument("--no-budget", action="store_true",
+                        help="Tick bütçesini uygulama (decode süresi değişse de aynı metin)")
+    parser.add_argument("--ticks-out", default=None, help="Tick bazında sonuçların yazılacağı JSONL")
+    parser.add_argument("--json", action="store_true", help="Özeti JSON olarak yazdır")
+    parser.add_argument("--fail-on-diverge", action="store_true",
+                        help="Kayıttaki kararlardan ayrışan tick varsa 1 ile çık")
+    args = parser.parse_args()
+    
+    if not Path(args.session).is_file():
+        print(f"✗ Kayıt bulunamadı: {args.session}")
+        return 1
+    
+    try:
+        summary = replay(
+            args.session,
+            asr=args.asr,
+            model_name=args.model,
+            budget=not args.no_budget,
+            ticks_out=args.ticks_out
+        )
+    except ValueError as e:
+        print(f"✗ {e}")
+        return 1
+    
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+    else:
+        print_summary(summary)
+    
+    if args.fail_on_diverge and summary["matching_ticks"] != summary["ticks"]:
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
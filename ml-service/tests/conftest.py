@@ -0,0 +1,11 @@
+"""
+pytest ortak ayarları: testler ml-service dizininden utils paketini import eder
+"""
+
+import sys
+from pathlib import Path
+
+# Proje root dizinini bul (utils import edilebilsin)
+TESTS_DIR = Path(__file__).parent
+PROJECT_ROOT = TESTS_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
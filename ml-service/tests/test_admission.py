@@ -0,0 +1,216 @@
+"""
+AdmissionController: öncelik sırası, live için ayrılan slotlar ve çok slotlu isteklerin sırası
+"""
+
+import asyncio
+import pytest
+from utils.admission import (
+    AdmissionController,
+    AdmissionRejected,
+    PRIORITY_BACKGROUND,
+    PRIORITY_BATCH,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_LIVE,
+)
+
+def run(coro):
+    return asyncio.run(coro)
+
+async def settle():
+    """Bekleyen task'ların kuyruğa girmesi / slot alması için event loop'a birkaç tur verir"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+def test_immediate_grant_and_release():
+    async def scenario():
+        admission = AdmissionController({"offline": 2})
+        assert await admission.acquire("offline") == 1
+        async with admission.slot("offline", PRIORITY_BATCH):
+            assert admission.status()["models"]["offline"]["active"] == 2
+        admission.release("offline")
+        status = admission.status()
+        assert status["models"]["offline"]["active"] == 0
+        assert status["total_active"] == 0
+        assert status["admitted"] == 2
+    
+    run(scenario())
+
+def test_waiters_served_by_priority_then_arrival():
+    async def scenario():
+        admission = AdmissionController({"offline": 1}, max_wait=5)
+        await admission.acquire("offline")
+        order = []
+        
+        async def request(name, priority):
+            await admission.acquire("offline", priority)
+            order.append(name)
+        
+        # Geliş sırası önceliğin tersi; aynı öncelikte ilk gelen önce
+        tasks = [
+            asyncio.create_task(request(name, priority))
+            for name, priority in [
+                ("background", PRIORITY_BACKGROUND),
+                ("batch", PRIORITY_BATCH),
+                ("interactive-1", PRIORITY_INTERACTIVE),
+                ("interactive-2", PRIORITY_INTERACTIVE),
+                ("live", PRIORITY_LIVE),
+            ]
+        ]
+        await settle()
+        assert order == []
+        assert admission.waiting("offline") == 5
+        
+        for expected in ["live", "interactive-1", "interactive-2", "batch", "background"]:
+            admission.release("offline")
+            await settle()
+            assert order[-1] == expected
+        admission.release("offline")
+        await asyncio.gather(*tasks)
+        assert admission.waiting() == 0
+    
+    run(scenario())
+
+def test_waiter_for_other_model_does_not_block():
+    async def scenario():
+        admission = AdmissionController({"offline": 1, "live": 1}, total_limit=2, max_wait=5)
+        await admission.acquire("offline", PRIORITY_INTERACTIVE)
+        waiter = asyncio.create_task(admission.acquire("offline", PRIORITY_INTERACTIVE))
+        await settle()
+        
+        # Offline bekleyeni live slotunu kullanamaz: aynı öncelikli live isteği hemen başlar
+        assert await admission.acquire("live", PRIORITY_INTERACTIVE, max_wait=0) == 1
+        assert not waiter.done()
+        
+        # Aynı modelin bekleyeni ise yeni isteği sıraya sokar
+        admission.release("live")
+        with pytest.raises(AdmissionRejected):
+            await admission.acquire("offline", PRIORITY_INTERACTIVE, max_wait=0)
+        
+        admission.release("offline")
+        await waiter
+        admission.release("offline")
+    
+    run(scenario())
+
+def test_reserved_for_live_slot():
+    async def scenario():
+        admission = AdmissionController(
+            {"offline": 2, "live": 2}, total_limit=2, max_wait=5, reserved_for_live=1
+        )
+        await admission.acquire("offline", PRIORITY_BATCH)
+        
+        # Son slot batch / background'a verilmez
+        with pytest.raises(AdmissionRejected) as error:
+            await admission.acquire("offline", PRIORITY_BATCH, max_wait=0)
+        assert error.value.reason == "boş slot yok"
+        assert error.value.retry_after >= 1
+        
+        batch = asyncio.create_task(admission.acquire("offline", PRIORITY_BATCH))
+        background = asyncio.create_task(admission.acquire("offline", PRIORITY_BACKGROUND))
+        await settle()
+        assert admission.waiting() == 2
+        
+        # Live (ve interactive) ayrılan slotu alabilir; bekleyen batch'in önüne geçer
+        assert await admission.acquire("live", PRIORITY_LIVE, max_wait=0) == 1
+        assert admission.status()["total_active"] == 2
+        
+        # Live bitince ayrılan slot yine boş kalır: batch hâlâ bekler
+        admission.release("live")
+        await settle()
+        assert not batch.done()
+        
+        # Batch slotu boşalınca sıradaki batch alır, background bekler
+        admission.release("offline")
+        await settle()
+        assert batch.done() and not background.done()
+        admission.release("offline")
+        await settle()
+        assert background.done()
+        admission.release("offline")
+        assert admission.status()["total_active"] == 0
+        assert admission.status()["rejected_by_priority"]["batch"] == 1
+    
+    run(scenario())
+
+def test_multi_slot_request_is_not_starved():
+    async def scenario():
+        admission = AdmissionController({"offline": 3}, max_wait=5)
+        await admission.acquire("offline")
+        await admission.acquire("offline")
+        order = []
+        
+        async def request(name, slots):
+            granted = await admission.acquire("offline", PRIORITY_INTERACTIVE, slots=slots)
+            order.append((name, granted))
+        
+        long_task = asyncio.create_task(request("long", 3))
+        await settle()
+        single = asyncio.create_task(request("single", 1))
+        await settle()
+        
+        # Bir slot boş ama sıradaki çok slotlu istek beklediği için tek slotlu öne geçmez
+        assert order == []
+        admission.release("offline")
+        await settle()
+        assert order == []
+        admission.release("offline")
+        await settle()
+        assert order == [("long", 3)]
+        assert admission.status()["models"]["offline"]["active"] == 3
+        
+        admission.release("offline", slots=3)
+        await settle()
+        assert order == [("long", 3), ("single", 1)]
+        await asyncio.gather(long_task, single)
+    
+    run(scenario())
+
+def test_requested_slots_clamped_to_limits():
+    async def scenario():
+        admission = AdmissionController({"offline": 4}, total_limit=4, reserved_for_live=1)
+        # Toplamın ayrılmış kısmı hariç: en fazla 3 slot (aksi halde hiç verilemezdi)
+        assert await admission.acquire("offline", PRIORITY_BACKGROUND, slots=10) == 3
+        admission.release("offline", slots=3)
+        assert await admission.acquire("offline", slots=0) == 1
+    
+    run(scenario())
+
+def test_wait_timeout_and_cancel_leave_no_slots():
+    async def scenario():
+        admission = AdmissionController({"offline": 1}, max_wait=0.05)
+        await admission.acquire("offline")
+        with pytest.raises(AdmissionRejected):
+            await admission.acquire("offline")
+        
+        cancelled = asyncio.create_task(admission.acquire("offline", PRIORITY_BACKGROUND))
+        await settle()
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        
+        # Süresi dolan / iptal edilen bekleyen slotu almaz
+        admission.release("offline")
+        assert admission.status()["models"]["offline"]["active"] == 0
+        assert admission.waiting() == 0
+    
+    run(scenario())
+
+def test_check_rejects_when_queue_full():
+    async def scenario():
+        admission = AdmissionController({"offline": 1}, max_wait=5, max_queue=1)
+        await admission.acquire("offline")
+        waiter = asyncio.create_task(admission.acquire("offline"))
+        await settle()
+        
+        with pytest.raises(AdmissionRejected):
+            admission.check("offline", PRIORITY_INTERACTIVE)
+        with pytest.raises(AdmissionRejected):
+            await admission.acquire("offline", PRIORITY_LIVE)
+        # Background işler (jobs) kuyruk sınırına takılmaz
+        admission.check("offline", PRIORITY_BACKGROUND)
+        
+        admission.release("offline")
+        await waiter
+        admission.release("offline")
+    
+    run(scenario())
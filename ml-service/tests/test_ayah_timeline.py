@@ -0,0 +1,163 @@
+"""
+build_ayah_timeline: eşleşen ayetlerin monotonik aralıkları ve eşleşmesiz ayetlerin boşluk doldurması
+"""
+
+import pytest
+from utils.quran_corpus import CorpusWords, QuranCorpus
+from utils.tracking import DEFAULT_AYAH_MS, build_ayah_timeline
+
+WORDS_PER_AYAH = 2
+
+def make_ayahs(n):
+    ayahs = [{"surah_no": 1, "ayah_no": i + 1, "text_ar": f"<1:{i + 1}>"} for i in range(n)]
+    tgt_words = [
+        {"w": f"k{i}_{j}", "surah_no": 1, "ayah_no": i + 1, "ayah_local_index": j}
+        for i in range(n)
+        for j in range(WORDS_PER_AYAH)
+    ]
+    return ayahs, tgt_words
+
+def align(tgt_words, spans):
+    """
+    spans: {ayet pozisyonu: [(start_ms, end_ms), ...]} -> (pairs, rec_words)
+    Her aralık ayetin sıradaki hedef kelimesiyle eşleşir; kalan hedef kelimeler deletion olur
+    """
+    pairs = []
+    rec_words = []
+    for i_tgt, word in enumerate(tgt_words):
+        ayah_spans = spans.get(word["ayah_no"] - 1, [])
+        j = word["ayah_local_index"]
+        if j < len(ayah_spans):
+            start_ms, end_ms = ayah_spans[j]
+            pairs.append((len(rec_words), i_tgt))
+            rec_words.append({"w": word["w"], "start_ms": start_ms, "end_ms": end_ms})
+        else:
+            pairs.append((None, i_tgt))
+    return pairs, rec_words
+
+def ranges(timeline):
+    return [(entry["start_ms"], entry["end_ms"]) for entry in timeline]
+
+def test_empty_ayahs():
+    assert build_ayah_timeline([], [], [], []) == []
+
+def test_matched_ayahs_monotonic_and_non_overlapping():
+    ayahs, tgt_words = make_ayahs(3)
+    # 2. ayet 1.'nin içinde, 3. ayet ikisinden önce başlıyor (ASR zaman damgası sapması)
+    pairs, rec_words = align(tgt_words, {
+        0: [(1000, 1400), (1600, 2000)],
+        1: [(1500, 1800)],
+        2: [(500, 900), (2500, 3000)],
+    })
+    # Hedefte karşılığı olmayan ASR kelimesi (insertion) aralıkları etkilemez
+    rec_words.append({"w": "x", "start_ms": 0, "end_ms": 9000})
+    pairs.append((len(rec_words) - 1, None))
+    
+    timeline = build_ayah_timeline(pairs, rec_words, tgt_words, ayahs)
+    
+    assert ranges(timeline) == [(1000, 2000), (2000, 2000), (2000, 3000)]
+    for (start, end), (next_start, _) in zip(ranges(timeline), ranges(timeline)[1:]):
+        assert start <= end <= next_start
+    assert [entry["matched_ratio"] for entry in timeline] == [1.0, 0.5, 1.0]
+    assert [(e["surah_no"], e["ayah_no"], e["text_ar"]) for e in timeline] == [
+        (1, 1, "<1:1>"), (1, 2, "<1:2>"), (1, 3, "<1:3>")
+    ]
+
+def test_reversed_word_times_use_min_and_max():
+    ayahs, tgt_words = make_ayahs(1)
+    pairs, rec_words = align(tgt_words, {0: [(1200, 1000), (1300, 1100)]})
+    assert ranges(build_ayah_timeline(pairs, rec_words, tgt_words, ayahs)) == [(1000, 1300)]
+
+def test_gap_between_neighbours_split_equally():
+    ayahs, tgt_words = make_ayahs(4)
+    pairs, rec_words = align(tgt_words, {0: [(0, 1000)], 3: [(4000, 5000)]})
+    
+    timeline = build_ayah_timeline(pairs, rec_words, tgt_words, ayahs)
+    
+    assert ranges(timeline) == [(0, 1000), (1000, 2500), (2500, 4000), (4000, 5000)]
+    assert [entry["matched_ratio"] for entry in timeline] == [0.5, 0.0, 0.0, 0.5]
+
+def test_gap_split_keeps_fractional_ms():
+    ayahs, tgt_words = make_ayahs(5)
+    pairs, rec_words = align(tgt_words, {0: [(0, 1000)], 4: [(2000, 2500)]})
+    
+    timeline = build_ayah_timeline(pairs, rec_words, tgt_words, ayahs)
+    
+    assert ranges(timeline)[1:4] == [(1000, 1333.3), (1333.3, 1666.7), (1666.7, 2000)]
+
+def test_gap_after_last_match_uses_default_duration():
+    ayahs, tgt_words = make_ayahs(3)
+    pairs, rec_words = align(tgt_words, {0: [(0, 1200)]})
+    
+    timeline = build_ayah_timeline(pairs, rec_words, tgt_words, ayahs)
+    
+    assert ranges(timeline) == [
+        (0, 1200),
+        (1200, 1200 + DEFAULT_AYAH_MS),
+        (1200 + DEFAULT_AYAH_MS, 1200 + 2 * DEFAULT_AYAH_MS),
+    ]
+
+def test_gap_before_first_match_counts_back_and_floors_at_zero():
+    ayahs, tgt_words = make_ayahs(3)
+    next_start = DEFAULT_AYAH_MS + 500
+    pairs, rec_words = align(tgt_words, {2: [(next_start, next_start + 500)]})
+    
+    timeline = build_ayah_timeline(pairs, rec_words, tgt_words, ayahs)
+    
+    assert ranges(timeline) == [
+        (0, next_start - DEFAULT_AYAH_MS),
+        (next_start - DEFAULT_AYAH_MS, next_start),
+        (next_start, next_start + 500),
+    ]
+
+def test_no_matches_consecutive_defaults():
+    ayahs, tgt_words = make_ayahs(3)
+    pairs, rec_words = align(tgt_words, {})
+    
+    timeline = build_ayah_timeline(pairs, rec_words, tgt_words, ayahs)
+    
+    assert ranges(timeline) == [(i * DEFAULT_AYAH_MS, (i + 1) * DEFAULT_AYAH_MS) for i in range(3)]
+    assert all(entry["matched_ratio"] == 0.0 for entry in timeline)
+
+@pytest.mark.parametrize("word_confidence", [False, True])
+def test_word_confidence(word_confidence):
+    ayahs, tgt_words = make_ayahs(2)
+    pairs, rec_words = align(tgt_words, {0: [(0, 400), (500, 900)], 1: [(1000, 1400)]})
+    rec_words[1]["w"] = "zz"  # Hedefle hiç benzemeyen ASR kelimesi
+    
+    timeline = build_ayah_timeline(pairs, rec_words, tgt_words, ayahs, word_confidence=word_confidence)
+    
+    if not word_confidence:
+        assert all("confidence" not in entry and "words" not in entry for entry in timeline)
+        return
+    # Eşleşmeyen hedef kelimeler ortalamaya 0 olarak girer
+    assert [entry["confidence"] for entry in timeline] == [0.5, 0.5]
+    assert timeline[0]["words"] == [
+        {"word_index": 0, "start_ms": 0, "end_ms": 400, "confidence": 1.0},
+        {"word_index": 1, "start_ms": 500, "end_ms": 900, "confidence": 0.0},
+    ]
+    assert timeline[1]["words"] == [{"word_index": 0, "start_ms": 1000, "end_ms": 1400, "confidence": 1.0}]
+
+def test_corpus_views_match_dicts():
+    rows = [(1, 1, "بسم الله"), (1, 2, "الحمد لله رب"), (1, 3, "الرحمن الرحيم"), (2, 1, "الم")]
+    corpus = QuranCorpus([{"surah": s, "ayah": a, "text_ar": f"<{s}:{a}>", "norm": n} for s, a, n in rows])
+    words = CorpusWords(corpus)
+    # Pencere 1:2'nin ikinci kelimesinden başlar (korpus dilimleri, vektörel ayet index'i)
+    tgt_words = words[3:8]
+    ayahs = corpus.verses[1:4]
+    pairs, rec_words = [], []
+    for j, span in enumerate([(0, 300), (300, 600), None, (900, 1200), (1200, 1500)]):
+        if span is None:
+            pairs.append((None, j))
+            continue
+        pairs.append((len(rec_words), j))
+        rec_words.append({"w": tgt_words[j]["w"], "start_ms": span[0], "end_ms": span[1]})
+    
+    views = build_ayah_timeline(pairs, rec_words, tgt_words, ayahs, word_confidence=True)
+    dicts = build_ayah_timeline(
+        pairs, rec_words, [w.to_dict() for w in tgt_words],
+        [{"surah_no": v["surah_no"], "ayah_no": v["ayah_no"], "text_ar": v["text_ar"]} for v in ayahs],
+        word_confidence=True
+    )
+    assert views == dicts
+    assert ranges(views) == [(0, 600), (900, 1200), (1200, 1500)]
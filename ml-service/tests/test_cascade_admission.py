@@ -0,0 +1,51 @@
+"""
+/infer cascade'i ile live tick'leri: cascade'in tiny decode'u sürerken live tick'i slot bulur
+"""
+
+import asyncio
+import os
+import pytest
+
+os.environ.setdefault("PRELOAD_MODELS", "")
+main = pytest.importorskip("main")
+
+from utils.admission import AdmissionRejected, PRIORITY_INTERACTIVE, PRIORITY_LIVE
+from utils.quran_index import get_verse_index, get_verses
+
+@pytest.fixture
+def verse_text():
+    if not main.check_quran_loaded():
+        pytest.skip("Kuran metni yok (scripts/fetch_quran_text.py)")
+    return get_verses()[get_verse_index(112, 1)]["text_ar"]
+
+def test_cascade_tiny_tier_does_not_hold_live_slot(monkeypatch, verse_text):
+    decoded = []
+    
+    async def fake_asr_text(model_name, audio, beam_size, deadline=None, enough_words=None, on_segment=None):
+        # Decode sürerken gelen live tick'i: slotu LIVE_ADMISSION_WAIT_SECONDS içinde almalı
+        try:
+            slots = await main.admission.acquire(
+                "live", PRIORITY_LIVE, max_wait=main.LIVE_ADMISSION_WAIT_SECONDS
+            )
+        except AdmissionRejected:
+            decoded.append((model_name, "tick skipped"))
+        else:
+            main.admission.release("live", slots=slots)
+            decoded.append((model_name, "tick ran"))
+        return verse_text, -0.1, None
+    
+    monkeypatch.setattr(main, "asr_text", fake_asr_text)
+    result = asyncio.run(main._find_best_match("unused.wav", True, None, True, None, PRIORITY_INTERACTIVE))
+    
+    assert decoded[0] == ("cascade", "tick ran")
+    assert all(outcome == "tick ran" for _, outcome in decoded)
+    assert result["tier"] in ("tiny", "base")
+    status = main.admission.status()
+    assert status["models"]["live"]["active"] == 0
+    assert status["models"]["offline"]["active"] == 0
+
+def test_cascade_tiers_use_offline_admission():
+    tiers = {tier["tier"]: tier for tier in main.CASCADE_TIERS}
+    assert tiers["tiny"]["model"] == "cascade"
+    assert {tier["admission"] for tier in main.CASCADE_TIERS} == {"offline"}
+    assert "cascade" in main.model_manager.specs
@@ -0,0 +1,54 @@
+"""
+plan_topology: çekirdek payları toplamı korur, her pay tamamen thread'lere dağıtılır
+"""
+
+import pytest
+from utils.cpu_topology import MAX_THREADS_PER_WORKER, plan_topology, split_cores
+
+@pytest.mark.parametrize("total", [1, 2, 4, 8, 12, 16, 32])
+def test_pools_use_all_cores(total):
+    cpus = list(range(total))
+    topology = plan_topology(cpus)
+    live, offline = topology["live"], topology["offline"]
+    reserved = 1 if total >= 4 else 0
+    
+    assert live["cores"] + offline["cores"] + reserved == total
+    assert topology["long_audio"]["cores"] == offline["cores"]
+    
+    # Ayrık payın her çekirdeğine en az bir thread düşer, taşma bir worker'dan azdır
+    # (tek çekirdekte offline'ın ayrık payı yok; live'ın çekirdeğini paylaşır)
+    for entry in topology.values():
+        threads = entry["cpu_threads"] * entry["num_workers"]
+        assert threads >= entry["cores"]
+        if entry["cores"]:
+            assert threads - entry["cores"] < entry["cpu_threads"]
+    
+    # Pinning'de kümeler ayrık ve payları kadar (tek çekirdekte pinning yok)
+    pinned = plan_topology(cpus, pin=True)
+    if total >= 2:
+        live_set = set(pinned["live"]["cpu_affinity"])
+        offline_set = set(pinned["offline"]["cpu_affinity"])
+        assert len(live_set) == live["cores"]
+        assert len(offline_set) == offline["cores"]
+        assert not live_set & offline_set
+        assert pinned["long_audio"]["cpu_affinity"] == pinned["offline"]["cpu_affinity"]
+
+@pytest.mark.parametrize("total, offline", [
+    (16, {"cpu_threads": 4, "num_workers": 3, "cores": 11}),
+    (32, {"cpu_threads": 4, "num_workers": 7, "cores": 27}),
+    (12, {"cpu_threads": 4, "num_workers": 2, "cores": 8}),
+])
+def test_offline_split_examples(total, offline):
+    entry = plan_topology(list(range(total)))["offline"]
+    assert {key: entry[key] for key in offline} == offline
+
+@pytest.mark.parametrize("cores, expected", [
+    (0, (1, 1)),
+    (3, (3, 1)),
+    (8, (4, 2)),
+    (9, (5, 2)),    # kalan 1 < 2: thread artırılır
+    (10, (4, 3)),   # kalan 2 >= 2: worker eklenir
+    (11, (4, 3)),
+])
+def test_split_cores(cores, expected):
+    assert split_cores(cores, MAX_THREADS_PER_WORKER) == expected
@@ -0,0 +1,141 @@
+"""
+DeltaEncoder: v2 delta mesajları bir client durumuna uygulandığında v1 update'lerinin aynısı elde edilir
+"""
+
+import json
+import pytest
+from utils.live_protocol import PROTOCOL_VERSION, DeltaEncoder
+
+FIELDS = ("st", "best", "win", "cur", "tr", "sk")
+
+class Client:
+    """v2 mesajlarını uygulayan referans client (frontend'in yaptığını taklit eder)"""
+    
+    def __init__(self):
+        self.state = {key: None for key in FIELDS}
+        self.timeline = {}
+        self.texts = {}
+        self.seq = 0
+    
+    def apply(self, msg):
+        assert msg["type"] == "update"
+        assert msg["v"] == PROTOCOL_VERSION
+        assert msg["seq"] == self.seq + 1
+        self.seq = msg["seq"]
+        for key in FIELDS:
+            if key in msg:
+                self.state[key] = msg[key]
+        for surah, ayah in msg.get("rm", []):
+            del self.timeline[(surah, ayah)]
+        for surah, ayah, start_ms, end_ms, pct in msg.get("tl", []):
+            self.timeline[(surah, ayah)] = (start_ms, end_ms, pct)
+        for key, text in msg.get("txt", {}).items():
+            assert key not in self.texts, "ayet metni bir kez gönderilmeli"
+            self.texts[key] = text
+
+def expected(update):
+    """v1 update'inden client'ın ulaşması gereken durum"""
+    current = update.get("current")
+    state = {
+        "st": update.get("state"),
+        "best": update.get("best"),
+        "win": update.get("window"),
+        "cur": [current["surah_no"], current["ayah_no"]] if current else None,
+        "tr": update.get("transcript_partial"),
+        "sk": update.get("skipped_ticks"),
+    }
+    timeline = {
+        (a["surah_no"], a["ayah_no"]): (round(a["start_ms"]), round(a["end_ms"]), round(a["matched_ratio"] * 100))
+        for a in update.get("timeline") or []
+    }
+    return state, timeline
+
+def ayah(surah_no, ayah_no, start_ms, end_ms, ratio):
+    return {
+        "surah_no": surah_no,
+        "ayah_no": ayah_no,
+        "text_ar": f"<{surah_no}:{ayah_no}>",
+        "start_ms": start_ms,
+        "end_ms": end_ms,
+        "matched_ratio": ratio,
+    }
+
+BEST = {"surah_no": 1, "ayah_no": 1, "score": 0.9}
+
+UPDATES = [
+    {"elapsed_ms": 500.4, "state": "searching", "transcript_partial": "بسم"},
+    {
+        "elapsed_ms": 1000, "state": "tracking", "best": BEST,
+        "window": {"surah_no": 1, "start": 1, "end": 3},
+        "current": {"surah_no": 1, "ayah_no": 1},
+        "timeline": [ayah(1, 1, 0, 1200.6, 0.5), ayah(1, 2, 1200.6, 2200, 0.0)],
+        "transcript_partial": "بسم الله",
+    },
+    # Değişiklik yok: sadece seq / t gönderilir
+    {
+        "elapsed_ms": 1500, "state": "tracking", "best": BEST,
+        "window": {"surah_no": 1, "start": 1, "end": 3},
+        "current": {"surah_no": 1, "ayah_no": 1},
+        "timeline": [ayah(1, 1, 0, 1200.6, 0.5), ayah(1, 2, 1200.6, 2200, 0.0)],
+        "transcript_partial": "بسم الله",
+    },
+    # 1:2 güncellenir, 1:3 eklenir, tick kesildi ve atlandı
+    {
+        "elapsed_ms": 2000, "state": "tracking", "best": BEST,
+        "window": {"surah_no": 1, "start": 1, "end": 3},
+        "current": {"surah_no": 1, "ayah_no": 2},
+        "timeline": [ayah(1, 1, 0, 1200.6, 0.5), ayah(1, 2, 1200.6, 2500, 1.0), ayah(1, 3, 2500, 3500, 0.25)],
+        "transcript_partial": "بسم الله الرحمن",
+        "skipped_ticks": 1, "truncated": True,
+        "timing": {"decode": 120, "total_ms": 150},
+    },
+    # Pencere kayar: 1:1 çıkar, kalan ayetlerin metni tekrar gönderilmez; alanlar None'a döner
+    {
+        "elapsed_ms": 2500, "state": "lost",
+        "timeline": [ayah(1, 2, 1200.6, 2500, 1.0), ayah(1, 3, 2500, 3500, 0.25)],
+        "skipped_ticks": 1,
+    },
+    {"elapsed_ms": 3000, "state": "lost", "timeline": [], "skipped_ticks": 2},
+]
+
+@pytest.mark.parametrize("encoding", ["json", "msgpack"])
+def test_delta_round_trip(encoding):
+    if encoding == "msgpack":
+        msgpack = pytest.importorskip("msgpack")
+        loads = lambda data: msgpack.unpackb(data, raw=False)
+    else:
+        loads = json.loads
+    
+    encoder = DeltaEncoder(encoding)
+    assert encoder.binary == (encoding == "msgpack")
+    client = Client()
+    for update in UPDATES:
+        data = encoder.encode(update)
+        assert isinstance(data, bytes if encoder.binary else str)
+        client.apply(loads(data))
+        
+        state, timeline = expected(update)
+        assert client.state == state
+        assert client.timeline == timeline
+    
+    assert client.texts == {"1:1": "<1:1>", "1:2": "<1:2>", "1:3": "<1:3>"}
+
+def test_delta_sends_only_changes():
+    encoder = DeltaEncoder()
+    messages = [encoder.diff(update) for update in UPDATES]
+    
+    assert messages[0] == {"type": "update", "v": PROTOCOL_VERSION, "seq": 1, "t": 500, "st": "searching", "tr": "بسم"}
+    assert messages[2] == {"type": "update", "v": PROTOCOL_VERSION, "seq": 3, "t": 1500}
+    
+    # Sadece değişen / yeni girdiler, int ms ve yüzde oran
+    assert messages[3]["tl"] == [[1, 2, 1201, 2500, 100], [1, 3, 2500, 3500, 25]]
+    assert messages[3]["txt"] == {"1:3": "<1:3>"}
+    assert messages[3]["tc"] is True
+    assert messages[3]["tm"] == {"decode": 120, "total_ms": 150}
+    
+    # tc / tm tick'e özgü; kaybolan alanlar açıkça None gönderilir
+    assert "tc" not in messages[4] and "tm" not in messages[4]
+    assert messages[4]["rm"] == [[1, 1]]
+    assert "tl" not in messages[4] and "txt" not in messages[4] and "sk" not in messages[4]
+    assert messages[4]["best"] is None and messages[4]["cur"] is None
+    assert sorted(messages[5]["rm"]) == [[1, 2], [1, 3]]
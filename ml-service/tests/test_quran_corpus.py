@@ -0,0 +1,103 @@
+"""
+QuranCorpus: (sure, ayet) -> index, sure aralıkları, VerseRange dilimleri ve kelime görünümleri
+"""
+
+import pytest
+from utils.quran_corpus import CorpusWords, QuranCorpus, Verse, VerseRange, WordRange
+
+def make_verses():
+    # Bilerek karışık sırada; 3. surede ayet numaraları ardışık değil (ikili arama yolu)
+    rows = [
+        (2, 2, "ذلك الكتاب"),
+        (1, 1, "بسم الله"),
+        (3, 5, "الم"),
+        (2, 1, "الم"),
+        (1, 2, "الحمد لله رب"),
+        (3, 1, "الله لا اله"),
+        (2, 3, "الذين يؤمنون"),
+    ]
+    return [
+        {"surah": surah, "ayah": ayah, "text_ar": f"<{surah}:{ayah}>", "norm": norm}
+        for surah, ayah, norm in rows
+    ]
+
+@pytest.fixture
+def corpus():
+    return QuranCorpus(make_verses())
+
+def test_verses_sorted_by_surah_and_ayah(corpus):
+    keys = [(v["surah"], v["ayah"]) for v in corpus.verses]
+    assert keys == [(1, 1), (1, 2), (2, 1), (2, 2), (2, 3), (3, 1), (3, 5)]
+    assert corpus.verses[3].to_dict() == {"surah": 2, "ayah": 2, "text_ar": "<2:2>", "norm": "ذلك الكتاب"}
+
+def test_index_of(corpus):
+    for i, verse in enumerate(corpus.verses):
+        assert corpus.index_of(verse["surah"], verse["ayah"]) == i
+    # Ardışık olmayan ayet numarası ikili aramayla bulunur
+    assert corpus.index_of(3, 5) == 6
+
+@pytest.mark.parametrize("surah_no, ayah_no", [(1, 3), (2, 0), (3, 2), (4, 1), (0, 1), (115, 1), (-1, 1)])
+def test_index_of_missing(corpus, surah_no, ayah_no):
+    assert corpus.index_of(surah_no, ayah_no) is None
+
+def test_surah_range(corpus):
+    assert [v["ayah"] for v in corpus.surah_range(2)] == [1, 2, 3]
+    assert [(v["surah"], v["ayah"]) for v in corpus.surah_range(1, 2)] == [(1, 1), (1, 2), (2, 1), (2, 2), (2, 3)]
+    assert corpus.ayah_count(3) == 2
+    
+    # Geçersiz / ters aralıklar boş döner
+    assert len(corpus.surah_range(4)) == 0
+    assert len(corpus.surah_range(200)) == 0
+    assert len(corpus.surah_range(3, 1)) == 0
+
+def test_verse_range_slicing(corpus):
+    verses = corpus.verses
+    
+    window = verses[2:5]
+    assert isinstance(window, VerseRange)
+    assert (window.start, window.stop) == (2, 5)
+    assert [v["ayah"] for v in window] == [1, 2, 3]
+    
+    # İç içe dilim kopyasız görünüm olarak kalır
+    inner = window[1:]
+    assert isinstance(inner, VerseRange)
+    assert [v["ayah"] for v in inner] == [2, 3]
+    
+    # Negatif index, adımlı dilim, boş ve taşan dilim
+    assert window[-1] == verses[4]
+    assert [v["ayah"] for v in verses[::3]] == [1, 2, 5]
+    assert len(verses[5:2]) == 0
+    assert len(verses[5:100]) == 2
+    with pytest.raises(IndexError):
+        window[3]
+    
+    assert window.norms() == ["الم", "ذلك الكتاب", "الذين يؤمنون"]
+
+def test_verse_view_dict_access(corpus):
+    verse = corpus.verses[1]
+    assert isinstance(verse, Verse)
+    assert verse["surah_no"] == verse["surah"] == 1
+    assert verse["ayah_no"] == verse["ayah"] == 2
+    assert verse.get("missing", "x") == "x"
+    assert "text_ar" in verse and "missing" not in verse
+    with pytest.raises(KeyError):
+        verse["missing"]
+
+def test_corpus_words(corpus):
+    words = CorpusWords(corpus)
+    assert len(words) == 14
+    assert words.verse_offsets.tolist() == [0, 2, 5, 6, 8, 10, 13, 14]
+    assert words.texts(2, 5) == ["الحمد", "لله", "رب"]
+    
+    word = words[4]
+    assert word.to_dict() == {"w": "رب", "surah_no": 1, "ayah_no": 2, "ayah_local_index": 2}
+    assert word.verse == 1
+    
+    # Ayet kelimeleri verse_offsets aralığındadır; dilimler kopyasız
+    offsets = words.verse_offsets
+    window = words[offsets[5]:offsets[7]]
+    assert isinstance(window, WordRange)
+    assert [(w["ayah_no"], w["ayah_local_index"]) for w in window] == [(1, 0), (1, 1), (1, 2), (5, 0)]
+    assert window.texts() == ["الله", "لا", "اله", "الم"]
+    assert window[1:].texts() == ["لا", "اله", "الم"]
+    assert window.verses().tolist() == [5, 5, 5, 6]
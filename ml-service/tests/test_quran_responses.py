@@ -0,0 +1,43 @@
+"""
+QuranResponses: Cache-Control / ETag davranışı (kısa max-age + doğrulama, boş context cache'lenmez)
+"""
+
+import pytest
+from starlette.datastructures import Headers
+from utils.quran_responses import CACHE_CONTROL, NO_STORE, QuranResponses, cached_response
+
+@pytest.fixture
+def responses():
+    verses_by_surah = {
+        1: [{"ayah": i, "text_ar": f"<1:{i}>"} for i in range(1, 8)],
+        2: [{"ayah": i, "text_ar": f"<2:{i}>"} for i in range(1, 4)],
+    }
+    meta = [
+        {"surah_no": 1, "name_ar": "الفاتحة", "name_tr": "Fatiha", "ayah_count": 7},
+        {"surah_no": 2, "name_ar": "البقرة", "name_tr": "Bakara", "ayah_count": 3},
+    ]
+    return QuranResponses(verses_by_surah, meta)
+
+def test_cache_control_revalidates_instead_of_immutable(responses):
+    assert "immutable" not in CACHE_CONTROL
+    for body in [responses.meta, responses.surah(1), responses.context(1, 3)]:
+        response = cached_response(body, Headers({}))
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == CACHE_CONTROL
+        
+        # Süre dolunca ETag ile doğrulama: eşleşirse 304
+        revalidated = cached_response(body, Headers({"if-none-match": response.headers["etag"]}))
+        assert revalidated.status_code == 304
+        assert revalidated.headers["cache-control"] == CACHE_CONTROL
+
+def test_empty_context_not_cached(responses):
+    for surah_no, ayah_no in [(1, 8), (2, 0), (3, 1)]:
+        body = responses.context(surah_no, ayah_no)
+        assert body.identity == b'{"surah_no":%d,"ayah_no":%d,"items":[]}' % (surah_no, ayah_no)
+        assert cached_response(body, Headers({})).headers["cache-control"] == NO_STORE
+
+def test_context_slice(responses):
+    body = responses.context(1, 2, before=2, after=1)
+    assert body.identity.count(b'"ayah_no"') == 4  # istek + 1:1..1:3
+    # Aynı istek LRU'dan aynı gövdeyi döndürür
+    assert responses.context(1, 2, before=2, after=1) is body
@@ -0,0 +1,56 @@
+"""
+BlockRetriever: aday ayetler = en iyi bloklar + kısa ayetler; kısa transcript'te tam tarama
+"""
+
+import pytest
+from utils.quran_corpus import CorpusWords, QuranCorpus
+from utils.quran_index import match_verses
+from utils.verse_retrieval import BlockRetriever
+
+LETTERS = "ابتثجحخدذرزسشصضطظعغفقكلمنهوي"
+
+def word(i):
+    return LETTERS[i % 28] + LETTERS[(i // 28) % 28] + LETTERS[(i // 784) % 28] + "ن"
+
+def make_verses():
+    # Her ayet kendi kelimelerinden oluşur (bloklar arası ortak tip yok); 2:3 kısa ayet
+    rows, n = [], 0
+    for surah, ayahs in [(1, 6), (2, 6), (3, 6)]:
+        for ayah in range(1, ayahs + 1):
+            size = 1 if (surah, ayah) == (2, 3) else 6
+            norm = " ".join(word(n + i) for i in range(size))
+            n += size
+            rows.append({"surah": surah, "ayah": ayah, "text_ar": f"<{surah}:{ayah}>", "norm": norm})
+    return rows
+
+@pytest.fixture
+def retriever():
+    corpus = QuranCorpus(make_verses())
+    words = CorpusWords(corpus)
+    return BlockRetriever(
+        corpus.surah_range(1, 3), words, words.verse_offsets,
+        block_ayahs=2, short_verse_chars=4, min_query_chars=20
+    )
+
+def test_candidates_are_top_blocks_and_short_verses(retriever):
+    verses = retriever._verses
+    # 3:2'nin tamamı ve 3:3'ün başı: en iyi blok 3:2-3:3 (3:1-3:2 ikinci)
+    query = " ".join(verses[13]["norm"].split() + verses[14]["norm"].split()[:2])
+    
+    candidates = retriever.candidate_verses(query, top_blocks=1)
+    # 2:3 (index 8) kısa ayet: ortak kelimesi olmasa da skorlanır
+    assert candidates.tolist() == [8, 13, 14]
+    
+    got = retriever.match(query, top_k=1, top_blocks=1)
+    assert got == match_verses(query, verses, top_k=1)
+    assert (got[0]["surah"], got[0]["ayah"]) == (3, 2)
+
+def test_full_scan_fallbacks(retriever):
+    verses = retriever._verses
+    long_query = verses[13]["norm"] + " " + verses[14]["norm"]
+    assert retriever.candidate_verses(long_query, top_blocks=0) is None
+    assert retriever.candidate_verses(long_query, top_blocks=retriever.n_blocks) is None
+    # Kısa transcript ve sözlükte olmayan kelimeler: tüm ayetler
+    assert retriever.candidate_verses(verses[13]["norm"].split()[0], top_blocks=1) is None
+    assert retriever.candidate_verses("ووووو " * 5, top_blocks=1) is None
+    assert retriever.match("", top_blocks=1) == []
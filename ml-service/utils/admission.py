@@ -0,0 +1,256 @@
+"""
+Admission control: model başına eşzamanlı inference sınırı, öncelikli bekleme kuyruğu ve yük atma
+
+Her WhisperModel zaten birden fazla CPU thread'i kullandığı için aynı anda çalışan decode
+sayısı sınırlanır. Slot bekleyen istekler önceliğe göre sıralanır (live tick'ler önce);
+kuyruk doluysa veya bekleme süresi aşılırsa istek AdmissionRejected ile reddedilir ve
+client Retry-After ile tekrar dener.
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Öncelikler (küçük = önce)
+PRIORITY_LIVE = 0          # /ws/live tick'leri
+PRIORITY_INTERACTIVE = 1   # /infer, /track
+PRIORITY_BATCH = 2         # /infer/batch
+PRIORITY_BACKGROUND = 3    # /jobs (zaten kuyrukta; süresiz bekler)
+
+PRIORITY_NAMES = {
+    PRIORITY_LIVE: "live",
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_BATCH: "batch",
+    PRIORITY_BACKGROUND: "background",
+}
+
+class AdmissionRejected(Exception):
+    """Slot verilemedi (kuyruk dolu veya bekleme süresi aşıldı)"""
+    
+    def __init__(self, model: str, reason: str, retry_after: int):
+        super().__init__(f"{model}: {reason}")
+        self.model = model
+        self.reason = reason
+        self.retry_after = retry_after
+
+class AdmissionController:
+    """
+    Model başına ve toplam eşzamanlı decode sınırı + öncelikli bekleme
+    
+    Slot boşaldığında bekleyenler arasından önceliği en yüksek olan (eşitse ilk gelen)
+    ve modeli kapasitesi olan istek alınır. Toplam sınırın son reserved_for_live slotu
+    batch/background işlere verilmez, böylece live tick'ler her zaman yer bulur.
+    Bir istek birden fazla slot isteyebilir (örn. modelin tüm çekirdek payını kullanan
+    long-audio pool'u); slotlar birlikte verilir ve sıradaki aynı modelli istekler öne geçmez.
+    Event loop içinde kullanılır (thread-safe değildir).
+    """
+    
+    def __init__(
+        self,
+        limits: Dict[str, int],
+        total_limit: Optional[int] = None,
+        max_wait: float = 10.0,
+        max_queue: int = 32,
+        reserved_for_live: int = 1
+    ):
+        """
+        Args:
+            limits: {model ismi: eşzamanlı decode sınırı}
+            total_limit: Tüm modeller için toplam sınır (None = sadece model sınırları)
+            max_wait: Varsayılan en fazla bekleme süresi (sn)
+            max_queue: Bekleyen istek sınırı; aşılırsa hemen reddedilir
+            reserved_for_live: Toplam sınırdan batch/background'a verilmeyen slot sayısı
+        """
+        self.limits = limits
+        self.total_limit = total_limit
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self.reserved_for_live = reserved_for_live
+        
+        self._active: Dict[str, int] = {name: 0 for name in limits}
+        self._total_active = 0
+        # (priority, seq, model, slots, future)
+        self._waiters: List = []
+        self._seq = itertools.count()
+        # Slot tutma süresi (EMA, sn) -> Retry-After tahmini
+        self._hold_ema: Dict[str, float] = {name: 1.0 for name in limits}
+        self._stats = {"admitted": 0, "rejected": 0, "queued": 0}
+        self._rejected_by_priority: Dict[str, int] = {name: 0 for name in PRIORITY_NAMES.values()}
+    
+    def _can_run(self, model: str, priority: int, slots: int = 1) -> bool:
+        if self._active[model] + slots > self.limits[model]:
+            return False
+        if self.total_limit is None:
+            return True
+        limit = self.total_limit
+        if priority >= PRIORITY_BATCH and limit > self.reserved_for_live:
+            limit -= self.reserved_for_live
+        return self._total_active + slots <= limit
+    
+    def _slots(self, model: str, slots: int) -> int:
+        """İstenen slot sayısı model ve toplam sınırı aşmasın (aksi halde hiç verilemez)"""
+        limit = self.limits[model]
+        if self.total_limit is not None:
+            limit = min(limit, max(1, self.total_limit - self.reserved_for_live))
+        return max(1, min(slots, limit))
+    
+    def _grant(self, model: str, slots: int = 1) -> None:
+        self._active[model] += slots
+        self._total_active += slots
+        self._stats["admitted"] += 1
+    
+    def _dispatch(self) -> None:
+        """Boşalan slotları öncelik sırasıyla bekleyenlere verir"""
+        skipped = []
+        # Sığmayan bekleyenin modeli: arkadakiler (örn. tek slotlular) öne geçmez
+        blocked_models = set()
+        while self._waiters:
+            entry = heapq.heappop(self._waiters)
+            priority, _, model, slots, future = entry
+            if future.done():
+                # Süresi dolmuş / iptal edilmiş bekleyen
+                continue
+            if model not in blocked_models and self._can_run(model, priority, slots):
+                self._grant(model, slots)
+                future.set_result(True)
+            else:
+                blocked_models.add(model)
+                skipped.append(entry)
+        for entry in skipped:
+            heapq.heappush(self._waiters, entry)
+    
+    def waiting(self, model: Optional[str] = None) -> int:
+        return sum(
+            1 for _, _, m, _, future in self._waiters
+            if not future.done() and (model is None or m == model)
+        )
+    
+    def retry_after(self, model: str) -> int:
+        """Tahmini bekleme (sn): sıradaki istekler x ortalama slot süresi / model sınırı"""
+        estimate = self._hold_ema[model] * (self.waiting(model) + 1) / max(1, self.limits[model])
+        return int(min(60, max(1, math.ceil(estimate))))
+    
+    def _reject(self, model: str, priority: int, reason: str) -> AdmissionRejected:
+        self._stats["rejected"] += 1
+        self._rejected_by_priority[PRIORITY_NAMES.get(priority, str(priority))] += 1
+        logger.warning(f"Admission reddedildi ({model}, {PRIORITY_NAMES.get(priority)}): {reason}")
+        return AdmissionRejected(model, reason, self.retry_after(model))
+    
+    def check(self, model: str, priority: int = PRIORITY_INTERACTIVE) -> None:
+        """
+        Erken yük atma: kuyruk zaten doluysa işe (ffmpeg dahil) hiç başlamadan reddeder
+        
+        Raises:
+            AdmissionRejected
+        """
+        if priority < PRIORITY_BACKGROUND and self.waiting() >= self.max_queue:
+            raise self._reject(model, priority, "kuyruk dolu")
+    
+    async def acquire(
+        self,
+        model: str,
+        priority: int = PRIORITY_INTERACTIVE,
+        max_wait: Optional[float] = -1,
+        slots: int = 1
+    ) -> int:
+        """
+        Slot alır (gerekirse bekler)
+        
+        Args:
+            max_wait: En fazla bekleme (sn); -1 = varsayılan, None = süresiz (background)
+            slots: Birlikte alınacak slot sayısı (model/toplam sınırına kırpılır)
+        
+        Returns:
+            Alınan slot sayısı (release'e verilir)
+        
+        Raises:
+            AdmissionRejected: Kuyruk dolu veya bekleme süresi aşıldı
+        """
+        if max_wait == -1:
+            max_wait = None if priority >= PRIORITY_BACKGROUND else self.max_wait
+        slots = self._slots(model, slots)
+        
+        # Aynı veya daha yüksek öncelikli ve bu slotla yarışan bekleyen yoksa hemen al:
+        # aynı modelin bekleyenleri veya şu an çalışabilecek (başka modelin) bekleyenler
+        blocked = any(
+            p <= priority and not f.done() and (m == model or self._can_run(m, p, s))
+            for p, _, m, s, f in self._waiters
+        )
+        if not blocked and self._can_run(model, priority, slots):
+            self._grant(model, slots)
+            return slots
+        
+        if max_wait is not None and max_wait <= 0:
+            raise self._reject(model, priority, "boş slot yok")
+        if max_wait is not None and self.waiting() >= self.max_queue:
+            raise self._reject(model, priority, "kuyruk dolu")
+        
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), model, slots, future))
+        self._stats["queued"] += 1
+        
+        try:
+            await asyncio.wait({future}, timeout=max_wait)
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot verilmişti; geri bırak
+                self.release(model, slots=slots)
+            else:
+                future.cancel()
+            raise
+        
+        if not future.done():
+            future.cancel()
+            raise self._reject(model, priority, f"{max_wait:.1f} sn içinde slot açılmadı")
+        return slots
+    
+    def release(self, model: str, held_seconds: Optional[float] = None, slots: int = 1) -> None:
+        """Slot(lar)ı bırakır ve bekleyenlere dağıtır"""
+        self._active[model] = max(0, self._active[model] - slots)
+        self._total_active = max(0, self._total_active - slots)
+        if held_seconds is not None:
+            self._hold_ema[model] = 0.8 * self._hold_ema[model] + 0.2 * held_seconds
+        self._dispatch()
+    
+    @asynccontextmanager
+    async def slot(
+        self,
+        model: str,
+        priority: int = PRIORITY_INTERACTIVE,
+        max_wait: Optional[float] = -1,
+        slots: int = 1
+    ):
+        """async with controller.slot("offline", PRIORITY_INTERACTIVE): ... (acquire + release)"""
+        slots = await self.acquire(model, priority, max_wait, slots)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(model, time.monotonic() - start, slots)
+    
+    def status(self) -> Dict:
+        """Anlık yük: model bazında aktif/bekleyen, toplam ve sayaçlar"""
+        return {
+            "models": {
+                name: {
+                    "active": self._active[name],
+                    "limit": self.limits[name],
+                    "waiting": self.waiting(name),
+                    "avg_hold_seconds": round(self._hold_ema[name], 2)
+                }
+                for name in self.limits
+            },
+            "total_active": self._total_active,
+            "total_limit": self.total_limit,
+            "waiting": self.waiting(),
+            "max_queue": self.max_queue,
+            **self._stats,
+            "rejected_by_priority": dict(self._rejected_by_priority)
+        }
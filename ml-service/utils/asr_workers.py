@@ -0,0 +1,648 @@
+"""
+Ayrı process'lerde çalışan ASR worker havuzu: modeller worker başına bir kez yüklenir,
+ses API process'inden multiprocessing.shared_memory üzerinden (PCM pickle edilmeden) aktarılır
+
+Paylaşılan bellek düzeni: [CONTROL_BYTES kontrol alanı][float32 16kHz mono örnekler].
+Kontrol alanının ilk byte'ı durdurma bayrağıdır (iptal / yeterince güvenli eşleşme); worker
+her segmentten sonra bunu okur. Sonuçlar ve segment ilerlemeleri hafif bir kuyrukla döner.
+
+İşler boştaki worker'a havuz tarafından dağıtılır (worker başına kuyruk); böylece hangi işin
+hangi process'te olduğu bilinir ve ölen worker'ın işi hata ile sonlanır, worker yeniden başlatılır.
+"""
+
+import asyncio
+import itertools
+import multiprocessing as mp
+import queue
+import signal
+import threading
+import time
+import wave
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+import numpy as np
+from utils.budget import Deadline, STOP_CANCELLED, STOP_DEADLINE
+import logging
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+# Kontrol alanı (hizalama için 16 byte; sadece ilk byte kullanılıyor)
+CONTROL_BYTES = 16
+
+# Kontrol bayrakları
+FLAG_NONE = 0
+FLAG_CANCELLED = 1
+FLAG_STOP = 2  # on_segment True döndü (örn. güvenli eşleşme)
+
+# İşlemler
+OP_TEXT = "text"    # transcribe_text
+OP_WORDS = "words"  # asr_words_with_timestamps
+OP_BATCH = "batch"  # transcribe_batch (kısa kayıtlar, bellekte art arda)
+OP_CHUNK = "chunk"  # long_audio.transcribe_chunk (uzun kaydın bir parçası)
+
+# Deadline dolduktan sonra worker'ın kısmi sonucu için bu kadar beklenir (sn);
+# sonra kısmi ilerlemeyle dönülür (uzun segment / kuyrukta bekleyen iş)
+DEADLINE_GRACE_SECONDS = 1.0
+# Collector worker'ların canlılığını en az bu aralıkla kontrol eder (sn)
+SUPERVISE_SECONDS = 0.5
+
+# Worker -> API mesaj tipleri
+MSG_PROGRESS = "progress"
+MSG_DONE = "done"
+MSG_ERROR = "error"
+
+class SharedAudio:
+    """
+    Paylaşılan bellekteki ses (API process'inde oluşturulur, işler bitince unlink edilir)
+    
+    Aynı ses birden fazla işte (örn. /track'te eşleştirme + word timestamps) tekrar
+    decode edilmeden kullanılır; aynı anda tek iş çalıştırılmalıdır (kontrol alanı ortak).
+    """
+    
+    def __init__(self, n_samples: int):
+        self.n_samples = n_samples
+        self.shm = SharedMemory(create=True, size=CONTROL_BYTES + max(1, n_samples) * 4)
+        self.control = np.ndarray((CONTROL_BYTES,), dtype=np.uint8, buffer=self.shm.buf)
+        self.audio = np.ndarray((n_samples,), dtype=np.float32, buffer=self.shm.buf, offset=CONTROL_BYTES)
+        self.control[:] = FLAG_NONE
+    
+    @property
+    def name(self) -> str:
+        return self.shm.name
+    
+    @classmethod
+    def from_clips(cls, clips: List[np.ndarray]) -> Tuple["SharedAudio", List[Tuple[int, int]]]:
+        """Kayıtları paylaşılan bellekte art arda yazar; (SharedAudio, [(start, end), ...]) döner"""
+        bounds = []
+        offset = 0
+        for clip in clips:
+            bounds.append((offset, offset + len(clip)))
+            offset += len(clip)
+        
+        shared = cls(offset)
+        for clip, (start, end) in zip(clips, bounds):
+            shared.audio[start:end] = clip
+        return shared, bounds
+    
+    @classmethod
+    def from_wav(cls, wav_path: str) -> "SharedAudio":
+        """16kHz mono PCM16 WAV'ı doğrudan paylaşılan belleğe float32 olarak yazar"""
+        with wave.open(wav_path, "rb") as wav_file:
+            if wav_file.getframerate() != SAMPLE_RATE or wav_file.getnchannels() != 1 or wav_file.getsampwidth() != 2:
+                raise ValueError("WAV 16kHz mono PCM16 olmalı (convert_to_wav çıktısı)")
+            frames = wav_file.readframes(wav_file.getnframes())
+        
+        pcm = np.frombuffer(frames, dtype=np.int16)
+        shared = cls(len(pcm))
+        np.multiply(pcm, 1.0 / 32768.0, out=shared.audio, casting="unsafe")
+        return shared
+    
+    def close(self) -> None:
+        """View'ları bırakır ve paylaşılan belleği siler"""
+        self.control = None
+        self.audio = None
+        try:
+            self.shm.close()
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+    
+    def __enter__(self) -> "SharedAudio":
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+class SharedDeadline(Deadline):
+    """Worker tarafı Deadline: süre yerel saatle, iptal paylaşılan kontrol byte'ından okunur"""
+    
+    def __init__(self, seconds: Optional[float], control: np.ndarray):
+        super().__init__(seconds)
+        self._control = control
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._control[0] == FLAG_CANCELLED or self._cancelled.is_set()
+
+def _worker_main(specs: Dict[str, Dict], preload: List[str], tasks, results) -> None:
+    """Worker process: preload modellerini ısıtır (diğerleri ilk kullanımda), kuyruktan iş alıp sonucu döndürür"""
+    # Ctrl+C API process'inde ele alınır; worker'lar None mesajıyla kapanır
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logging.basicConfig(level=logging.INFO)
+    
+    from utils.batch_infer import transcribe_batch
+    from utils.long_audio import transcribe_chunk
+    from utils.model_manager import ModelManager
+    from utils.tracking import asr_words_with_timestamps, transcribe_text
+    
+    manager = ModelManager(specs)
+    for name in preload:
+        try:
+            manager.warmup(name)
+        except Exception as e:
+            logger.error(f"ASR worker model yükleme hatası ({name}): {e}")
+    
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        
+        task_id, op, model_name, shm_name, n_samples, params = task
+        shm = None
+        control = None
+        audio = None
+        clips = None
+        deadline = None
+        try:
+            # spawn ile worker'lar API process'inin resource tracker'ını paylaşır;
+            # bellek API tarafında unlink edilir
+            shm = SharedMemory(name=shm_name)
+            control = np.ndarray((CONTROL_BYTES,), dtype=np.uint8, buffer=shm.buf)
+            audio = np.ndarray((n_samples,), dtype=np.float32, buffer=shm.buf, offset=CONTROL_BYTES)
+            
+            model = manager.get(model_name)
+            # Bütçe duvar saatiyle gelir: kuyrukta geçen süre de bütçeden düşülür
+            deadline_at = params.get("deadline_at")
+            deadline = SharedDeadline(
+                max(0.0, deadline_at - time.time()) if deadline_at is not None else None,
+                control
+            )
+            
+            if op == OP_TEXT:
+                def on_segment(text, logprob):
+                    if params.get("progress"):
+                        results.put((task_id, MSG_PROGRESS, (text, logprob)))
+                    # API bir önceki segmentte durdurma kararı verdiyse
+                    return control[0] == FLAG_STOP
+                
+                result = transcribe_text(
+                    model,
+                    audio,
+                    params["beam_size"],
+                    deadline,
+                    params.get("enough_words"),
+                    on_segment
+                )
+            elif op == OP_WORDS:
+                sent = [0]
+                
+                def on_segment(rec_words, end_seconds):
+                    if params.get("progress"):
+                        # Sadece yeni kelimeler gönderilir (API tarafında birleştirilir)
+                        results.put((task_id, MSG_PROGRESS, (rec_words[sent[0]:], end_seconds)))
+                        sent[0] = len(rec_words)
+                
+                result = asr_words_with_timestamps(audio, model, deadline, on_segment)
+            elif op == OP_BATCH:
+                clips = [audio[start:end] for start, end in params["bounds"]]
+                result = transcribe_batch(model, clips, params["beam_size"])
+            elif op == OP_CHUNK:
+                start, end = params["bounds"]
+                result = transcribe_chunk(model, audio[start:end], start, params["beam_size"])
+            else:
+                raise ValueError(f"Bilinmeyen ASR işlemi: {op}")
+            
+            results.put((task_id, MSG_DONE, result))
+        except Exception as e:
+            results.put((task_id, MSG_ERROR, f"{type(e).__name__}: {e}"))
+        finally:
+            # Paylaşılan belleğe referans kalmamalı (aksi halde close BufferError verir)
+            del control, audio, clips, deadline
+            if shm is not None:
+                try:
+                    shm.close()
+                except BufferError:
+                    # Hata traceback'i view tutuyorsa mapping process kapanınca bırakılır
+                    pass
+
+class AsrWorkerPool:
+    """
+    ASR worker process havuzu
+    
+    İşler havuzda sıraya girer ve boştaki worker'ın kendi kuyruğuna verilir; hangi işin
+    hangi worker'da olduğu tutulur. Sonuçları bir collector thread'i okur ve ilgili Future'ı
+    tamamlar; segment ilerlemeleri (on_progress) de bu thread'de çağrılır. Collector ölen
+    worker'ları da izler: elindeki iş hata ile sonlanır ve worker yeniden başlatılır.
+    """
+    
+    def __init__(self, specs: Dict[str, Dict], workers: int, preload: Optional[List[str]] = None):
+        """
+        Args:
+            specs: Worker başına yüklenecek modeller ({isim: WhisperModel kwargs}, ModelManager biçimi)
+            workers: Process sayısı
+            preload: Worker başlarken yüklenip ısıtılacak modeller (diğerleri ilk kullanımda)
+        """
+        self.specs = specs
+        self.workers = workers
+        self.preload = preload or []
+        self._ctx = mp.get_context("spawn")
+        self._results = None
+        # Worker indeksine göre process ve iş kuyruğu
+        self._processes: List = []
+        self._inboxes: List = []
+        # worker indeksi -> üzerinde çalışan task_id
+        self._running: Dict[int, int] = {}
+        # Boş worker bekleyen işler
+        self._backlog: Deque[Tuple] = deque()
+        self._stopping = False
+        self._collector: Optional[threading.Thread] = None
+        self._pending: Dict[int, Tuple[Future, Optional[Callable]]] = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._stats = {
+            "submitted": 0, "completed": 0, "failed": 0, "expired": 0, "restarted": 0, "busy_seconds": 0.0
+        }
+    
+    def _spawn(self, index: int) -> None:
+        """index'teki worker'ı (yeniden) başlatır; ölen process'in kuyruğu kullanılmaz"""
+        inbox = self._ctx.Queue()
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(self.specs, self.preload, inbox, self._results),
+            name=f"asr-worker-{index}",
+            daemon=True
+        )
+        process.start()
+        if index < len(self._processes):
+            self._processes[index] = process
+            self._inboxes[index] = inbox
+        else:
+            self._processes.append(process)
+            self._inboxes.append(inbox)
+    
+    def start(self) -> None:
+        """Worker process'lerini ve collector thread'ini başlatır"""
+        if self._processes:
+            return
+        
+        self._stopping = False
+        self._results = self._ctx.Queue()
+        for i in range(self.workers):
+            self._spawn(i)
+        
+        self._collector = threading.Thread(target=self._collect, name="asr-collector", daemon=True)
+        self._collector.start()
+        logger.info(f"ASR worker havuzu başlatıldı: {self.workers} process")
+    
+    def stop(self) -> None:
+        """Worker'ları kapatır; bekleyen işler hata ile sonlanır"""
+        if not self._processes:
+            return
+        
+        with self._lock:
+            self._stopping = True
+            self._backlog.clear()
+        for inbox in self._inboxes:
+            inbox.put(None)
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        self._inboxes = []
+        
+        # Collector'ı durdur
+        self._results.put(None)
+        self._collector.join(timeout=5)
+        
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._running = {}
+        for future, _ in pending.values():
+            if not future.done():
+                future.set_exception(RuntimeError("ASR worker havuzu kapatıldı"))
+    
+    def _dispatch(self) -> None:
+        """Sıradaki işleri boştaki canlı worker'lara verir (lock tutularak çağrılır)"""
+        idle = [
+            i for i, process in enumerate(self._processes)
+            if i not in self._running and process.is_alive()
+        ]
+        while idle and self._backlog:
+            task = self._backlog.popleft()
+            task_id = task[0]
+            entry = self._pending.get(task_id)
+            if entry is None or entry[0].done():
+                # Başlamadan iptal edilmiş / süresi dolmuş iş
+                self._pending.pop(task_id, None)
+                continue
+            index = idle.pop(0)
+            self._running[index] = task_id
+            self._inboxes[index].put(task)
+    
+    def _supervise(self) -> None:
+        """Ölen worker'ların işini hata ile sonlandırır ve worker'ı yeniden başlatır"""
+        failed = []
+        with self._lock:
+            if self._stopping:
+                return
+            for index, process in enumerate(self._processes):
+                if process.is_alive():
+                    continue
+                
+                task_id = self._running.pop(index, None)
+                entry = self._pending.pop(task_id, None) if task_id is not None else None
+                if entry is not None:
+                    failed.append(entry[0])
+                logger.error(
+                    f"✗ ASR worker {index} sonlandı (exitcode {process.exitcode}), yeniden başlatılıyor"
+                    + (f"; iş {task_id} başarısız" if task_id is not None else "")
+                )
+                self._stats["restarted"] += 1
+                self._spawn(index)
+            self._dispatch()
+        
+        for future in failed:
+            self._stats["failed"] += 1
+            if not future.done():
+                future.set_exception(RuntimeError("ASR worker process'i beklenmedik şekilde sonlandı"))
+    
+    def _collect(self) -> None:
+        last_check = time.monotonic()
+        while True:
+            try:
+                message = self._results.get(timeout=SUPERVISE_SECONDS)
+            except queue.Empty:
+                message = False
+            if message is None:
+                return
+            
+            if time.monotonic() - last_check >= SUPERVISE_SECONDS:
+                last_check = time.monotonic()
+                self._supervise()
+            if message is False:
+                continue
+            
+            task_id, kind, payload = message
+            with self._lock:
+                entry = self._pending.get(task_id)
+                if kind != MSG_PROGRESS:
+                    self._pending.pop(task_id, None)
+                    # Worker boşaldı: sıradaki işi al
+                    for index, running_id in list(self._running.items()):
+                        if running_id == task_id:
+                            del self._running[index]
+                    self._dispatch()
+            if entry is None:
+                continue
+            
+            future, on_progress = entry
+            if kind == MSG_PROGRESS:
+                if on_progress is not None and not future.done():
+                    try:
+                        on_progress(payload)
+                    except Exception as e:
+                        logger.warning(f"ASR ilerleme callback hatası: {e}")
+            elif future.done():
+                # Süresi dolduğu için bırakılmış iş; sonuç kullanılmaz
+                continue
+            elif kind == MSG_DONE:
+                self._stats["completed"] += 1
+                future.set_result(payload)
+            else:
+                self._stats["failed"] += 1
+                future.set_exception(RuntimeError(payload))
+    
+    def submit(
+        self,
+        op: str,
+        model_name: str,
+        shared: SharedAudio,
+        params: Dict,
+        on_progress: Optional[Callable] = None
+    ) -> Future:
+        """İşi sıraya koyar (thread-safe); sonuç Future ile döner"""
+        if not self._processes:
+            raise RuntimeError("ASR worker havuzu başlatılmadı")
+        
+        task_id = next(self._ids)
+        future: Future = Future()
+        params = {**params, "progress": on_progress is not None}
+        with self._lock:
+            self._pending[task_id] = (future, on_progress)
+            self._backlog.append((task_id, op, model_name, shared.name, shared.n_samples, params))
+            self._dispatch()
+        self._stats["submitted"] += 1
+        return future
+    
+    def _params(self, params: Dict, deadline: Optional[Deadline]) -> Dict:
+        """Deadline worker'a duvar saatiyle iletilir (process'ler arası ortak saat)"""
+        if deadline is None or deadline.expires_at is None:
+            return params
+        return {**params, "deadline_at": time.time() + deadline.remaining()}
+    
+    async def _wait(
+        self,
+        future: Future,
+        shared: SharedAudio,
+        deadline: Optional[Deadline],
+        on_expired: Optional[Callable[[], Any]],
+        poll_seconds: float
+    ):
+        """
+        İşin sonucunu bekler; iptal worker'a kontrol byte'ıyla iletilir
+        
+        Deadline dolduktan DEADLINE_GRACE_SECONDS sonra hâlâ sonuç yoksa iş bırakılır
+        ve on_expired() (kısmi sonuç) döner.
+        """
+        wrapped = asyncio.wrap_future(future)
+        try:
+            while True:
+                done, _ = await asyncio.wait({wrapped}, timeout=poll_seconds)
+                if done:
+                    return wrapped.result()
+                if deadline is None:
+                    continue
+                if deadline.cancelled:
+                    shared.control[0] = FLAG_CANCELLED
+                elif deadline.expires_at is not None and time.monotonic() >= deadline.expires_at + DEADLINE_GRACE_SECONDS:
+                    # Worker çalışıyorsa bir sonraki segmentte durur; sıradaysa hiç başlamaz
+                    shared.control[0] = FLAG_CANCELLED
+                    wrapped.cancel()
+                    self._stats["expired"] += 1
+                    return on_expired() if on_expired is not None else None
+        except asyncio.CancelledError:
+            shared.control[0] = FLAG_CANCELLED
+            raise
+    
+    async def run(
+        self,
+        op: str,
+        model_name: str,
+        shared: SharedAudio,
+        params: Dict,
+        deadline: Optional[Deadline] = None,
+        on_progress: Optional[Callable] = None,
+        on_expired: Optional[Callable[[], Any]] = None,
+        poll_seconds: float = 0.2
+    ):
+        """
+        İşi çalıştırır ve sonucu bekler; API tarafı deadline iptali worker'a kontrol byte'ıyla iletilir
+        
+        Args:
+            on_expired: Deadline dolup worker sonuç vermezse dönülecek kısmi sonucu üretir
+        
+        Raises:
+            RuntimeError: Worker'da hata veya worker process'i öldü
+        """
+        shared.control[0] = FLAG_NONE
+        start = time.monotonic()
+        future = self.submit(op, model_name, shared, self._params(params, deadline), on_progress)
+        try:
+            return await self._wait(future, shared, deadline, on_expired, poll_seconds)
+        finally:
+            self._stats["busy_seconds"] += time.monotonic() - start
+    
+    async def transcribe_text(
+        self,
+        model_name: str,
+        shared: SharedAudio,
+        beam_size: int,
+        deadline: Optional[Deadline] = None,
+        enough_words: Optional[int] = None,
+        on_segment: Optional[Callable[[str, Optional[float]], bool]] = None
+    ) -> Tuple[str, Optional[float], Optional[str]]:
+        """
+        transcribe_text'in worker karşılığı
+        
+        on_segment API process'inde (collector thread'inde) çağrılır; True dönerse worker
+        bir sonraki segmentten sonra durur (stop_reason "confident").
+        """
+        # Son ilerleme: deadline'da worker yanıt vermezse kısmi sonuç olarak döner
+        last = {"text": "", "logprob": None}
+        
+        def on_progress(payload):
+            last["text"], last["logprob"] = payload
+            if on_segment is not None and on_segment(*payload):
+                shared.control[0] = FLAG_STOP
+        
+        transcript, avg_logprob, stop_reason = await self.run(
+            OP_TEXT,
+            model_name,
+            shared,
+            {"beam_size": beam_size, "enough_words": enough_words},
+            deadline=deadline,
+            on_progress=on_progress,
+            on_expired=lambda: (last["text"], last["logprob"], STOP_DEADLINE)
+        )
+        if stop_reason == STOP_CANCELLED and deadline is not None:
+            deadline.cancel()
+        return transcript, avg_logprob, stop_reason
+    
+    async def asr_words(
+        self,
+        model_name: str,
+        shared: SharedAudio,
+        deadline: Optional[Deadline] = None,
+        on_segment: Optional[Callable[[List[Dict], float], None]] = None
+    ) -> List[Dict]:
+        """asr_words_with_timestamps'in worker karşılığı (on_segment birikmiş kelimelerle çağrılır)"""
+        rec_words: List[Dict] = []
+        
+        def on_progress(payload):
+            new_words, end_seconds = payload
+            rec_words.extend(new_words)
+            if on_segment is not None:
+                on_segment(rec_words, end_seconds)
+        
+        return await self.run(
+            OP_WORDS,
+            model_name,
+            shared,
+            {},
+            deadline=deadline,
+            on_progress=on_progress,
+            on_expired=lambda: list(rec_words)
+        )
+    
+    async def transcribe_batch(
+        self,
+        model_name: str,
+        clips: List[np.ndarray],
+        beam_size: int
+    ) -> List[Dict]:
+        """transcribe_batch'in worker karşılığı: kayıtlar tek paylaşılan bellekte art arda gider"""
+        shared, bounds = await asyncio.get_running_loop().run_in_executor(None, SharedAudio.from_clips, clips)
+        with shared:
+            return await self.run(OP_BATCH, model_name, shared, {"bounds": bounds, "beam_size": beam_size})
+    
+    async def transcribe_long(
+        self,
+        model_name: str,
+        shared: SharedAudio,
+        beam_size: int = 3,
+        max_chunk_s: float = 30.0,
+        deadline: Optional[Deadline] = None,
+        on_chunk: Optional[Callable[[List[Dict], float], None]] = None,
+        poll_seconds: float = 0.2
+    ) -> Tuple[List[Dict], Dict]:
+        """
+        long_audio.transcribe_long'un worker karşılığı: parçalar worker'lara dağıtılır
+        
+        on_chunk her parça sırayla tamamlandığında executor thread'inde çağrılır. Deadline
+        dolarsa/iptal edilirse başlamamış parçalar bırakılır.
+        """
+        from utils.long_audio import split_on_silence
+        
+        loop = asyncio.get_running_loop()
+        chunks = await loop.run_in_executor(None, split_on_silence, shared.audio, max_chunk_s)
+        logger.info(f"Long-audio (ASR worker): {shared.n_samples / SAMPLE_RATE:.1f} sn, {len(chunks)} parça")
+        
+        shared.control[0] = FLAG_NONE
+        start_time = time.monotonic()
+        futures = [
+            self.submit(OP_CHUNK, model_name, shared, {"bounds": bounds, "beam_size": beam_size})
+            for bounds in chunks
+        ]
+        
+        # Parçalar sırayla toplanır (zaman ekseni korunur)
+        rec_words: List[Dict] = []
+        try:
+            for future, (start, end) in zip(futures, chunks):
+                rec_words.extend(await self._wait(future, shared, deadline, list, poll_seconds))
+                
+                if on_chunk is not None:
+                    await loop.run_in_executor(None, on_chunk, rec_words, end / SAMPLE_RATE)
+                
+                if deadline is not None and deadline.stop_reason():
+                    logger.info(f"Long-audio kesildi: {deadline.stop_reason()}")
+                    break
+        finally:
+            for future in futures:
+                future.cancel()
+            self._stats["busy_seconds"] += time.monotonic() - start_time
+        
+        rec_words.sort(key=lambda w: w["start_ms"])
+        
+        return rec_words, {
+            "chunks": len(chunks),
+            "workers": self.workers,
+            "audio_seconds": round(shared.n_samples / SAMPLE_RATE, 2)
+        }
+    
+    def status(self) -> Dict:
+        return {
+            "workers": self.workers,
+            "alive": sum(1 for p in self._processes if p.is_alive()),
+            "pending": len(self._pending),
+            **{k: round(v, 2) if isinstance(v, float) else v for k, v in self._stats.items()}
+        }
+
+def worker_specs(specs: Dict[str, Dict], names: List[str], cpu_threads: Optional[int] = None) -> Dict[str, Dict]:
+    """
+    Worker process'leri için model spec'leri: her process tek decode yürütür (num_workers=1)
+    
+    Args:
+        cpu_threads: Worker başına thread (default: spec'teki)
+    """
+    result = {}
+    for name in names:
+        spec = {k: v for k, v in specs[name].items() if k != "cpu_affinity"}
+        spec["num_workers"] = 1
+        if cpu_threads:
+            spec["cpu_threads"] = cpu_threads
+        result[name] = spec
+    return result
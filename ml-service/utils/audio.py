@@ -1,11 +1,15 @@
 """
 Ses dosyası dönüştürme: webm/ogg/m4a -> WAV 16k mono
+Live için: sıkıştırılmış stream (Opus/WebM, Ogg) -> PCM16 16k mono (kalıcı ffmpeg pipe)
 """
 
 import os
+import queue
 import subprocess
 import tempfile
+import threading
 from pathlib import Path
+from typing import Optional
 import imageio_ffmpeg
 import logging
 
@@ -67,3 +71,123 @@ def convert_to_wav(input_path: str, output_path: str = None) -> str:
         logger.error(error_msg)
         raise RuntimeError(error_msg)
 
+class StreamingDecoder:
+    """
+    Oturum başına tek, uzun ömürlü ffmpeg süreci ile sıkıştırılmış ses stream'ini çözer
+    
+    Gelen parçalar sınırlı bir kuyruk üzerinden ffmpeg stdin'ine yazılır; ffmpeg'in
+    ürettiği PCM16 (16kHz mono) ayrı bir thread'de toplanır ve read() ile alınır.
+    Kuyruk dolduğunda feed() False döner (backpressure): çağıran taraf soketten
+    okumayı bekletmeli, böylece yavaş client'lar TCP seviyesinde yavaşlatılır.
+    """
+    
+    def __init__(
+        self,
+        input_format: Optional[str] = None,
+        sample_rate: int = 16000,
+        max_pending_chunks: int = 64
+    ):
+        """
+        Args:
+            input_format: ffmpeg demuxer adı ("webm", "ogg"...); None ise otomatik algılama
+            sample_rate: Çıkış sample rate
+            max_pending_chunks: ffmpeg'e yazılmayı bekleyen en fazla parça sayısı
+        """
+        ffmpeg_exe = imageio_ffmpeg.get_ffmpeg_exe()
+        
+        cmd = [ffmpeg_exe, '-hide_banner', '-loglevel', 'error']
+        if input_format:
+            cmd += ['-f', input_format]
+        cmd += [
+            '-i', 'pipe:0',
+            '-ac', '1',
+            '-ar', str(sample_rate),
+            '-f', 's16le',  # Ham PCM16 little-endian
+            'pipe:1'
+        ]
+        
+        self.sample_rate = sample_rate
+        self._proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=0
+        )
+        self._pending: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=max_pending_chunks)
+        self._out = bytearray()
+        self._lock = threading.Lock()
+        self.bytes_in = 0
+        self.error: Optional[str] = None
+        
+        self._writer = threading.Thread(target=self._write_loop, name="ffmpeg-writer", daemon=True)
+        self._reader = threading.Thread(target=self._read_loop, name="ffmpeg-reader", daemon=True)
+        self._writer.start()
+        self._reader.start()
+        logger.info(f"Streaming decoder başlatıldı ({input_format or 'auto'})")
+    
+    def _write_loop(self):
+        while True:
+            chunk = self._pending.get()
+            if chunk is None:
+                break
+            try:
+                self._proc.stdin.write(chunk)
+            except (BrokenPipeError, OSError) as e:
+                self.error = f"FFmpeg stdin hatası: {e}"
+                logger.error(self.error)
+                break
+        try:
+            self._proc.stdin.close()
+        except OSError:
+            pass
+    
+    def _read_loop(self):
+        while True:
+            data = self._proc.stdout.read(8192)
+            if not data:
+                break
+            with self._lock:
+                self._out.extend(data)
+    
+    @property
+    def pending_chunks(self) -> int:
+        """ffmpeg'e henüz yazılmamış parça sayısı"""
+        return self._pending.qsize()
+    
+    def feed(self, data: bytes) -> bool:
+        """
+        Sıkıştırılmış veri parçasını kuyruğa ekler (bloklamaz)
+        
+        Returns:
+            False: Kuyruk dolu (backpressure), parça eklenmedi
+        """
+        if self.error:
+            raise RuntimeError(self.error)
+        try:
+            self._pending.put_nowait(bytes(data))
+        except queue.Full:
+            return False
+        self.bytes_in += len(data)
+        return True
+    
+    def read(self) -> bytes:
+        """Şimdiye kadar çözülen PCM16 verisini döndürür ve iç tampondan siler"""
+        with self._lock:
+            # Yarım kalan sample bir sonraki okumaya bırakılır
+            n = len(self._out) - (len(self._out) % 2)
+            data = bytes(self._out[:n])
+            del self._out[:n]
+        return data
+    
+    def close(self, timeout: float = 2.0) -> None:
+        """Stdin'i kapatır ve ffmpeg sürecini sonlandırır"""
+        try:
+            self._pending.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        try:
+            self._proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+            self._proc.wait()
@@ -0,0 +1,148 @@
+"""
+Toplu /infer: kısa kayıtları paralel decode eder ve tek bir batched encoder/decoder çağrısıyla transcribe eder
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from faster_whisper import WhisperModel, decode_audio
+from faster_whisper.tokenizer import Tokenizer
+from faster_whisper.transcribe import get_suppressed_tokens, pad_or_trim
+from faster_whisper.vad import VadOptions, get_speech_timestamps
+from utils.audio import convert_to_wav
+import logging
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+# Whisper encoder penceresi; daha uzun konuşma tek başına (segment bazında) transcribe edilir
+MAX_CLIP_SECONDS = 30.0
+
+def _decode_one(input_path: str) -> np.ndarray:
+    """Dosyayı 16kHz mono float32'ye çevirir ve VAD ile sadece konuşma kısımlarını bırakır"""
+    wav_path = convert_to_wav(input_path)
+    try:
+        audio = decode_audio(wav_path, sampling_rate=SAMPLE_RATE)
+    finally:
+        if os.path.exists(wav_path):
+            os.remove(wav_path)
+    
+    speech = get_speech_timestamps(audio, VadOptions(), sampling_rate=SAMPLE_RATE)
+    if not speech:
+        return np.zeros(0, dtype=np.float32)
+    return np.concatenate([audio[s["start"]:s["end"]] for s in speech])
+
+def decode_clips(input_paths: List[str], max_workers: Optional[int] = None) -> List[Tuple[Optional[np.ndarray], Optional[str]]]:
+    """
+    Dosyaları paralel decode eder (her biri ayrı ffmpeg process'i)
+    
+    Returns:
+        Girdi sırasıyla [(audio, hata)]; hata varsa audio None
+    """
+    max_workers = max_workers or min(len(input_paths), os.cpu_count() or 1) or 1
+    
+    def _safe(path):
+        try:
+            return _decode_one(path), None
+        except Exception as e:
+            return None, str(e)
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(_safe, input_paths))
+
+def _transcribe_single(model: WhisperModel, audio: np.ndarray, beam_size: int) -> Dict:
+    """30 sn'den uzun konuşma için normal (segment bazında) transcribe"""
+    segments, _ = model.transcribe(
+        audio,
+        language="ar",
+        beam_size=beam_size,
+        vad_filter=False  # VAD decode aşamasında uygulandı
+    )
+    
+    parts = []
+    logprob_sum = 0.0
+    duration_sum = 0.0
+    for segment in segments:
+        parts.append(segment.text.strip())
+        duration = max(segment.end - segment.start, 0.01)
+        logprob_sum += segment.avg_logprob * duration
+        duration_sum += duration
+    
+    return {
+        "text": " ".join(parts),
+        "avg_logprob": logprob_sum / duration_sum if duration_sum > 0 else None,
+        "batched": False
+    }
+
+def transcribe_batch(
+    model: WhisperModel,
+    audios: List[np.ndarray],
+    beam_size: int = 3,
+    batch_size: int = 8
+) -> List[Dict]:
+    """
+    Kısa kayıtları batch halinde transcribe eder (tek encoder + tek generate çağrısı / batch)
+    
+    Her kayıt 30 sn'lik Whisper penceresine pad edilir; daha uzun kayıtlar tek tek transcribe edilir.
+    Sıcaklık fallback'i yoktur (greedy/beam, temperature 0).
+    
+    Args:
+        model: WhisperModel instance
+        audios: float32 16kHz mono ses dizileri
+        beam_size: Beam genişliği
+        batch_size: Bir generate çağrısındaki en fazla kayıt
+    
+    Returns:
+        Girdi sırasıyla [{"text", "avg_logprob", "batched"}]
+    """
+    results: List[Optional[Dict]] = [None] * len(audios)
+    
+    tokenizer = Tokenizer(
+        model.hf_tokenizer,
+        model.model.is_multilingual,
+        task="transcribe",
+        language="ar"
+    )
+    prompt = model.get_prompt(tokenizer, previous_tokens=[], without_timestamps=True)
+    suppress_tokens = get_suppressed_tokens(tokenizer, [-1])
+    
+    short = []
+    for i, audio in enumerate(audios):
+        if len(audio) == 0:
+            results[i] = {"text": "", "avg_logprob": None, "batched": False}
+        elif len(audio) > MAX_CLIP_SECONDS * SAMPLE_RATE:
+            results[i] = _transcribe_single(model, audio, beam_size)
+        else:
+            short.append(i)
+    
+    for batch_start in range(0, len(short), batch_size):
+        batch = short[batch_start:batch_start + batch_size]
+        features = np.stack([
+            pad_or_trim(model.feature_extractor(audios[i])[..., :-1])
+            for i in batch
+        ])
+        
+        encoder_output = model.encode(features)
+        outputs = model.model.generate(
+            encoder_output,
+            [list(prompt) for _ in batch],
+            beam_size=beam_size,
+            max_length=model.max_length,
+            suppress_blank=True,
+            suppress_tokens=suppress_tokens,
+            return_scores=True
+        )
+        
+        for i, output in zip(batch, outputs):
+            tokens = output.sequences_ids[0]
+            # generate skoru uzunlukla normalize (length_penalty=1): avg_logprob'a çevir
+            cum_logprob = output.scores[0] * len(tokens)
+            results[i] = {
+                "text": tokenizer.decode(tokens).strip(),
+                "avg_logprob": cum_logprob / (len(tokens) + 1),
+                "batched": True
+            }
+    
+    logger.info(f"Batch ASR: {len(short)} kayıt batched, {len(audios) - len(short)} tek tek")
+    return results
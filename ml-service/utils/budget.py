@@ -0,0 +1,76 @@
+"""
+Decode bütçesi: istek/tick başına deadline, iptal ve bütçeye göre sınırlandırılmış decode ayarları
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+# faster-whisper varsayılanı 6 sıcaklık (0.0 ... 1.0) ile tekrar decode eder; bütçede en fazla 3
+FALLBACK_TEMPERATURES = (0.0, 0.2, 0.4)
+# Kalan süre bunun altındaysa fallback ve beam kapatılır
+LOW_BUDGET_SECONDS = 3.0
+
+# Durma nedenleri
+STOP_DEADLINE = "deadline"
+STOP_CANCELLED = "cancelled"
+STOP_ENOUGH_TEXT = "enough_text"
+STOP_CONFIDENT = "confident"
+
+class Deadline:
+    """
+    Süre sınırı + iptal bayrağı
+    
+    Decode döngüsü her segmentten sonra stop_reason() ile kontrol eder;
+    client bağlantısı koparsa cancel() çağrılır.
+    """
+    
+    def __init__(self, seconds: Optional[float]):
+        """
+        Args:
+            seconds: Bütçe (sn); None ise süre sınırı yok (sadece iptal)
+        """
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds if seconds is not None else None
+        self._cancelled = threading.Event()
+    
+    def remaining(self) -> Optional[float]:
+        """Kalan süre (sn); sınırsızsa None"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+    
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+    
+    def cancel(self) -> None:
+        self._cancelled.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+    
+    def stop_reason(self) -> Optional[str]:
+        """Durulması gerekiyorsa nedeni, yoksa None"""
+        if self.cancelled:
+            return STOP_CANCELLED
+        if self.expired():
+            return STOP_DEADLINE
+        return None
+
+def budget_decode_options(deadline: Optional[Deadline], beam_size: int) -> Dict:
+    """
+    Kalan bütçeye göre model.transcribe ayarları
+    
+    - Bütçe yoksa: sadece beam_size (faster-whisper varsayılanları)
+    - Bütçe varsa: sıcaklık fallback'leri FALLBACK_TEMPERATURES ile sınırlanır
+    - Bütçe azsa: greedy (beam 1), fallback yok
+    """
+    if deadline is None or deadline.expires_at is None:
+        return {"beam_size": beam_size}
+    
+    remaining = deadline.remaining()
+    if remaining < LOW_BUDGET_SECONDS:
+        return {"beam_size": 1, "best_of": 1, "temperature": 0.0}
+    
+    return {"beam_size": beam_size, "temperature": list(FALLBACK_TEMPERATURES)}
@@ -0,0 +1,367 @@
+"""
+CPU topolojisi: model havuzları için cpu_threads / num_workers / compute_type / CPU affinity
+ayarları, ortam değişkeni override'ları ve başlangıçta kısa bir klip ile otomatik ayar (auto-tune)
+
+CTranslate2'de bir model num_workers (paralel decode) x cpu_threads (decode başına thread)
+kadar thread kullanır. Live ve offline havuzları uvicorn ve ffmpeg ile aynı çekirdekleri
+paylaştığı için toplam thread sayısı kullanılabilir çekirdekleri aşmamalıdır.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+# Tek decode'da bu kadar thread'in üstü neredeyse hızlandırmaz; fazlası ayrı worker'a verilir
+MAX_THREADS_PER_WORKER = 4
+# Live havuzunun en fazla thread sayısı (latency; tek oturum)
+MAX_LIVE_THREADS = 4
+# Long-audio pool'unda process başına thread (parçalar arası paralellik thread'den daha verimli)
+LONG_AUDIO_THREADS = 2
+
+def usable_cpus() -> List[int]:
+    """Process'in çalışabileceği CPU'lar (container/cgroup affinity dahil)"""
+    try:
+        return sorted(os.sched_getaffinity(0))
+    except AttributeError:
+        # sched_getaffinity olmayan platformlar (Windows, macOS)
+        return list(range(os.cpu_count() or 1))
+
+def parse_cpu_list(value: str) -> List[int]:
+    """
+    "0-3,8,10-11" biçimindeki CPU listesini çözer
+    
+    Raises:
+        ValueError: Geçersiz biçim
+    """
+    cpus = set()
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-", 1)
+            cpus.update(range(int(start), int(end) + 1))
+        else:
+            cpus.add(int(part))
+    return sorted(cpus)
+
+def split_cores(cores: int, max_threads: int) -> Tuple[int, int]:
+    """
+    Çekirdek payını (cpu_threads, num_workers)'a böler; pay boşta çekirdek bırakmaz
+    
+    Kalan çekirdekler max_threads'in yarısı veya fazlasıysa bir worker daha eklenir
+    (örn. 11 çekirdek / 4 -> 3 x 4); azsa worker başına thread artırılır (9 / 4 -> 2 x 5).
+    CTranslate2'de worker'ların thread sayısı aynı olduğu için fazlalık tek worker'a verilemez.
+    """
+    cores = max(1, cores)
+    threads = min(max_threads, cores)
+    workers, remainder = divmod(cores, threads)
+    if remainder * 2 >= threads:
+        workers += 1
+    threads = max(threads, -(-cores // workers))
+    return threads, workers
+
+def plan_topology(cpus: Optional[List[int]] = None, pin: bool = False) -> Dict[str, Dict]:
+    """
+    Varsayılan dağılım: çekirdekler live ve offline havuzları arasında bölünür
+    
+    4+ çekirdekte 1 çekirdek uvicorn/ffmpeg için ayrılır. Live havuzu tek oturum için
+    en fazla MAX_LIVE_THREADS alır; offline havuzu kalan çekirdekleri
+    MAX_THREADS_PER_WORKER'lık worker'lara böler (num_workers eşzamanlı decode; artan
+    çekirdekler split_cores ile dağıtılır, live + offline + ayrılan = toplam).
+    Long-audio process pool'u offline çekirdek payını kullanır (çalışırken offline
+    slotlarının hepsini tutar), payı LONG_AUDIO_THREADS'lik process'lere böler.
+    Cascade'in tiny katmanı (ayrı model örneği) offline payında offline ile aynı
+    worker düzeniyle çalışır; live modelini ve çekirdeklerini live tick'lerine bırakır.
+    Tek çekirdekte offline havuzu live ile aynı çekirdeği paylaşır (ayrık payı 0).
+    
+    Args:
+        cpus: Kullanılabilir CPU'lar (default: usable_cpus())
+        pin: True ise havuzlara ayrık CPU kümeleri (affinity) atanır
+    
+    Returns:
+        {"live": {...}, "offline": {...}, "long_audio": {...}, "cascade": {...}};
+        her biri cpu_threads, num_workers, cpu_affinity ve cores (ayrık çekirdek payı)
+    """
+    cpus = cpus or usable_cpus()
+    total = len(cpus)
+    reserved = 1 if total >= 4 else 0
+    
+    live_threads = max(1, min(MAX_LIVE_THREADS, total // 4))
+    offline_cores = total - reserved - live_threads
+    offline_threads, offline_workers = split_cores(offline_cores, MAX_THREADS_PER_WORKER)
+    long_threads, long_workers = split_cores(offline_cores, LONG_AUDIO_THREADS)
+    
+    topology = {
+        "live": {"cpu_threads": live_threads, "num_workers": 1, "cpu_affinity": None, "cores": live_threads},
+        "offline": {
+            "cpu_threads": offline_threads, "num_workers": offline_workers,
+            "cpu_affinity": None, "cores": offline_cores
+        },
+        "long_audio": {
+            "cpu_threads": long_threads, "num_workers": long_workers,
+            "cpu_affinity": None, "cores": offline_cores
+        },
+        "cascade": {
+            "cpu_threads": offline_threads, "num_workers": offline_workers,
+            "cpu_affinity": None, "cores": offline_cores
+        },
+    }
+    
+    if pin and total >= 2:
+        # Son çekirdekler live'a, ortadakiler offline'a; ilk `reserved` çekirdek uvicorn/ffmpeg'e kalır
+        topology["live"]["cpu_affinity"] = cpus[total - live_threads:]
+        offline_set = cpus[reserved:total - live_threads]
+        topology["offline"]["cpu_affinity"] = offline_set or cpus[:total - live_threads]
+        topology["long_audio"]["cpu_affinity"] = topology["offline"]["cpu_affinity"]
+        topology["cascade"]["cpu_affinity"] = topology["offline"]["cpu_affinity"]
+    
+    return topology
+
+def apply_env_overrides(topology: Dict[str, Dict], environ=os.environ) -> Dict[str, Dict]:
+    """
+    MODEL_<HAVUZ>_{CPU_THREADS,NUM_WORKERS,COMPUTE_TYPE,CPU_AFFINITY} override'larını uygular
+    
+    Örn. MODEL_OFFLINE_CPU_THREADS=8, MODEL_LIVE_CPU_AFFINITY=12-15
+    """
+    for name, entry in topology.items():
+        prefix = f"MODEL_{name.upper()}_"
+        if environ.get(prefix + "CPU_THREADS"):
+            entry["cpu_threads"] = max(1, int(environ[prefix + "CPU_THREADS"]))
+        if environ.get(prefix + "NUM_WORKERS"):
+            entry["num_workers"] = max(1, int(environ[prefix + "NUM_WORKERS"]))
+        if environ.get(prefix + "COMPUTE_TYPE"):
+            entry["compute_type"] = environ[prefix + "COMPUTE_TYPE"]
+        if environ.get(prefix + "CPU_AFFINITY"):
+            entry["cpu_affinity"] = parse_cpu_list(environ[prefix + "CPU_AFFINITY"])
+    return topology
+
+def apply_topology(specs: Dict[str, Dict], topology: Dict[str, Dict]) -> None:
+    """Topoloji ayarlarını ModelManager spec'lerine yazar (model henüz yüklenmemiş olmalı)"""
+    for name, entry in topology.items():
+        if name not in specs:
+            continue
+        for key in ("cpu_threads", "num_workers", "compute_type", "cpu_affinity"):
+            if key in entry:
+                specs[name][key] = entry[key]
+
+@contextmanager
+def pinned(cpus: Optional[List[int]]):
+    """
+    Çağıran thread'i geçici olarak verilen CPU'lara bağlar (Linux; diğer platformlarda etkisiz)
+    
+    Model bu blok içinde yüklenirse CTranslate2'nin oluşturduğu thread'ler affinity'yi devralır.
+    """
+    if not cpus or not hasattr(os, "sched_setaffinity"):
+        yield
+        return
+    
+    # pid 0 = çağıran thread
+    previous = os.sched_getaffinity(0)
+    try:
+        os.sched_setaffinity(0, cpus)
+    except OSError as e:
+        logger.warning(f"CPU affinity uygulanamadı ({cpus}): {e}")
+        yield
+        return
+    try:
+        yield
+    finally:
+        os.sched_setaffinity(0, previous)
+
+def benchmark_clip(path: Optional[str] = None, seconds: float = 10.0) -> np.ndarray:
+    """
+    Auto-tune klibi: verilen dosya veya (yoksa) düşük seviyeli gürültü
+    
+    Gürültü de encoder'ı tam çalıştırır; decoder maliyeti için gerçek bir kayıt önerilir.
+    """
+    if path:
+        from faster_whisper import decode_audio
+        audio = decode_audio(path, sampling_rate=SAMPLE_RATE)
+        return audio[:int(seconds * SAMPLE_RATE)]
+    
+    rng = np.random.default_rng(0)
+    return (rng.standard_normal(int(seconds * SAMPLE_RATE)) * 0.01).astype(np.float32)
+
+def candidate_settings(cores: int, objective: str) -> List[Tuple[int, int]]:
+    """
+    Denenecek (cpu_threads, num_workers) çiftleri
+    
+    latency: tek decode, farklı thread sayıları; throughput: çekirdekler worker'lara bölünür
+    """
+    threads_options = []
+    threads = 1
+    while threads <= cores:
+        threads_options.append(threads)
+        threads *= 2
+    if cores not in threads_options:
+        threads_options.append(cores)
+    
+    if objective == "latency":
+        return [(t, 1) for t in threads_options]
+    return [(t, max(1, cores // t)) for t in threads_options]
+
+def _measure(model, audio: np.ndarray, parallel: int, repeats: int = 2) -> float:
+    """parallel eşzamanlı decode ile saniyede işlenen ses süresi (sn/sn); ilk tur warm-up"""
+    def _decode(_):
+        segments, _ = model.transcribe(
+            audio,
+            language="ar",
+            beam_size=1,
+            temperature=0.0,
+            condition_on_previous_text=False,
+            vad_filter=False
+        )
+        for _ in segments:
+            pass
+    
+    with ThreadPoolExecutor(max_workers=parallel) as pool:
+        list(pool.map(_decode, range(parallel)))
+        start = time.perf_counter()
+        for _ in range(repeats):
+            list(pool.map(_decode, range(parallel)))
+        wall = time.perf_counter() - start
+    
+    return len(audio) / SAMPLE_RATE * parallel * repeats / wall
+
+def autotune(
+    spec: Dict,
+    audio: np.ndarray,
+    objective: str = "throughput",
+    cores: Optional[int] = None,
+    compute_types: Optional[List[str]] = None
+) -> Tuple[Dict, List[Dict]]:
+    """
+    Aday ayarlarla modeli yükleyip klibi decode eder, en iyisini seçer
+    
+    Args:
+        spec: ModelManager spec'i (model_size_or_path, device, compute_type, cpu_affinity...)
+        audio: float32 16kHz mono benchmark klibi
+        objective: "throughput" (toplam sn/sn, offline) veya "latency" (tek decode, live)
+        cores: Havuza ayrılan çekirdek sayısı (default: pool_cores(spec))
+        compute_types: Denenecek compute type'lar (default: spec'teki)
+    
+    Returns:
+        (en iyi {"cpu_threads", "num_workers", "compute_type", "audio_seconds_per_second"},
+         tüm ölçümler)
+    """
+    from faster_whisper import WhisperModel
+    
+    affinity = spec.get("cpu_affinity")
+    cores = cores or pool_cores(spec)
+    compute_types = compute_types or [spec.get("compute_type", "default")]
+    base_kwargs = {
+        k: v for k, v in spec.items()
+        if k not in ("cpu_threads", "num_workers", "compute_type", "cpu_affinity")
+    }
+    
+    results = []
+    for compute_type in compute_types:
+        for cpu_threads, num_workers in candidate_settings(cores, objective):
+            try:
+                with pinned(affinity):
+                    model = WhisperModel(
+                        **base_kwargs,
+                        compute_type=compute_type,
+                        cpu_threads=cpu_threads,
+                        num_workers=num_workers
+                    )
+                    speed = _measure(model, audio, num_workers)
+                del model
+            except Exception as e:
+                logger.warning(f"Auto-tune adayı atlandı ({compute_type}, {cpu_threads}x{num_workers}): {e}")
+                continue
+            
+            results.append({
+                "cpu_threads": cpu_threads,
+                "num_workers": num_workers,
+                "compute_type": compute_type,
+                "audio_seconds_per_second": round(speed, 2)
+            })
+            logger.info(
+                f"Auto-tune {spec.get('model_size_or_path')}: {compute_type} "
+                f"{num_workers} worker x {cpu_threads} thread -> {speed:.1f} sn/sn"
+            )
+    
+    if not results:
+        raise RuntimeError("Auto-tune: hiçbir aday çalıştırılamadı")
+    
+    best = max(results, key=lambda r: r["audio_seconds_per_second"])
+    return best, results
+
+def pool_cores(spec: Dict) -> int:
+    """Havuzun çekirdek payı: affinity kümesi, yoksa planlanan cpu_threads x num_workers"""
+    if spec.get("cpu_affinity"):
+        return len(spec["cpu_affinity"])
+    if spec.get("cpu_threads"):
+        return spec["cpu_threads"] * spec.get("num_workers", 1)
+    return len(usable_cpus())
+
+def cache_key(spec: Dict, objective: str) -> str:
+    """Auto-tune sonucu host + model + çekirdek payına bağlıdır"""
+    host = os.uname().nodename if hasattr(os, "uname") else "host"
+    return f"{host}:{spec.get('model_size_or_path')}:{objective}:{pool_cores(spec)}"
+
+def load_tuning_cache(path: str) -> Dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_tuning_cache(path: str, cache: Dict) -> None:
+    """Atomik yazar (tmp + replace)"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+def autotune_pools(
+    specs: Dict[str, Dict],
+    objectives: Dict[str, str],
+    audio: np.ndarray,
+    cache_path: Optional[str] = None,
+    compute_types: Optional[List[str]] = None
+) -> Dict[str, Dict]:
+    """
+    Havuzları sırayla auto-tune eder ve sonuçları spec'lere yazar
+    
+    Sonuçlar cache_path'te saklanır; aynı host/model/çekirdek sayısı için yeniden ölçülmez.
+    
+    Returns:
+        {havuz: seçilen ayar}
+    """
+    cache = load_tuning_cache(cache_path) if cache_path else {}
+    chosen = {}
+    
+    for name, objective in objectives.items():
+        spec = specs.get(name)
+        if spec is None:
+            continue
+        key = cache_key(spec, objective)
+        best = cache.get(key)
+        if best is None:
+            best, _ = autotune(spec, audio, objective=objective, compute_types=compute_types)
+            cache[key] = best
+        else:
+            logger.info(f"Auto-tune ({name}) cache'ten: {best}")
+        
+        for k in ("cpu_threads", "num_workers", "compute_type"):
+            spec[k] = best[k]
+        chosen[name] = best
+    
+    if cache_path:
+        try:
+            save_tuning_cache(cache_path, cache)
+        except OSError as e:
+            logger.warning(f"Auto-tune cache yazılamadı: {e}")
+    
+    return chosen
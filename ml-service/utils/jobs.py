@@ -0,0 +1,353 @@
+"""
+Asenkron iş (job) yöneticisi: sınırlı worker havuzu, ilerleme event'leri ve diskte saklanan sonuçlar
+
+Uzun /track ve /infer işleri HTTP bağlantısını açık tutmadan kuyruğa alınır;
+durum ve sonuç polling veya server-sent events ile okunur. Her iş jobs_dir
+altında <id>.json olarak saklanır, böylece client (ve servis) yeniden
+başladığında sonuçlara tekrar erişilebilir.
+"""
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from utils.budget import Deadline
+import logging
+
+logger = logging.getLogger(__name__)
+
+# İş durumları
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_ERROR = "error"
+JOB_CANCELLED = "cancelled"
+
+TERMINAL_STATES = (JOB_DONE, JOB_ERROR, JOB_CANCELLED)
+
+# runner(job, report, deadline) -> result
+JobRunner = Callable[[Dict, Callable[[Dict], None], Deadline], Awaitable[Dict]]
+
+class JobQueueFull(Exception):
+    """Bekleyen iş sayısı sınıra ulaştı"""
+    pass
+
+class JobManager:
+    """
+    Kuyruk + sabit sayıda asyncio worker
+    
+    İşin kendisi runner'a bırakılır (ağır kısımlar executor'da çalışır);
+    runner, report() ile thread-safe ilerleme event'i yayınlar ve
+    deadline iptal edildiğinde (DELETE) durur.
+    """
+    
+    def __init__(
+        self,
+        jobs_dir: str,
+        workers: int = 1,
+        max_pending: int = 16,
+        retention_seconds: float = 24 * 3600
+    ):
+        """
+        Args:
+            jobs_dir: İş kayıtları ve girdi dosyalarının tutulduğu klasör
+            workers: Aynı anda çalışan iş sayısı
+            max_pending: Kuyrukta bekleyebilecek en fazla iş (aşılırsa JobQueueFull)
+            retention_seconds: Biten işler bu süreden sonra diskten silinir
+        """
+        self.jobs_dir = Path(jobs_dir)
+        self.workers = max(1, workers)
+        self.max_pending = max_pending
+        self.retention_seconds = retention_seconds
+        
+        self._jobs: Dict[str, Dict] = {}
+        self._deadlines: Dict[str, Deadline] = {}
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runner: Optional[JobRunner] = None
+    
+    def start(self, runner: JobRunner) -> None:
+        """Worker'ları başlatır, diskteki işleri yükler (event loop içinde çağrılmalı)"""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._runner = runner
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        
+        self._load_persisted()
+        
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"Job worker'ları başlatıldı: {self.workers} worker, {len(self._jobs)} kayıtlı iş")
+    
+    async def stop(self) -> None:
+        """Çalışan işleri iptal eder ve worker'ları durdurur (yarım işler sonraki başlangıçta yeniden kuyruğa alınır)"""
+        for deadline in self._deadlines.values():
+            deadline.cancel()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+    
+    def _job_path(self, job_id: str) -> Path:
+        return self.jobs_dir / f"{job_id}.json"
+    
+    def _persist(self, job: Dict) -> None:
+        """İş kaydını atomik olarak diske yazar"""
+        path = self._job_path(job["id"])
+        tmp_path = path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(job, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    
+    def _remove_files(self, job: Dict) -> None:
+        for path in (job.get("input_path"), str(self._job_path(job["id"]))):
+            if path and os.path.exists(path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+    
+    def _load_persisted(self) -> None:
+        """
+        Diskteki işleri yükler
+        
+        - Süresi dolmuş bitmiş işler silinir
+        - Yarım kalmış işler girdi dosyası duruyorsa yeniden kuyruğa alınır, yoksa hata olarak işaretlenir
+        """
+        now = time.time()
+        requeued = []
+        
+        for path in self.jobs_dir.glob("*.json"):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    job = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"İş kaydı okunamadı ({path.name}): {e}")
+                continue
+            
+            if job["state"] in TERMINAL_STATES:
+                if now - (job.get("finished_at") or now) > self.retention_seconds:
+                    self._remove_files(job)
+                    continue
+            elif job.get("input_path") and os.path.exists(job["input_path"]):
+                job["state"] = JOB_QUEUED
+                job["started_at"] = None
+                requeued.append(job)
+            else:
+                job["state"] = JOB_ERROR
+                job["error"] = "İş yarıda kaldı (servis yeniden başladı) ve girdi dosyası bulunamadı"
+                job["finished_at"] = now
+                self._persist(job)
+            
+            self._jobs[job["id"]] = job
+        
+        for job in sorted(requeued, key=lambda j: j["created_at"]):
+            self._persist(job)
+            self._queue.put_nowait(job["id"])
+        
+        if requeued:
+            logger.info(f"{len(requeued)} yarım iş yeniden kuyruğa alındı")
+    
+    def pending_count(self) -> int:
+        return sum(1 for job in self._jobs.values() if job["state"] == JOB_QUEUED)
+    
+    def submit(self, kind: str, params: Dict, content: bytes, suffix: str = ".webm") -> Dict:
+        """
+        Yeni iş oluşturur: girdiyi diske yazar ve kuyruğa alır
+        
+        Args:
+            kind: İş tipi (runner'a iletilir, örn. "track" / "infer")
+            params: Runner parametreleri; "deadline_seconds" varsa iş bu bütçeyle sınırlanır
+            content: Yüklenen ses dosyasının içeriği
+            suffix: Girdi dosya uzantısı (ffmpeg format tespiti için)
+        
+        Raises:
+            JobQueueFull: Bekleyen iş sayısı max_pending'e ulaştıysa
+        """
+        if self._queue is None:
+            raise RuntimeError("JobManager başlatılmadı")
+        if self.pending_count() >= self.max_pending:
+            raise JobQueueFull(f"Kuyrukta {self.max_pending} iş bekliyor")
+        
+        job_id = uuid.uuid4().hex
+        input_path = str(self.jobs_dir / f"{job_id}.input{suffix}")
+        with open(input_path, "wb") as f:
+            f.write(content)
+        
+        job = {
+            "id": job_id,
+            "kind": kind,
+            "state": JOB_QUEUED,
+            "params": params,
+            "input_path": input_path,
+            "input_bytes": len(content),
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "progress": None,
+            "result": None,
+            "error": None
+        }
+        self._jobs[job_id] = job
+        self._persist(job)
+        self._queue.put_nowait(job_id)
+        
+        logger.info(f"İş kuyruğa alındı: {job_id} ({kind}, {len(content)} bytes)")
+        return self.public(job)
+    
+    def get(self, job_id: str) -> Optional[Dict]:
+        return self._jobs.get(job_id)
+    
+    def list(self, limit: int = 50) -> List[Dict]:
+        """En yeni işler (sonuçsuz özet)"""
+        jobs = sorted(self._jobs.values(), key=lambda j: j["created_at"], reverse=True)
+        return [
+            {k: v for k, v in self.public(job).items() if k != "result"}
+            for job in jobs[:limit]
+        ]
+    
+    def public(self, job: Dict) -> Dict:
+        """Client'a dönen görünüm (dahili alanlar hariç, kuyruk sırası dahil)"""
+        view = {k: v for k, v in job.items() if k != "input_path"}
+        if job["state"] == JOB_QUEUED:
+            queued = sorted(
+                (j for j in self._jobs.values() if j["state"] == JOB_QUEUED),
+                key=lambda j: j["created_at"]
+            )
+            view["queue_position"] = next(
+                (i for i, j in enumerate(queued) if j["id"] == job["id"]), None
+            )
+        return view
+    
+    def cancel(self, job_id: str) -> Optional[Dict]:
+        """
+        İşi iptal eder: kuyruktaysa hemen, çalışıyorsa runner bir sonraki kontrol noktasında durur
+        
+        Returns:
+            Güncel iş görünümü (iş yoksa None)
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        
+        if job["state"] == JOB_QUEUED:
+            self._finish(job, JOB_CANCELLED)
+        elif job["state"] == JOB_RUNNING:
+            deadline = self._deadlines.get(job_id)
+            if deadline is not None:
+                deadline.cancel()
+        
+        return self.public(job)
+    
+    def _publish(self, job_id: str, event: Dict) -> None:
+        for queue in self._subscribers.get(job_id, []):
+            queue.put_nowait(event)
+    
+    def _set_state(self, job: Dict, state: str) -> None:
+        job["state"] = state
+        self._persist(job)
+        self._publish(job["id"], {"type": "status", "state": state})
+    
+    def _finish(self, job: Dict, state: str, result: Optional[Dict] = None, error: Optional[str] = None) -> None:
+        job["state"] = state
+        job["result"] = result
+        job["error"] = error
+        job["finished_at"] = time.time()
+        
+        # Girdi artık gerekmiyor; kayıt (sonuç) saklanır
+        input_path = job.pop("input_path", None)
+        if input_path and os.path.exists(input_path):
+            try:
+                os.remove(input_path)
+            except OSError:
+                pass
+        
+        self._persist(job)
+        self._publish(job["id"], {"type": state, "job": self.public(job)})
+    
+    def _reporter(self, job_id: str) -> Callable[[Dict], None]:
+        """Runner'a verilen thread-safe ilerleme callback'i"""
+        def report(event: Dict) -> None:
+            self._loop.call_soon_threadsafe(self._on_progress, job_id, event)
+        return report
+    
+    def _on_progress(self, job_id: str, event: Dict) -> None:
+        job = self._jobs.get(job_id)
+        if job is None or job["state"] != JOB_RUNNING:
+            return
+        if event.get("type") == "progress":
+            # Son ilerleme durumu iş kaydında tutulur (yeniden bağlanan client için)
+            progress = dict(job["progress"] or {})
+            progress.update({k: v for k, v in event.items() if k != "type"})
+            job["progress"] = progress
+        self._publish(job_id, event)
+    
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+            if job is None or job["state"] != JOB_QUEUED:
+                # Kuyruktayken iptal edildi
+                continue
+            
+            deadline = Deadline(job["params"].get("deadline_seconds"))
+            self._deadlines[job_id] = deadline
+            job["started_at"] = time.time()
+            self._set_state(job, JOB_RUNNING)
+            
+            try:
+                result = await self._runner(job, self._reporter(job_id), deadline)
+                if deadline.cancelled:
+                    self._finish(job, JOB_CANCELLED)
+                else:
+                    self._finish(job, JOB_DONE, result=result)
+                    logger.info(f"✓ İş tamamlandı: {job_id} ({time.time() - job['started_at']:.1f} sn)")
+            except asyncio.CancelledError:
+                # Servis kapanıyor: kayıt "running" kalır, girdi durur -> sonraki başlangıçta yeniden kuyruğa alınır
+                raise
+            except Exception as e:
+                # HTTPException gibi hatalarda detail kullanılır
+                detail = getattr(e, "detail", None) or str(e)
+                if deadline.cancelled:
+                    self._finish(job, JOB_CANCELLED)
+                else:
+                    logger.error(f"İş hatası ({job_id}): {detail}")
+                    self._finish(job, JOB_ERROR, error=detail)
+            finally:
+                self._deadlines.pop(job_id, None)
+    
+    async def events(self, job_id: str) -> AsyncIterator[Dict]:
+        """
+        İşin event akışı: önce anlık durum ("snapshot"), sonra status/progress/ara event'ler,
+        en son done/error/cancelled. Biten bir iş için sadece son event döner.
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        
+        if job["state"] in TERMINAL_STATES:
+            yield {"type": job["state"], "job": self.public(job)}
+            return
+        
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, []).append(queue)
+        try:
+            yield {"type": "snapshot", "job": self.public(job)}
+            while True:
+                event = await queue.get()
+                yield event
+                if event["type"] in TERMINAL_STATES:
+                    break
+        finally:
+            subscribers = self._subscribers.get(job_id, [])
+            if queue in subscribers:
+                subscribers.remove(queue)
+            if not subscribers:
+                self._subscribers.pop(job_id, None)
@@ -0,0 +1,143 @@
+"""
+Live update protokolü v2: sadece değişen timeline girdilerini gönderen kompakt (delta) kodlayıcı
+
+v1 (varsayılan): Her tick tam JSON update (timeline + text_ar + best + transcript).
+v2: start mesajında {"protocol": 2, "encoding": "json" | "msgpack"} ile seçilir.
+
+v2 update mesajı (kısa anahtarlar, değişmeyen alanlar gönderilmez):
+    {
+        "type": "update", "v": 2, "seq": int, "t": elapsed_ms,
+        "st": state,                       # değiştiyse
+        "best": {...} | None,              # değiştiyse
+        "win": {...} | None,               # değiştiyse
+        "cur": [surah, ayah] | None,       # değiştiyse
+        "tl": [[surah, ayah, start_ms, end_ms, ratio_pct], ...],  # değişen girdiler
+        "rm": [[surah, ayah], ...],        # timeline'dan çıkan ayetler
+        "txt": {"surah:ayah": text_ar},    # ayet ilk kez görüldüğünde bir kez
+        "tr": transcript_partial,          # değiştiyse
+        "sk": skipped_ticks,               # değiştiyse (atlanan tick sayısı, kümülatif)
+        "tc": true,                        # sadece tick bütçesi dolup decode kesildiyse
+        "tm": {span: ms, ..., "total_ms"}  # start'ta "timing": true ise her tick
+    }
+"""
+
+import json
+from typing import Dict, List, Optional, Tuple, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+PROTOCOL_VERSION = 2
+
+try:
+    import msgpack
+except ImportError:  # msgpack opsiyonel; yoksa JSON kullanılır
+    msgpack = None
+
+def msgpack_available() -> bool:
+    """msgpack kurulu mu?"""
+    return msgpack is not None
+
+def _ms(value) -> Optional[int]:
+    """ms değerini int'e çevirir (None korunur)"""
+    return int(round(value)) if value is not None else None
+
+class DeltaEncoder:
+    """
+    Bağlantı başına delta kodlayıcı
+
+    Client'a en son gönderilen durumu tutar ve her update'te sadece farkı üretir.
+    """
+
+    def __init__(self, encoding: str = "json"):
+        """
+        Args:
+            encoding: "json" (text frame) veya "msgpack" (binary frame)
+        """
+        if encoding == "msgpack" and msgpack is None:
+            logger.warning("msgpack kurulu değil, JSON kullanılıyor")
+            encoding = "json"
+        self.encoding = encoding
+        self.seq = 0
+
+        self._timeline: Dict[Tuple[int, int], List] = {}
+        self._sent_texts = set()
+        self._last = {"st": None, "best": None, "win": None, "cur": None, "tr": None, "sk": None}
+
+    @property
+    def binary(self) -> bool:
+        return self.encoding == "msgpack"
+
+    def diff(self, update: Dict) -> Dict:
+        """v1 update dict'inden v2 delta mesajı üretir"""
+        self.seq += 1
+        msg = {
+            "type": "update",
+            "v": PROTOCOL_VERSION,
+            "seq": self.seq,
+            "t": _ms(update.get("elapsed_ms"))
+        }
+
+        current = update.get("current")
+        fields = {
+            "st": update.get("state"),
+            "best": update.get("best"),
+            "win": update.get("window"),
+            "cur": [current["surah_no"], current["ayah_no"]] if current else None,
+            "tr": update.get("transcript_partial"),
+            "sk": update.get("skipped_ticks")
+        }
+        for key, value in fields.items():
+            if value != self._last[key]:
+                msg[key] = value
+                self._last[key] = value
+
+        # Timeline: sadece değişen girdiler (int ms, yüzde oran)
+        changed = []
+        texts = {}
+        seen = set()
+        for ayah in update.get("timeline") or []:
+            key = (ayah["surah_no"], ayah["ayah_no"])
+            seen.add(key)
+            entry = [
+                key[0],
+                key[1],
+                _ms(ayah.get("start_ms")),
+                _ms(ayah.get("end_ms")),
+                int(round((ayah.get("matched_ratio") or 0) * 100))
+            ]
+            if self._timeline.get(key) != entry:
+                self._timeline[key] = entry
+                changed.append(entry)
+            if key not in self._sent_texts and ayah.get("text_ar"):
+                self._sent_texts.add(key)
+                texts[f"{key[0]}:{key[1]}"] = ayah["text_ar"]
+
+        removed = [list(key) for key in self._timeline if key not in seen]
+        for key in removed:
+            del self._timeline[tuple(key)]
+
+        if changed:
+            msg["tl"] = changed
+        if removed:
+            msg["rm"] = removed
+        if texts:
+            msg["txt"] = texts
+        # Tick bütçesiyle kesilme her tick'e özgü (yoksa false)
+        if update.get("truncated"):
+            msg["tc"] = True
+        # Tick span süreleri (start mesajında "timing": true ise; her tick'e özgü)
+        if update.get("timing"):
+            msg["tm"] = update["timing"]
+
+        return msg
+
+    def dumps(self, msg: Dict) -> Union[str, bytes]:
+        """Mesajı seçilen kodlamayla serialize eder"""
+        if self.binary:
+            return msgpack.packb(msg, use_bin_type=True)
+        return json.dumps(msg, ensure_ascii=False, separators=(",", ":"))
+
+    def encode(self, update: Dict) -> Union[str, bytes]:
+        """diff + dumps"""
+        return self.dumps(self.diff(update))
@@ -0,0 +1,399 @@
+"""
+Live tracking tick'i: pencere ASR'si ve oturum boyunca eşleştirme / hizalama / timeline durumu
+
+/ws/live handler'ı ve kayıtlı oturumların replay'i (scripts/replay_session.py) aynı kodu
+kullanır; tick kararları (best, hedef pencere, timeline, zıplama) pencere ASR kelimelerinden
+deterministik olarak üretilir.
+"""
+
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from faster_whisper import WhisperModel
+from rapidfuzz import fuzz
+from utils.arabic_norm import normalize_ar
+from utils.budget import Deadline
+from utils.quran_index import match_openings
+from utils.span_match import match_span
+from utils.tracking import SlidingTargetWindow, reanchor_search, build_ayah_timeline
+from utils.seq_align import align_words
+from utils.metrics import stage_timer
+import logging
+
+logger = logging.getLogger(__name__)
+
+def transcribe_window(
+    model: WhisperModel,
+    wav_path: str,
+    global_offset_ms: int,
+    deadline: Optional[Deadline] = None
+) -> Tuple[str, List[Dict]]:
+    """
+    Live penceresini greedy decode eder, kelimeleri global zaman eksenine taşır
+    
+    Args:
+        global_offset_ms: Pencere başlangıcının oturum başına göre zamanı
+        deadline: Tick bütçesi; dolarsa kalan segmentler decode edilmez
+    
+    Returns:
+        (transcript_partial, [{"w", "raw", "start_ms", "end_ms"}, ...])
+    """
+    segments, info = model.transcribe(
+        wav_path,
+        language="ar",
+        beam_size=1,            # Greedy decoding (En hızlı)
+        best_of=1,              # Tek deneme
+        temperature=0.0,        # Rastgelelik yok
+        condition_on_previous_text=False, # Önceki metne bakma (Hız artırır)
+        word_timestamps=True,
+        vad_filter=False        # VAD kapalı (Gecikme olmasın)
+    )
+    
+    transcript_parts = []
+    rec_words_window = []
+    
+    for segment in segments:
+        transcript_parts.append(segment.text.strip())
+        
+        for word_info in segment.words:
+            word_text = word_info.word.strip()
+            if not word_text:
+                continue
+            
+            word_norm = normalize_ar(word_text)
+            
+            # Global timestamp'e çevir
+            start_ms = int((word_info.start * 1000) + global_offset_ms)
+            end_ms = int((word_info.end * 1000) + global_offset_ms)
+            
+            rec_words_window.append({
+                "w": word_norm,
+                "raw": word_text,
+                "start_ms": start_ms,
+                "end_ms": end_ms
+            })
+        
+        # Tick bütçesi dolduysa kalan segmentleri decode etme
+        if deadline is not None and deadline.stop_reason():
+            break
+    
+    return " ".join(transcript_parts), rec_words_window
+
+def _reliable(rec_w: str, tgt_w: str) -> bool:
+    """Güvenilir eşleşme: aynı veya çok benzer kelime (DP'nin düşük cezalı substitution'ı)"""
+    return rec_w == tgt_w or fuzz.ratio(rec_w, tgt_w) >= 85
+
+class LiveTracker:
+    """
+    Live oturumunun takip durumu (best match, kayan hedef pencere, global kelime listesi)
+    
+    Her tick'te step() pencere ASR sonucunu alır ve update alanlarını döndürür.
+    """
+    
+    def __init__(
+        self,
+        target_ayahs: int = 12,
+        min_opening_score: float = 70,
+        recent_words_for_reanchor: int = 12,
+        history_ms: int = 25000,
+        freeze_lag_ms: int = 5000
+    ):
+        """
+        Args:
+            target_ayahs: Hedef penceredeki ayet sayısı
+            min_opening_score: Kısa önekte ayet başlangıcı eşleşmesi için en düşük skor
+            recent_words_for_reanchor: Zıplamada kullanılacak son kelime sayısı
+            history_ms: Global kelime listesinde tutulan süre
+            freeze_lag_ms: Bundan eski kelimelerin hizalaması dondurulur (yeniden hizalanmaz)
+        """
+        self.target_ayahs = target_ayahs
+        self.min_opening_score = min_opening_score
+        self.recent_words_for_reanchor = recent_words_for_reanchor
+        self.history_ms = history_ms
+        self.freeze_lag_ms = freeze_lag_ms
+        
+        self.best_match: Optional[Dict] = None
+        self.target_window: Optional[SlidingTargetWindow] = None
+        self.last_confirmed: Optional[Dict] = None  # Son doğrulanmış (tracking) ayet
+        self.mismatch_count = 0
+        self.rec_words: List[Dict] = []  # Global word listesi
+        # Dondurulmuş hizalama: (ASR kelimesi, hedefin korpus kelime index'i); pencere değişince sıfırlanır
+        self._frozen: List[Tuple[Dict, int]] = []
+        self._aligned_window: Optional[SlidingTargetWindow] = None
+    
+    @property
+    def searching(self) -> bool:
+        """Best match henüz yok veya geçici"""
+        return self.best_match is None or bool(self.best_match.get("provisional"))
+    
+    def _search(self, transcript_partial: str, short_window: bool) -> None:
+        """Best match bul (henüz yoksa veya geçiciyse)"""
+        transcript_norm = normalize_ar(transcript_partial)
+        if not transcript_norm or not transcript_norm.strip():
+            return
+        
+        if short_window:
+            # Kısa önek: ayet başlangıçları indeksi (geçici sonuç)
+            matches = match_openings(transcript_norm, top_k=1)
+            if matches and matches[0]["score"] < self.min_opening_score:
+                matches = []
+        else:
+            # Pencere genelde iki ayete yayılır: sure metninde span eşleştirme (başlangıç kelimesiyle)
+            with stage_timer("match_verses", model="live"):
+                matches = match_span(transcript_norm, top_k=1)
+        
+        if not matches:
+            return
+        
+        new_best = {
+            "surah_no": matches[0]["surah"],
+            "ayah_no": matches[0]["ayah"],
+            "text_ar": matches[0]["text_ar"],
+            "score": matches[0]["score"]
+        }
+        if short_window:
+            new_best["provisional"] = True
+        else:
+            new_best["word_index"] = matches[0]["word_index"]
+        
+        # Konum değiştiyse (veya geçici eşleşme başlangıç kelimesiyle doğrulandıysa) target window oluştur
+        if (
+            self.best_match is None or
+            (self.best_match["surah_no"], self.best_match["ayah_no"]) !=
+            (new_best["surah_no"], new_best["ayah_no"]) or
+            (self.best_match.get("provisional") and new_best.get("word_index"))
+        ):
+            # Span eşleşmesinde pencere okumanın başladığı kelimeden başlar
+            self.target_window = SlidingTargetWindow(
+                new_best["surah_no"],
+                new_best["ayah_no"],
+                window_ayahs=self.target_ayahs,
+                start_word=new_best.get("word_index", 0)
+            )
+        self.best_match = new_best
+    
+    def _merge_words(self, elapsed_ms: int, rec_words_window: List[Dict]) -> None:
+        """Global word listesini günceller (son history_ms, duplike kontrolü)"""
+        cutoff_ms = elapsed_ms - self.history_ms
+        self.rec_words = [w for w in self.rec_words if w["end_ms"] >= cutoff_ms]
+        
+        for new_word in rec_words_window:
+            # Aynı start_ms varsa ekleme
+            if not any(
+                abs(w["start_ms"] - new_word["start_ms"]) < 50
+                for w in self.rec_words
+            ):
+                self.rec_words.append(new_word)
+    
+    def _align(self, elapsed_ms: int, target_window: SlidingTargetWindow) -> List[Tuple[Optional[int], Optional[int]]]:
+        """
+        Global kelime listesini hedef pencereye hizalar (align_words formatı)
+        
+        Sadece son dondurulmuş eşleşmeden sonraki kısım DP ile hizalanır: freeze_lag_ms'den
+        eski son güvenilir eşleşmeye (aynı veya çok benzer kelime) kadarki çiftler sonraki
+        tick'lerde aynen kullanılır. Pencere kaydığında dondurulmuş çiftler korunur, pencereden
+        veya geçmişten düşenler bırakılır.
+        
+        Hedef kelimeler korpusun ardışık bir dilimi (WordRange) olduğundan hedef kelimenin
+        pencereden bağımsız kimliği korpus kelime index'idir; pencere içi pozisyon
+        index - tgt_words.start ile bulunur (kaymadan sonra da geçerli, sözlük kurulmaz).
+        """
+        tgt_words = target_window.tgt_words
+        if target_window is not self._aligned_window:
+            self._aligned_window = target_window
+            self._frozen = []
+        
+        rec_pos = {id(w): i for i, w in enumerate(self.rec_words)}
+        tgt_start, tgt_stop = tgt_words.start, tgt_words.stop
+        pairs = [
+            (rec_pos[id(w)], word_index - tgt_start) for w, word_index in self._frozen
+            if id(w) in rec_pos and tgt_start <= word_index < tgt_stop
+        ]
+        
+        rec_from = pairs[-1][0] + 1 if pairs else 0
+        tgt_from = pairs[-1][1] + 1 if pairs else 0
+        n_frozen = len(pairs)
+        pairs.extend(
+            (
+                rec_from + i_rec if i_rec is not None else None,
+                tgt_from + i_tgt if i_tgt is not None else None
+            )
+            for i_rec, i_tgt in align_words(
+                self.rec_words[rec_from:], tgt_words[tgt_from:], free_target_ends=True
+            )
+        )
+        
+        # Yeni çapa: freeze_lag_ms'den eski son güvenilir eşleşme
+        stable_ms = elapsed_ms - self.freeze_lag_ms
+        anchor = None
+        for k in range(n_frozen, len(pairs)):
+            i_rec, i_tgt = pairs[k]
+            if i_rec is None or i_tgt is None:
+                continue
+            if self.rec_words[i_rec]["end_ms"] > stable_ms:
+                break
+            if _reliable(self.rec_words[i_rec]["w"], tgt_words[i_tgt]["w"]):
+                anchor = k
+        if anchor is not None:
+            self._frozen = [
+                (self.rec_words[i_rec], tgt_start + i_tgt)
+                for i_rec, i_tgt in pairs[:anchor + 1]
+                if i_rec is not None and i_tgt is not None
+            ]
+        
+        return pairs
+    
+    def _reliable_ratio(self, pairs: List[Tuple[Optional[int], Optional[int]]], target_window: SlidingTargetWindow) -> float:
+        """
+        Ayet başına güvenilir eşleşen hedef kelime oranının en büyüğü (zıplama tespiti için)
+        
+        Timeline'daki matched_ratio substitution'ları da sayar: DP ilgisiz kelimeleri de tam
+        cezayla hedefe eşler, zıplamadan sonra oran düşmez. Burada sadece aynı / çok benzer
+        kelime çiftleri sayılır.
+        """
+        tgt_words, ayahs = target_window.tgt_words, target_window.ayahs
+        tgt_ayah = tgt_words.verses().astype(np.int64) - ayahs.start
+        reliable = [
+            i_tgt for i_rec, i_tgt in pairs
+            if i_rec is not None and i_tgt is not None and
+            _reliable(self.rec_words[i_rec]["w"], tgt_words[i_tgt]["w"])
+        ]
+        totals = np.bincount(tgt_ayah, minlength=len(ayahs))
+        counts = np.bincount(tgt_ayah[reliable], minlength=len(ayahs))
+        return float(np.max(counts / np.maximum(totals, 1)))
+    
+    def _reanchor(self) -> None:
+        """Son konumdan başlayarak kademeli yeniden ara (yakın çevre -> sure -> tüm Kuran)"""
+        recent_words = self.rec_words[-self.recent_words_for_reanchor:]
+        recent_norm = " ".join(w["w"] for w in recent_words if w["w"])
+        anchor = self.last_confirmed or self.best_match
+        match, tier = reanchor_search(recent_norm, anchor["surah_no"], anchor["ayah_no"])
+        self.mismatch_count = 0
+        
+        if match:
+            logger.info(f"Zıplama tespit edildi! Yeni konum ({tier}): {match['surah']}:{match['ayah']}")
+            self.best_match = {
+                "surah_no": match["surah"],
+                "ayah_no": match["ayah"],
+                "text_ar": match["text_ar"],
+                "score": match["score"]
+            }
+            self.target_window = SlidingTargetWindow(
+                self.best_match["surah_no"],
+                self.best_match["ayah_no"],
+                window_ayahs=self.target_ayahs
+            )
+            self.last_confirmed = None
+            # Yeni konuma ait son kelimeler korunur
+            self.rec_words = recent_words
+        else:
+            logger.info("Zıplama tespit edildi! Sure sıfırlanıyor...")
+            self.best_match = None
+            self.target_window = None
+            self.last_confirmed = None
+    
+    def step(
+        self,
+        elapsed_ms: int,
+        transcript_partial: str,
+        rec_words_window: List[Dict],
+        short_window: bool = False
+    ) -> Dict:
+        """
+        Tek tick: eşleştirme, kelime birleştirme, alignment, timeline ve zıplama tespiti
+        
+        Args:
+            elapsed_ms: Oturum başından bu yana alınan ses (ms)
+            transcript_partial: Pencere transcript'i
+            rec_words_window: Penceredeki kelimeler (global zaman ekseninde)
+            short_window: Pencere henüz dolmadı (fast_start önek eşleştirmesi)
+        
+        Returns:
+            {"best", "window", "current", "timeline", "transcript_partial", "state"}
+        """
+        if self.searching:
+            self._search(transcript_partial, short_window)
+        
+        self._merge_words(elapsed_ms, rec_words_window)
+        
+        # Alignment ve timeline (best match varsa)
+        timeline = []
+        current_ayah = None
+        state = "tracking"
+        if self.best_match and self.best_match.get("provisional"):
+            state = "provisional"
+        
+        target_window = self.target_window
+        if self.best_match and target_window and target_window.tgt_words and self.rec_words:
+            try:
+                tgt_words = target_window.tgt_words
+                ayahs = target_window.ayahs
+                
+                # Alignment (dondurulmuş kısım yeniden hizalanmaz)
+                with stage_timer("align_words", model="live"):
+                    pairs = self._align(elapsed_ms, target_window)
+                
+                # Timeline
+                with stage_timer("build_ayah_timeline", model="live"):
+                    timeline = build_ayah_timeline(pairs, self.rec_words, tgt_words, ayahs)
+                
+                # Current ayah bul
+                for i, ayah in enumerate(timeline):
+                    if (
+                        ayah["start_ms"] is not None and
+                        ayah["end_ms"] is not None and
+                        elapsed_ms >= ayah["start_ms"] and
+                        elapsed_ms < ayah["end_ms"]
+                    ):
+                        # Eşleşmesiz (interpolasyonlu) ayete henüz gelinmedi: son eşleşen ayet
+                        while i > 0 and not timeline[i].get("matched_ratio"):
+                            i -= 1
+                        current_ayah = timeline[i]
+                        break
+                
+                # Bulunamazsa matched_ratio en yüksek olanı seç
+                if current_ayah is None and timeline:
+                    current_ayah = max(timeline, key=lambda x: x.get("matched_ratio", 0))
+                    state = "uncertain"
+                
+                # Pencere sonuna yaklaşıldıysa ileri kaydır;
+                # düşen ayetlere ait kelimeler bırakılır
+                if state == "tracking" and current_ayah is not None:
+                    self.last_confirmed = current_ayah
+                    dropped = target_window.maybe_advance(
+                        current_ayah["surah_no"], current_ayah["ayah_no"]
+                    )
+                    if dropped is not None:
+                        cutoff = next(
+                            (a["end_ms"] for a in timeline
+                             if (a["surah_no"], a["ayah_no"]) == dropped),
+                            None
+                        )
+                        if cutoff is not None:
+                            self.rec_words = [w for w in self.rec_words if w["start_ms"] >= cutoff]
+                
+                # Mismatch/Jump Tespiti
+                if timeline:
+                    # En iyi eşleşen ayetin oranına bak (sadece güvenilir eşleşmeler)
+                    max_ratio = self._reliable_ratio(pairs, target_window)
+                    
+                    # Eğer oran çok düşükse (%15 altı) ve yeterli kelime varsa kullanıcı başka bir sureye zıplamış olabilir
+                    if max_ratio < 0.15 and len(transcript_partial.split()) > 3:
+                        self.mismatch_count += 1
+                    else:
+                        self.mismatch_count = 0
+                    
+                    # 4 kez üst üste düşük oran gelirse yeniden ara
+                    if self.mismatch_count >= 4:
+                        self._reanchor()
+            
+            except Exception as e:
+                logger.error(f"Alignment/timeline hatası: {e}")
+        
+        return {
+            "best": self.best_match,
+            "window": self.target_window.info if self.target_window else None,
+            "current": current_ayah,
+            "timeline": timeline,
+            "transcript_partial": transcript_partial,
+            "state": state
+        }
@@ -0,0 +1,249 @@
+"""
+Uzun kayıtlar için paralel ASR: VAD sessizliklerinden parçalama, process pool ile
+parça bazında word timestamps ve global zaman eksenine birleştirme
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from faster_whisper import WhisperModel, decode_audio
+from faster_whisper.vad import VadOptions, get_speech_timestamps
+from utils.arabic_norm import normalize_ar
+from utils.budget import Deadline
+from utils.cpu_topology import usable_cpus
+import logging
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+# Worker process başına model (initializer ile bir kez yüklenir)
+_worker_model: Optional[WhisperModel] = None
+# API process'inde paylaşılan pool
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+# CPU topolojisinden gelen ayar (cpu_threads, num_workers, cpu_affinity); bkz. configure_pool
+_pool_settings: Dict = {}
+
+def configure_pool(settings: Dict) -> None:
+    """Pool ayarlarını CPU topolojisinden alır (plan_topology()["long_audio"]); pool'u yeniden kurar"""
+    global _pool_settings
+    _pool_settings = dict(settings)
+    shutdown_pool()
+
+def _share() -> int:
+    """Pool'un çekirdek payı: affinity kümesi, yoksa cpu_threads x num_workers"""
+    if _pool_settings.get("cpu_affinity"):
+        return len(_pool_settings["cpu_affinity"])
+    if _pool_settings.get("cpu_threads"):
+        return _pool_settings["cpu_threads"] * _pool_settings.get("num_workers", 1)
+    return len(usable_cpus())
+
+def default_workers() -> int:
+    """Varsayılan worker sayısı: LONG_AUDIO_WORKERS, topoloji veya çekirdek payının yarısı"""
+    env = os.environ.get("LONG_AUDIO_WORKERS")
+    if env:
+        return max(1, int(env))
+    if _pool_settings.get("num_workers"):
+        return _pool_settings["num_workers"]
+    return max(1, _share() // 2)
+
+def split_on_silence(
+    audio: np.ndarray,
+    max_chunk_s: float = 30.0,
+    min_silence_ms: int = 500
+) -> List[Tuple[int, int]]:
+    """
+    Sesi VAD sessizliklerinden en fazla max_chunk_s uzunluğunda parçalara böler
+    
+    Args:
+        audio: float32 mono 16kHz
+        max_chunk_s: Parça başına en fazla süre (Whisper penceresi 30 sn)
+        min_silence_ms: Kesim için gereken en kısa sessizlik
+    
+    Returns:
+        [(start_sample, end_sample), ...] (sıralı, çakışmasız)
+    """
+    speech = get_speech_timestamps(
+        audio,
+        VadOptions(
+            min_silence_duration_ms=min_silence_ms,
+            max_speech_duration_s=max_chunk_s,
+            speech_pad_ms=200
+        ),
+        sampling_rate=SAMPLE_RATE
+    )
+    
+    max_chunk = int(max_chunk_s * SAMPLE_RATE)
+    chunks = []
+    chunk_start = None
+    chunk_end = None
+    
+    for seg in speech:
+        if chunk_start is None:
+            chunk_start, chunk_end = seg["start"], seg["end"]
+        elif seg["end"] - chunk_start <= max_chunk:
+            # Aynı parçaya ekle (aradaki sessizlik dahil)
+            chunk_end = seg["end"]
+        else:
+            chunks.append((chunk_start, chunk_end))
+            chunk_start, chunk_end = seg["start"], seg["end"]
+    
+    if chunk_start is not None:
+        chunks.append((chunk_start, chunk_end))
+    
+    return chunks
+
+def _init_worker(
+    model_size: str,
+    cpu_threads: int,
+    compute_type: str,
+    cpu_affinity: Optional[List[int]] = None
+):
+    """Worker process initializer: process'i havuzun CPU'larına bağlar, modeli bir kez yükler"""
+    global _worker_model
+    if cpu_affinity and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, cpu_affinity)
+        except OSError as e:
+            logger.warning(f"Long-audio worker affinity uygulanamadı ({cpu_affinity}): {e}")
+    _worker_model = WhisperModel(
+        model_size,
+        device="cpu",
+        compute_type=compute_type,
+        cpu_threads=cpu_threads
+    )
+
+def _transcribe_chunk(args: Tuple[np.ndarray, int, int]) -> List[Dict]:
+    """Pool worker'ı: parçayı process'in modeliyle transcribe eder"""
+    audio, offset_samples, beam_size = args
+    return transcribe_chunk(_worker_model, audio, offset_samples, beam_size)
+
+def transcribe_chunk(
+    model: WhisperModel,
+    audio: np.ndarray,
+    offset_samples: int,
+    beam_size: int = 3
+) -> List[Dict]:
+    """Tek parçayı word timestamps ile transcribe eder, global ms'ye çevirir (ASR worker'ları da kullanır)"""
+    offset_ms = offset_samples * 1000 / SAMPLE_RATE
+    
+    segments, info = model.transcribe(
+        audio,
+        language="ar",
+        beam_size=beam_size,
+        word_timestamps=True,
+        condition_on_previous_text=False,
+        vad_filter=False  # Parçalar zaten VAD ile kesildi
+    )
+    
+    words = []
+    for segment in segments:
+        for word_info in segment.words:
+            word_text = word_info.word.strip()
+            if not word_text:
+                continue
+            words.append({
+                "w": normalize_ar(word_text),
+                "raw": word_text,
+                "start_ms": word_info.start * 1000 + offset_ms,
+                "end_ms": word_info.end * 1000 + offset_ms
+            })
+    return words
+
+def get_pool(
+    workers: Optional[int] = None,
+    model_size: str = "base",
+    compute_type: str = "int8"
+) -> ProcessPoolExecutor:
+    """Paylaşılan process pool'u döndürür (lazy; her worker kendi modelini yükler)"""
+    global _pool, _pool_workers
+    
+    workers = workers or default_workers()
+    if _pool is None or _pool_workers != workers:
+        shutdown_pool()
+        # Topolojinin cpu_threads'i worker sayısı değişmediyse kullanılır; aksi halde
+        # çekirdek payı worker'lar arasında paylaştırılır (oversubscription olmasın)
+        if _pool_settings.get("cpu_threads") and workers == _pool_settings.get("num_workers"):
+            cpu_threads = _pool_settings["cpu_threads"]
+        else:
+            cpu_threads = max(1, _share() // workers)
+        compute_type = _pool_settings.get("compute_type", compute_type)
+        _pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(model_size, cpu_threads, compute_type, _pool_settings.get("cpu_affinity"))
+        )
+        _pool_workers = workers
+        logger.info(f"Long-audio pool başlatıldı: {workers} worker x {cpu_threads} thread")
+    
+    return _pool
+
+def shutdown_pool() -> None:
+    """Process pool'u kapatır"""
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+        _pool_workers = 0
+
+def audio_duration_seconds(wav_path: str) -> float:
+    """WAV süresi (sn)"""
+    import wave
+    with wave.open(wav_path, "rb") as wav_file:
+        return wav_file.getnframes() / float(wav_file.getframerate())
+
+def transcribe_long(
+    wav_path: str,
+    workers: Optional[int] = None,
+    beam_size: int = 3,
+    max_chunk_s: float = 30.0,
+    deadline: Optional[Deadline] = None,
+    on_chunk: Optional[Callable[[List[Dict], float], None]] = None
+) -> Tuple[List[Dict], Dict]:
+    """
+    Uzun kaydı parçalara bölüp paralel transcribe eder
+    
+    Args:
+        deadline: Parçalar arasında kontrol edilir; dolarsa/iptal edilirse başlamamış
+            parçalar iptal edilir (çalışan parçalar worker'da tamamlanır)
+        on_chunk: Her parça sırayla tamamlandığında (rec_words, decode edilen sn) ile çağrılır
+    
+    Returns:
+        (rec_words, info):
+        - rec_words: [{w, raw, start_ms, end_ms}] global zaman ekseninde, sıralı
+        - info: {"chunks": int, "workers": int, "audio_seconds": float}
+    """
+    audio = decode_audio(wav_path, sampling_rate=SAMPLE_RATE)
+    chunks = split_on_silence(audio, max_chunk_s=max_chunk_s)
+    pool = get_pool(workers)
+    
+    logger.info(f"Long-audio: {len(audio) / SAMPLE_RATE:.1f} sn, {len(chunks)} parça")
+    
+    futures = [
+        pool.submit(_transcribe_chunk, (audio[start:end], start, beam_size))
+        for start, end in chunks
+    ]
+    
+    # Parçalar sırayla toplanır (zaman ekseni korunur)
+    rec_words = []
+    for future, (start, end) in zip(futures, chunks):
+        rec_words.extend(future.result())
+        
+        if on_chunk is not None:
+            on_chunk(rec_words, end / SAMPLE_RATE)
+        
+        if deadline is not None and deadline.stop_reason():
+            logger.info(f"Long-audio kesildi: {deadline.stop_reason()}")
+            for pending in futures:
+                pending.cancel()
+            break
+    
+    rec_words.sort(key=lambda w: w["start_ms"])
+    
+    return rec_words, {
+        "chunks": len(chunks),
+        "workers": _pool_workers,
+        "audio_seconds": round(len(audio) / SAMPLE_RATE, 2)
+    }
@@ -0,0 +1,322 @@
+"""
+Prometheus metrikleri: aşama bazında süre histogramları, live tick gecikmesi, kuyruk derinlikleri
+ve cache isabetleri (/metrics, text exposition format 0.0.4)
+
+prometheus_client bağımlılığı olmadan küçük bir registry; metrikler thread-safe'tir
+(executor thread'lerinden ve worker callback'lerinden de güncellenir). Endpoint etiketi
+istek boyunca bir ContextVar'da tutulur (MetricsMiddleware ayarlar).
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import logging
+
+from utils.tracing import record_span
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Saniye cinsinden varsayılan bucket'lar (ms'lik eşleştirmeden dakikalık uzun kayıtlara)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# İstek boyunca geçerli endpoint etiketi (route şablonu, örn. "/jobs/{job_id}")
+current_endpoint: ContextVar[str] = ContextVar("current_endpoint", default="none")
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Tuple = ()) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    pairs.extend(f'{n}="{_escape(v)}"' for n, v in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+class _Metric:
+    type_name = ""
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+    
+    def _key(self, labels: Dict) -> Tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: etiketler {self.labelnames} olmalı, verilen {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+    
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+    
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+class Counter(_Metric):
+    """Sadece artan sayaç"""
+    type_name = "counter"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple, float] = {}
+    
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+    
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items
+        ]
+
+class Gauge(_Metric):
+    """Anlık değer; set_function ile scrape anında hesaplanabilir"""
+    type_name = "gauge"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._functions: Dict[Tuple, Callable[[], float]] = {}
+    
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+    
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+    
+    def set_function(self, function: Callable[[], float], **labels) -> None:
+        """Değer her scrape'te function() ile okunur"""
+        key = self._key(labels)
+        with self._lock:
+            self._functions[key] = function
+    
+    def render(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+            functions = dict(self._functions)
+        for key, function in functions.items():
+            try:
+                values[key] = float(function())
+            except Exception as e:
+                logger.warning(f"Gauge okunamadı ({self.name}): {e}")
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+            for key, v in sorted(values.items())
+        ]
+
+class Histogram(_Metric):
+    """Kümülatif bucket'lı histogram (_bucket, _sum, _count)"""
+    type_name = "histogram"
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [bucket sayıları..., +Inf], sum
+        self._counts: Dict[Tuple, List[int]] = {}
+        self._sums: Dict[Tuple, float] = {}
+    
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self._sums[key] += value
+    
+    @contextmanager
+    def time(self, **labels):
+        """with HISTOGRAM.time(...): blok süresini gözlemler (hata olsa da)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+    
+    def count(self, **labels) -> int:
+        return sum(self._counts.get(self._key(labels), []))
+    
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(c), self._sums[k]) for k, c in self._counts.items())
+        lines = self._header()
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = (("le", _format_value(bound)),)
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+    
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metrik zaten kayıtlı: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+    
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+# Pipeline aşamaları: ffmpeg, asr, match_verses, align_words, build_ayah_timeline, serialize
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "quran_stage_duration_seconds",
+    "Pipeline aşaması süresi",
+    ["stage", "endpoint", "model"]
+))
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "quran_http_request_duration_seconds",
+    "HTTP istek süresi (yanıt gövdesi dahil)",
+    ["endpoint", "method", "status"]
+))
+LIVE_TICK_LAG_SECONDS = REGISTRY.register(Histogram(
+    "quran_live_tick_lag_seconds",
+    "Live tick'in zamanı gelmesinden update gönderilmesine kadar geçen süre",
+    ["model"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0)
+))
+LIVE_SKIPPED_TICKS = REGISTRY.register(Counter(
+    "quran_live_skipped_ticks_total",
+    "Atlanan live tick'leri",
+    ["reason"]
+))
+LIVE_ACTIVE_SESSIONS = REGISTRY.register(Gauge(
+    "quran_live_active_sessions",
+    "Açık live WebSocket oturumları"
+))
+LIVE_ACTIVE_SESSIONS.set(0)
+QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "quran_queue_depth",
+    "Bekleyen iş sayısı (executor, admission, jobs, ASR worker'ları)",
+    ["queue"]
+))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "quran_cache_requests_total",
+    "Cache erişimleri (isabet oranı = hit / (hit + miss))",
+    ["cache", "result"]
+))
+
+def observe_stage(stage: str, seconds: float, model: str = "none", endpoint: Optional[str] = None) -> None:
+    """Aşama süresini kaydeder (endpoint verilmezse ContextVar'dan)"""
+    STAGE_SECONDS.observe(seconds, stage=stage, endpoint=endpoint or current_endpoint.get(), model=model)
+
+@contextmanager
+def stage_timer(stage: str, model: str = "none", span: Optional[str] = None):
+    """
+    with stage_timer("align_words"): ... (endpoint ContextVar'dan)
+    
+    Süre aktif trace'e de span olarak eklenir (span verilmezse aşama adıyla).
+    """
+    endpoint = current_endpoint.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        observe_stage(stage, end - start, model=model, endpoint=endpoint)
+        if model != "none":
+            record_span(span or stage, start, end, model=model)
+        else:
+            record_span(span or stage, start, end)
+
+def cache_result(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+class MetricsMiddleware:
+    """
+    ASGI middleware: route şablonunu endpoint etiketi olarak ayarlar ve istek süresini ölçer
+    
+    Süre yanıt gövdesinin tamamı gönderilene kadar ölçülür (stream'ler dahil).
+    """
+    
+    def __init__(self, app, skip: Sequence[str] = ("/metrics",)):
+        self.app = app
+        self.skip = set(skip)
+    
+    @staticmethod
+    def _route_path(scope) -> str:
+        from starlette.routing import Match
+        app = scope.get("app")
+        for route in getattr(app, "routes", []):
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(route, "path", scope["path"])
+        return "unmatched"
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+        
+        endpoint = self._route_path(scope)
+        token = current_endpoint.set(endpoint)
+        if scope["type"] == "websocket" or endpoint in self.skip:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                current_endpoint.reset(token)
+            return
+        
+        status = {"code": 500}
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+        
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                endpoint=endpoint,
+                method=scope.get("method", ""),
+                status=str(status["code"])
+            )
+            current_endpoint.reset(token)
@@ -0,0 +1,250 @@
+"""
+Whisper model yöneticisi: lazy/önceden yükleme, warm-up, hazır olma durumu ve boşta bekleyen modelleri bellekten atma
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from faster_whisper import WhisperModel
+from utils.cpu_topology import pinned
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Model durumları
+STATE_NOT_LOADED = "not_loaded"
+STATE_LOADING = "loading"
+STATE_WARMING_UP = "warming_up"
+STATE_READY = "ready"
+STATE_ERROR = "error"
+
+def _rss_bytes() -> Optional[int]:
+    """Process'in resident bellek kullanımını döndürür (ölçülemezse None)"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    
+    # Linux fallback
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+class ModelManager:
+    """
+    İsimlendirilmiş WhisperModel havuzu
+    
+    Her model için WhisperModel argümanları ayrı tutulur; model ilk istekte
+    veya preload() ile arka planda yüklenir, status() ile izlenir.
+    """
+    
+    def __init__(self, specs: Dict[str, Dict]):
+        """
+        Args:
+            specs: {isim: WhisperModel kwargs} (örn. {"live": {"model_size_or_path": "tiny", ...}});
+                opsiyonel "cpu_affinity" anahtarı WhisperModel'e geçmez, yükleme thread'ini CPU'lara bağlar
+        """
+        self.specs = specs
+        self._models: Dict[str, WhisperModel] = {}
+        self._locks = {name: threading.Lock() for name in specs}
+        self._info: Dict[str, Dict] = {
+            name: {
+                "state": STATE_NOT_LOADED,
+                "model": spec.get("model_size_or_path"),
+                "load_seconds": None,
+                "warmup_seconds": None,
+                "memory_mb": None,
+                "last_used": None,
+                "error": None
+            }
+            for name, spec in specs.items()
+        }
+        self._reaper: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+    
+    def get(self, name: str) -> WhisperModel:
+        """Modeli döndürür, yüklü değilse yükler (thread-safe)"""
+        model = self._models.get(name)
+        if model is None:
+            model = self._load(name)
+        self._info[name]["last_used"] = time.monotonic()
+        return model
+    
+    def _load(self, name: str) -> WhisperModel:
+        with self._locks[name]:
+            # Başka bir thread bu arada yüklemiş olabilir
+            if name in self._models:
+                return self._models[name]
+            
+            info = self._info[name]
+            info["state"] = STATE_LOADING
+            info["error"] = None
+            logger.info(f"Whisper modeli yükleniyor: {name} ({info['model']})...")
+            
+            rss_before = _rss_bytes()
+            load_start = time.time()
+            spec = dict(self.specs[name])
+            affinity = spec.pop("cpu_affinity", None)
+            try:
+                # CTranslate2 thread'leri yükleyen thread'in affinity'sini devralır
+                with pinned(affinity):
+                    model = WhisperModel(**spec)
+            except Exception as e:
+                info["state"] = STATE_ERROR
+                info["error"] = str(e)
+                logger.error(f"Model yükleme hatası ({name}): {e}")
+                raise
+            
+            info["load_seconds"] = round(time.time() - load_start, 2)
+            rss_after = _rss_bytes()
+            if rss_before is not None and rss_after is not None:
+                info["memory_mb"] = round(max(0, rss_after - rss_before) / (1024 * 1024), 1)
+            
+            self._models[name] = model
+            info["state"] = STATE_READY
+            logger.info(
+                f"✓ Whisper modeli yüklendi: {name} ({info['load_seconds']} sn, "
+                f"{spec.get('num_workers', 1)} worker x {spec.get('cpu_threads', 'default')} thread)"
+            )
+            return model
+    
+    def warmup(self, name: str) -> None:
+        """Sessiz 1 saniyelik ses ile dummy decode yapar (ilk isteğin gecikmesini önler)"""
+        model = self.get(name)
+        info = self._info[name]
+        info["state"] = STATE_WARMING_UP
+        
+        warmup_start = time.time()
+        try:
+            silence = np.zeros(16000, dtype=np.float32)
+            with pinned(self.specs[name].get("cpu_affinity")):
+                segments, _ = model.transcribe(
+                    silence,
+                    language="ar",
+                    beam_size=1,
+                    temperature=0.0,
+                    condition_on_previous_text=False,
+                    vad_filter=False
+                )
+                for _ in segments:
+                    pass
+            info["warmup_seconds"] = round(time.time() - warmup_start, 2)
+        except Exception as e:
+            # Warm-up başarısızsa model yine de kullanılabilir
+            logger.warning(f"Warm-up hatası ({name}): {e}")
+        finally:
+            info["state"] = STATE_READY
+    
+    def preload(
+        self,
+        names: List[str],
+        warmup: bool = True,
+        before: Optional[Callable[[], None]] = None
+    ) -> threading.Thread:
+        """
+        Modelleri arka plan thread'inde yükler (ve isteğe bağlı warm-up yapar)
+        
+        Args:
+            before: Yüklemeden önce aynı thread'de çalışır (örn. auto-tune ile spec'leri ayarlamak)
+        """
+        def _run():
+            if before is not None:
+                try:
+                    before()
+                except Exception as e:
+                    logger.error(f"Preload öncesi adım başarısız: {e}")
+            for name in names:
+                if name not in self.specs:
+                    logger.warning(f"Bilinmeyen model preload atlandı: {name}")
+                    continue
+                try:
+                    if warmup:
+                        self.warmup(name)
+                    else:
+                        self.get(name)
+                except Exception:
+                    # Hata status() içinde raporlanır
+                    pass
+        
+        thread = threading.Thread(target=_run, name="model-preload", daemon=True)
+        thread.start()
+        return thread
+    
+    def evict_idle(self, max_idle_seconds: float, keep: Optional[List[str]] = None) -> List[str]:
+        """
+        max_idle_seconds'tan uzun süredir kullanılmayan modelleri bellekten atar
+        
+        Args:
+            keep: Hiç atılmayacak model isimleri
+        
+        Returns:
+            Atılan model isimleri
+        """
+        keep = keep or []
+        now = time.monotonic()
+        evicted = []
+        
+        for name in list(self._models):
+            if name in keep:
+                continue
+            last_used = self._info[name]["last_used"]
+            if last_used is None or now - last_used < max_idle_seconds:
+                continue
+            
+            with self._locks[name]:
+                # Kullanımda olan referanslar işini bitirince model serbest kalır
+                self._models.pop(name, None)
+                self._info[name]["state"] = STATE_NOT_LOADED
+                self._info[name]["memory_mb"] = None
+            evicted.append(name)
+            logger.info(f"Boşta bekleyen model bellekten atıldı: {name}")
+        
+        return evicted
+    
+    def start_idle_reaper(
+        self,
+        max_idle_seconds: float,
+        interval_seconds: float = 60,
+        keep: Optional[List[str]] = None
+    ) -> None:
+        """evict_idle'ı periyodik çalıştıran arka plan thread'ini başlatır"""
+        if self._reaper is not None:
+            return
+        
+        def _run():
+            while not self._stop.wait(interval_seconds):
+                self.evict_idle(max_idle_seconds, keep=keep)
+        
+        self._reaper = threading.Thread(target=_run, name="model-reaper", daemon=True)
+        self._reaper.start()
+    
+    def stop(self) -> None:
+        """Arka plan thread'lerini durdurur"""
+        self._stop.set()
+    
+    def is_ready(self, names: List[str]) -> bool:
+        """Verilen modellerin hepsi yüklü ve hazır mı?"""
+        return all(self._info.get(n, {}).get("state") == STATE_READY for n in names)
+    
+    def status(self) -> Dict[str, Dict]:
+        """Model bazında durum (state, yükleme süresi, bellek, son kullanım)"""
+        now = time.monotonic()
+        result = {}
+        for name, info in self._info.items():
+            entry = {k: v for k, v in info.items() if k != "last_used"}
+            entry["idle_seconds"] = (
+                round(now - info["last_used"], 1) if info["last_used"] is not None else None
+            )
+            spec = self.specs[name]
+            entry["cpu_threads"] = spec.get("cpu_threads")
+            entry["num_workers"] = spec.get("num_workers", 1)
+            entry["compute_type"] = spec.get("compute_type")
+            entry["cpu_affinity"] = spec.get("cpu_affinity")
+            result[name] = entry
+        return result
@@ -0,0 +1,346 @@
+"""
+Kuran metninin kompakt, sütunlu (columnar) bellek gösterimi
+
+6236 ayet için ayrı dict tutmak yerine:
+- surah / ayah: numpy int16 dizileri
+- text_ar / norm: her biri tek birleştirilmiş string + int32 offset dizisi
+- surah_offsets: sure s'nin ayetleri [surah_offsets[s], surah_offsets[s + 1]) aralığıdır
+
+Ayetlere Verse görünümüyle (__slots__, sadece corpus referansı + index) erişilir; dict gibi
+verse["surah"], verse["norm"] okunabildiğinden mevcut kod değişmeden çalışır. Hedef pencere
+için "surah_no" / "ayah_no" anahtarları da desteklenir. VerseRange ardışık ayetlerin
+kopyasız görünümüdür (dilimleme ve sure aralıkları yeni nesne listesi oluşturmaz).
+
+Düz kelime dizisi (CorpusWords) de aynı şekilde tutulur: kelimeler tek birleştirilmiş string +
+int32 offset, ayet index'i ve ayet içi sıra int32 dizileri; kelimelere Word / WordRange
+görünümleriyle ({w, surah_no, ayah_no, ayah_local_index} anahtarlarıyla) erişilir.
+"""
+
+import itertools
+import operator
+import sys
+from collections.abc import Sequence
+from typing import Dict, Iterator, List, Optional
+import numpy as np
+
+# Sure numarası üst sınırı (surah_offsets uzunluğu = MAX_SURAH + 2)
+MAX_SURAH = 114
+
+class Verse:
+    """Tek ayetin görünümü (alanlar corpus dizilerinden okunur)"""
+    
+    __slots__ = ("_corpus", "index")
+    
+    # Dict uyumluluğu: anahtar -> alan adı
+    _FIELDS = {
+        "surah": "surah",
+        "surah_no": "surah",
+        "ayah": "ayah",
+        "ayah_no": "ayah",
+        "text_ar": "text_ar",
+        "norm": "norm"
+    }
+    
+    def __init__(self, corpus: "QuranCorpus", index: int):
+        self._corpus = corpus
+        self.index = index
+    
+    @property
+    def surah(self) -> int:
+        return int(self._corpus.surah[self.index])
+    
+    @property
+    def ayah(self) -> int:
+        return int(self._corpus.ayah[self.index])
+    
+    @property
+    def text_ar(self) -> str:
+        return self._corpus.text_ar(self.index)
+    
+    @property
+    def norm(self) -> str:
+        return self._corpus.norm(self.index)
+    
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, self._FIELDS[key])
+        except KeyError:
+            raise KeyError(key) from None
+    
+    def get(self, key: str, default=None):
+        field = self._FIELDS.get(key)
+        return getattr(self, field) if field is not None else default
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._FIELDS
+    
+    def to_dict(self) -> Dict:
+        """load_quran_lines formatında dict"""
+        return {"surah": self.surah, "ayah": self.ayah, "text_ar": self.text_ar, "norm": self.norm}
+    
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Verse) and other._corpus is self._corpus and other.index == self.index
+    
+    def __hash__(self) -> int:
+        return hash((id(self._corpus), self.index))
+    
+    def __repr__(self) -> str:
+        return f"Verse({self.surah}:{self.ayah})"
+
+class VerseRange(Sequence):
+    """Ardışık ayetlerin kopyasız görünümü ([start, stop) global index aralığı)"""
+    
+    __slots__ = ("_corpus", "start", "stop")
+    
+    def __init__(self, corpus: "QuranCorpus", start: int, stop: int):
+        self._corpus = corpus
+        self.start = start
+        self.stop = max(start, stop)
+    
+    def __len__(self) -> int:
+        return self.stop - self.start
+    
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            if step == 1:
+                return VerseRange(self._corpus, self.start + start, self.start + max(start, stop))
+            return [Verse(self._corpus, self.start + j) for j in range(start, stop, step)]
+        
+        i = operator.index(i)
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("verse index out of range")
+        return Verse(self._corpus, self.start + i)
+    
+    def __iter__(self) -> Iterator[Verse]:
+        corpus = self._corpus
+        for i in range(self.start, self.stop):
+            yield Verse(corpus, i)
+    
+    def norms(self) -> List[str]:
+        """Aralığın normalize metinleri (toplu okuma; tek tek Verse erişiminden hızlı)"""
+        return self._corpus.norms(self.start, self.stop)
+    
+    def __repr__(self) -> str:
+        return f"VerseRange({self.start}, {self.stop})"
+
+class QuranCorpus:
+    """Tüm ayetlerin sütunlu gösterimi (bir kez oluşturulur, salt okunur)"""
+    
+    def __init__(self, verses: List[Dict]):
+        """
+        Args:
+            verses: load_quran_lines() çıktısı; (sure, ayet) sırasına göre dizilir
+        """
+        order = sorted(range(len(verses)), key=lambda i: (verses[i]["surah"], verses[i]["ayah"]))
+        
+        self.surah = np.fromiter((verses[i]["surah"] for i in order), dtype=np.int16, count=len(order))
+        self.ayah = np.fromiter((verses[i]["ayah"] for i in order), dtype=np.int16, count=len(order))
+        self._text, self._text_offsets = self._concat([verses[i]["text_ar"] for i in order])
+        self._norm, self._norm_offsets = self._concat([verses[i]["norm"] for i in order])
+        
+        # Sure s'nin ayetleri: [surah_offsets[s], surah_offsets[s + 1])
+        self.surah_offsets = np.searchsorted(
+            self.surah, np.arange(MAX_SURAH + 2), side="left"
+        ).astype(np.int32)
+        
+        self.verses = VerseRange(self, 0, len(order))
+    
+    @staticmethod
+    def _concat(parts: List[str]):
+        offsets = np.zeros(len(parts) + 1, dtype=np.int32)
+        np.cumsum([len(p) for p in parts], out=offsets[1:])
+        return "".join(parts), offsets
+    
+    def __len__(self) -> int:
+        return len(self.surah)
+    
+    def text_ar(self, i: int) -> str:
+        return self._text[self._text_offsets[i]:self._text_offsets[i + 1]]
+    
+    def norm(self, i: int) -> str:
+        return self._norm[self._norm_offsets[i]:self._norm_offsets[i + 1]]
+    
+    def norms(self, start: int, stop: int) -> List[str]:
+        offsets = self._norm_offsets[start:stop + 1].tolist()
+        norm = self._norm
+        return [norm[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+    
+    def surah_range(self, first_surah: int, last_surah: Optional[int] = None) -> VerseRange:
+        """first_surah..last_surah (dahil) surelerinin ayetleri; geçersiz numara -> boş"""
+        last_surah = first_surah if last_surah is None else last_surah
+        first_surah = max(0, min(first_surah, MAX_SURAH + 1))
+        last_surah = max(first_surah - 1, min(last_surah, MAX_SURAH))
+        return VerseRange(
+            self, int(self.surah_offsets[first_surah]), int(self.surah_offsets[last_surah + 1])
+        )
+    
+    def ayah_count(self, surah_no: int) -> int:
+        return len(self.surah_range(surah_no))
+    
+    def index_of(self, surah_no: int, ayah_no: int) -> Optional[int]:
+        """(sure, ayet) -> global index (O(1); ayet numaraları ardışık değilse ikili arama)"""
+        if not 1 <= surah_no <= MAX_SURAH:
+            return None
+        start = int(self.surah_offsets[surah_no])
+        end = int(self.surah_offsets[surah_no + 1])
+        
+        i = start + ayah_no - 1
+        if start <= i < end and self.ayah[i] == ayah_no:
+            return i
+        i = start + int(np.searchsorted(self.ayah[start:end], ayah_no))
+        if i < end and self.ayah[i] == ayah_no:
+            return i
+        return None
+    
+    @property
+    def nbytes(self) -> int:
+        """Dizilerin ve metin buffer'larının yaklaşık boyutu"""
+        arrays = (self.surah, self.ayah, self._text_offsets, self._norm_offsets, self.surah_offsets)
+        return sum(a.nbytes for a in arrays) + sys.getsizeof(self._text) + sys.getsizeof(self._norm)
+
+class Word:
+    """Tek kelimenin görünümü (alanlar CorpusWords dizilerinden okunur)"""
+    
+    __slots__ = ("_words", "index")
+    
+    # Dict uyumluluğu: anahtar -> alan adı
+    _FIELDS = {
+        "w": "w",
+        "surah_no": "surah_no",
+        "ayah_no": "ayah_no",
+        "ayah_local_index": "ayah_local_index"
+    }
+    
+    def __init__(self, words: "CorpusWords", index: int):
+        self._words = words
+        self.index = index
+    
+    @property
+    def w(self) -> str:
+        return self._words.text(self.index)
+    
+    @property
+    def verse(self) -> int:
+        """get_verses() içindeki ayet index'i"""
+        return int(self._words.verse[self.index])
+    
+    @property
+    def surah_no(self) -> int:
+        return int(self._words._corpus.surah[self._words.verse[self.index]])
+    
+    @property
+    def ayah_no(self) -> int:
+        return int(self._words._corpus.ayah[self._words.verse[self.index]])
+    
+    @property
+    def ayah_local_index(self) -> int:
+        return int(self._words.position[self.index])
+    
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, self._FIELDS[key])
+        except KeyError:
+            raise KeyError(key) from None
+    
+    def get(self, key: str, default=None):
+        field = self._FIELDS.get(key)
+        return getattr(self, field) if field is not None else default
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._FIELDS
+    
+    def to_dict(self) -> Dict:
+        return {key: getattr(self, field) for key, field in self._FIELDS.items()}
+    
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Word) and other._words is self._words and other.index == self.index
+    
+    def __hash__(self) -> int:
+        return hash((id(self._words), self.index))
+    
+    def __repr__(self) -> str:
+        return f"Word({self.surah_no}:{self.ayah_no}:{self.ayah_local_index} {self.w})"
+
+class WordRange(Sequence):
+    """Ardışık kelimelerin kopyasız görünümü ([start, stop) global kelime index aralığı)"""
+    
+    __slots__ = ("_words", "start", "stop")
+    
+    def __init__(self, words: "CorpusWords", start: int, stop: int):
+        self._words = words
+        self.start = int(start)
+        self.stop = max(self.start, int(stop))
+    
+    def __len__(self) -> int:
+        return self.stop - self.start
+    
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            if step == 1:
+                return WordRange(self._words, self.start + start, self.start + max(start, stop))
+            return [Word(self._words, self.start + j) for j in range(start, stop, step)]
+        
+        i = operator.index(i)
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("word index out of range")
+        return Word(self._words, self.start + i)
+    
+    def __iter__(self) -> Iterator[Word]:
+        words = self._words
+        for i in range(self.start, self.stop):
+            yield Word(words, i)
+    
+    def texts(self) -> List[str]:
+        """Aralığın kelimeleri (toplu okuma; tek tek Word erişiminden hızlı)"""
+        return self._words.texts(self.start, self.stop)
+    
+    def verses(self) -> np.ndarray:
+        """Kelimelerin get_verses() ayet index'leri (sütun dilimi, kopyasız)"""
+        return self._words.verse[self.start:self.stop]
+    
+    def __repr__(self) -> str:
+        return f"WordRange({self.start}, {self.stop})"
+
+class CorpusWords(WordRange):
+    """
+    Tüm Kuran'ın düz kelime dizisi, sütunlu (bir kez oluşturulur, salt okunur)
+    
+    Ayet i'nin kelimeleri [verse_offsets[i], verse_offsets[i + 1]) aralığıdır.
+    """
+    
+    __slots__ = ("_corpus", "_text", "_text_offsets", "verse", "position", "verse_offsets")
+    
+    def __init__(self, corpus: QuranCorpus):
+        self._corpus = corpus
+        tokens = [norm.split() for norm in corpus.norms(0, len(corpus))]
+        counts = np.fromiter((len(t) for t in tokens), dtype=np.int32, count=len(tokens))
+        
+        self.verse_offsets = np.zeros(len(tokens) + 1, dtype=np.int32)
+        np.cumsum(counts, out=self.verse_offsets[1:])
+        self._text, self._text_offsets = QuranCorpus._concat(list(itertools.chain.from_iterable(tokens)))
+        
+        n_words = int(self.verse_offsets[-1])
+        self.verse = np.repeat(np.arange(len(tokens), dtype=np.int32), counts)
+        self.position = np.arange(n_words, dtype=np.int32) - self.verse_offsets[:-1][self.verse]
+        super().__init__(self, 0, n_words)
+    
+    def text(self, i: int) -> str:
+        return self._text[self._text_offsets[i]:self._text_offsets[i + 1]]
+    
+    def texts(self, start: int = 0, stop: Optional[int] = None) -> List[str]:
+        stop = len(self) if stop is None else stop
+        offsets = self._text_offsets[start:stop + 1].tolist()
+        text = self._text
+        return [text[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+    
+    @property
+    def nbytes(self) -> int:
+        """Dizilerin ve kelime buffer'ının yaklaşık boyutu"""
+        arrays = (self._text_offsets, self.verse, self.position, self.verse_offsets)
+        return sum(a.nbytes for a in arrays) + sys.getsizeof(self._text)
@@ -4,16 +4,30 @@ Kuran metnini yükler ve ayet eşleştirme yapar
 
 import os
 from pathlib import Path
-from typing import List, Dict, Optional
-from rapidfuzz import fuzz
+from typing import List, Dict, Optional, Sequence, Tuple
+import numpy as np
+from rapidfuzz import fuzz, process
+from utils.quran_corpus import CorpusWords, QuranCorpus, VerseRange
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Global verse listesi
-_verses: Optional[List[Dict]] = None
-# Sure bazında cache
-_verses_by_surah: Optional[Dict[int, List[Dict]]] = None
+# Sütunlu Kuran metni (ayetler, sure aralıkları, (sure, ayet) -> index)
+_corpus: Optional[QuranCorpus] = None
+# Sure bazında görünümler (kopyasız)
+_verses_by_surah: Optional[Dict[int, VerseRange]] = None
+# Düz kelime dizisi (tüm Kuran, sütunlu); ayet -> ilk kelime offset'leri corpus_words.verse_offsets
+_corpus_words: Optional[CorpusWords] = None
+# Ayet başlangıçları indeksi (hızlı ilk eşleşme için; ayet index'i -> anahtar)
+_openings: Optional[List[str]] = None
+# Boş olmayan başlangıçlar, sure başı / diğer diye ayrılmış: ((index'ler, anahtarlar), (index'ler, anahtarlar))
+_opening_groups: Optional[Tuple[Tuple[List[int], List[str]], Tuple[List[int], List[str]]]] = None
+# Normalize ayet metinleri (toplu eşleştirme için)
+_verse_norms: Optional[List[str]] = None
+
+# Besmele (normalize, ٱ -> ا sadeleştirilmiş karşılaştırma anahtarı)
+BASMALA_KEY = "بسم الله الرحمن الرحيم"
+OPENING_WORDS = 8
 
 # Sure meta (114 sure)
 SURAH_META = [
@@ -186,79 +200,97 @@ def load_quran_lines(quran_path: str) -> List[Dict]:
         logger.error(f"Kuran yükleme hatası: {e}")
         return verses
 
-def get_verses() -> List[Dict]:
-    """Global verse listesini döndürür (lazy load)"""
-    global _verses
+def get_corpus() -> QuranCorpus:
+    """Sütunlu Kuran metnini döndürür (lazy load; satır dict'leri yüklemeden sonra bırakılır)"""
+    global _corpus
     
-    if _verses is None:
+    if _corpus is None:
         # Proje root dizinini bul
         utils_dir = Path(__file__).parent
         project_root = utils_dir.parent
         quran_path = project_root / "quran" / "quran_tanzil.txt"
         
-        _verses = load_quran_lines(str(quran_path))
+        _corpus = QuranCorpus(load_quran_lines(str(quran_path)))
+        if len(_corpus):
+            logger.info(f"✓ Kuran metni sütunlu: {len(_corpus)} ayet, {_corpus.nbytes // 1024} KB")
+    
+    return _corpus
+
+def get_verses() -> Sequence:
+    """
+    Global ayet dizisini döndürür (lazy load)
     
-    return _verses
+    Elemanlar Verse görünümleridir; verse["surah"], verse["ayah"], verse["text_ar"],
+    verse["norm"] dict gibi okunur. Dilimler kopyasızdır.
+    """
+    return get_corpus().verses
 
-def get_verses_by_surah() -> Dict[int, List[Dict]]:
-    """Sure bazında cache oluşturur ve döndürür"""
+def get_verses_by_surah() -> Dict[int, VerseRange]:
+    """Sure no -> ayetleri (ayet sırasıyla; sure aralıklarının kopyasız görünümleri)"""
     global _verses_by_surah
     
     if _verses_by_surah is None:
-        verses = get_verses()
-        _verses_by_surah = {}
-        
-        for verse in verses:
-            surah_no = verse["surah"]
-            if surah_no not in _verses_by_surah:
-                _verses_by_surah[surah_no] = []
-            _verses_by_surah[surah_no].append(verse)
-        
-        # Her sure içindeki ayetleri ayah numarasına göre sırala
-        for surah_no in _verses_by_surah:
-            _verses_by_surah[surah_no].sort(key=lambda x: x["ayah"])
+        corpus = get_corpus()
+        _verses_by_surah = {
+            surah_no: corpus.surah_range(surah_no)
+            for surah_no in np.unique(corpus.surah).tolist()
+        }
     
     return _verses_by_surah
 
-def get_surah_ayahs(surah_no: int) -> List[Dict]:
-    """Belirli bir surenin ayetlerini döndürür"""
-    verses_by_surah = get_verses_by_surah()
+def get_verse_index(surah_no: int, ayah_no: int) -> Optional[int]:
+    """(surah, ayah) için get_verses() içindeki index'i döndürür (O(1), sure offset'lerinden)"""
+    return get_corpus().index_of(surah_no, ayah_no)
+
+def get_corpus_words() -> Tuple[CorpusWords, np.ndarray]:
+    """
+    Tüm Kuran'ın önceden hesaplanmış düz kelime dizisini döndürür
     
-    if surah_no not in verses_by_surah:
-        return []
+    Returns:
+        (corpus_words, verse_word_offsets):
+        - corpus_words: Kelime görünümleri ({w, ayah_no, surah_no, ayah_local_index} anahtarlarıyla
+          okunur; dilimler kopyasızdır, toplu metin için corpus_words[a:b].texts())
+        - verse_word_offsets: Ayet i'nin kelimeleri corpus_words[offsets[i]:offsets[i+1]]
+          (int32, uzunluk = ayet sayısı + 1)
+    """
+    global _corpus_words
+    
+    if _corpus_words is None:
+        words = CorpusWords(get_corpus())
+        _corpus_words = words
+        logger.info(f"✓ Kelime dizisi hazırlandı: {len(words)} kelime, {words.nbytes // 1024} KB")
     
+    return _corpus_words, _corpus_words.verse_offsets
+
+def get_surah_ayahs(surah_no: int) -> List[Dict]:
+    """Belirli bir surenin ayetlerini döndürür"""
     return [
         {
             "ayah_no": verse["ayah"],
             "text_ar": verse["text_ar"]
         }
-        for verse in verses_by_surah[surah_no]
+        for verse in get_corpus().surah_range(surah_no)
     ]
 
+def get_ayah_count(surah_no: int) -> int:
+    """Surenin ayet sayısı (O(1))"""
+    return get_corpus().ayah_count(surah_no)
+
 def get_context(surah_no: int, ayah_no: int, before: int = 2, after: int = 10) -> List[Dict]:
     """Belirli bir ayetin etrafındaki ayetleri döndürür"""
-    verses_by_surah = get_verses_by_surah()
-    
-    if surah_no not in verses_by_surah:
-        return []
-    
-    surah_verses = verses_by_surah[surah_no]
-    
-    # Mevcut ayetin index'ini bul
-    current_idx = None
-    for idx, verse in enumerate(surah_verses):
-        if verse["ayah"] == ayah_no:
-            current_idx = idx
-            break
+    corpus = get_corpus()
     
+    # Mevcut ayetin index'ini bul (O(1))
+    current_idx = corpus.index_of(surah_no, ayah_no)
     if current_idx is None:
         return []
     
-    # Önceki ve sonraki ayetleri al
-    start_idx = max(0, current_idx - before)
-    end_idx = min(len(surah_verses), current_idx + after + 1)
+    # Önceki ve sonraki ayetleri al (sure sınırı içinde)
+    surah_verses = corpus.surah_range(surah_no)
+    start_idx = max(surah_verses.start, current_idx - before)
+    end_idx = min(surah_verses.stop, current_idx + after + 1)
     
-    context_verses = surah_verses[start_idx:end_idx]
+    context_verses = corpus.verses[start_idx:end_idx]
     
     return [
         {
@@ -271,12 +303,12 @@ def get_context(surah_no: int, ayah_no: int, before: int = 2, after: int = 10) -
 
 def get_surah_meta() -> List[Dict]:
     """Tüm surelerin meta bilgilerini döndürür"""
-    verses_by_surah = get_verses_by_surah()
+    corpus = get_corpus()
     
     meta_list = []
     for surah_info in SURAH_META:
         surah_no = surah_info["surah_no"]
-        ayah_count = len(verses_by_surah.get(surah_no, []))
+        ayah_count = corpus.ayah_count(surah_no)
         
         meta_list.append({
             "surah_no": surah_no,
@@ -287,13 +319,13 @@ def get_surah_meta() -> List[Dict]:
     
     return meta_list
 
-def match_verses(transcript_norm: str, verses: List[Dict] = None, top_k: int = 3) -> List[Dict]:
+def match_verses(transcript_norm: str, verses: Sequence = None, top_k: int = 3) -> List[Dict]:
     """
     Transcript ile Kuran ayetlerini eşleştirir
     
     Args:
         transcript_norm: Normalize edilmiş transcript
-        verses: Ayet listesi (None ise global listeyi kullanır)
+        verses: Ayet dizisi (None ise global diziyi kullanır)
         top_k: En iyi kaç sonuç döndürülecek
     
     Returns:
@@ -309,21 +341,241 @@ def match_verses(transcript_norm: str, verses: List[Dict] = None, top_k: int = 3
     if not verses:
         return []
     
+    # Sütunlu aralıklarda metinler toplu okunur
+    norms = verses.norms() if isinstance(verses, VerseRange) else [verse["norm"] for verse in verses]
+    
     # Her ayet için skor hesapla
     scored = []
-    for verse in verses:
+    for idx, norm in enumerate(norms):
         # partial_ratio kullan (kısmi eşleşme için)
-        score = fuzz.partial_ratio(transcript_norm, verse["norm"])
-        scored.append({
-            "surah": verse["surah"],
-            "ayah": verse["ayah"],
-            "text_ar": verse["text_ar"],
+        scored.append((fuzz.partial_ratio(transcript_norm, norm), idx))
+    
+    # Score'a göre sırala (yüksekten düşüğe; eşitse ayet sırası)
+    scored.sort(key=lambda x: x[0], reverse=True)
+    
+    # Top K al (sonuç dict'leri sadece bunlar için oluşturulur)
+    return [
+        {
+            "surah": verses[idx]["surah"],
+            "ayah": verses[idx]["ayah"],
+            "text_ar": verses[idx]["text_ar"],
             "score": score
-        })
+        }
+        for score, idx in scored[:top_k]
+    ]
+
+def match_verses_batch(transcripts_norm: List[str], top_k: int = 3, workers: int = -1) -> List[List[Dict]]:
+    """
+    Birden fazla transcript'i tek seferde tüm ayetlerle eşleştirir
+    
+    Skor matrisi (transcript x ayet) rapidfuzz process.cdist ile paralel hesaplanır;
+    her satırın en iyi top_k'sı numpy ile seçilir. Sonuçlar match_verses ile aynıdır.
+    
+    Args:
+        transcripts_norm: Normalize edilmiş transcript listesi
+        top_k: Transcript başına sonuç sayısı
+        workers: cdist thread sayısı (-1 = tüm çekirdekler)
+    
+    Returns:
+        Her transcript için match_verses formatında liste (boş transcript -> [])
+    """
+    global _verse_norms
+    
+    verses = get_verses()
+    if not verses:
+        return [[] for _ in transcripts_norm]
+    if _verse_norms is None:
+        _verse_norms = verses.norms()
+    
+    queries = [(i, t) for i, t in enumerate(transcripts_norm) if t and t.strip()]
+    results: List[List[Dict]] = [[] for _ in transcripts_norm]
+    if not queries:
+        return results
+    
+    scores = process.cdist(
+        [t for _, t in queries],
+        _verse_norms,
+        scorer=fuzz.partial_ratio,
+        dtype=np.float64,
+        workers=workers
+    )
+    
+    k = min(top_k, len(verses))
+    # Satır başına k. en yüksek skor; eşit skorlar match_verses'teki gibi ayet sırasıyla seçilir
+    kth_scores = np.partition(scores, -k, axis=1)[:, -k]
+    
+    for row, (i, _) in enumerate(queries):
+        candidates = np.flatnonzero(scores[row] >= kth_scores[row])
+        idx = candidates[np.argsort(-scores[row, candidates], kind="stable")][:k]
+        results[i] = [
+            {
+                "surah": verses[j]["surah"],
+                "ayah": verses[j]["ayah"],
+                "text_ar": verses[j]["text_ar"],
+                "score": float(scores[row, j])
+            }
+            for j in idx
+        ]
     
-    # Score'a göre sırala (yüksekten düşüğe)
-    scored.sort(key=lambda x: x["score"], reverse=True)
+    return results
+
+def _opening_key(text_norm: str) -> str:
+    """Başlangıç karşılaştırması için anahtar (elif-i vasl sadeleştirilir)"""
+    return text_norm.replace("ٱ", "ا")
+
+def strip_basmala(text_norm: str) -> Tuple[str, bool]:
+    """
+    Metnin başındaki besmeleyi (bulanık eşleşmeyle) çıkarır
+    
+    Returns:
+        (kalan_metin, besmele_vardi_mi)
+    """
+    words = text_norm.split()
+    n = len(BASMALA_KEY.split())
+    
+    if len(words) >= n and fuzz.ratio(_opening_key(" ".join(words[:n])), BASMALA_KEY) >= 85:
+        return " ".join(words[n:]), True
+    
+    return text_norm, False
+
+def get_opening_index() -> List[str]:
+    """
+    Her ayetten başlayan ilk OPENING_WORDS kelimeden oluşan indeksi döndürür (lazy)
+    
+    Sure başlarında besmele çıkarılmış hali tutulur; böylece
+    besmeleden sonraki ilk kelimeler sureyi ayırt eder.
+    
+    Returns:
+        Ayet başına karşılaştırma anahtarı (index = get_verses() index'i; sure başı
+        ayetler corpus.ayah == 1'den, metin eşleşme sonucunda okunur)
+    """
+    global _openings
+    
+    if _openings is None:
+        corpus = get_corpus()
+        corpus_words, offsets = get_corpus_words()
+        n_basmala = len(BASMALA_KEY.split())
+        word_offsets = offsets.tolist()
+        # Ayetin suresinin bittiği kelime (sure sınırı aşılmaz)
+        surah_ends = [
+            word_offsets[corpus.surah_offsets[surah_no + 1]] for surah_no in corpus.surah.tolist()
+        ]
+        surah_starts = (corpus.ayah == 1).tolist()
+        openings = []
+        
+        for idx, norm in enumerate(corpus.norms(0, len(corpus))):
+            start = word_offsets[idx]
+            # Besmele ayetin kendisiyse (1:1) çıkarılmaz
+            if (
+                surah_starts[idx]
+                and word_offsets[idx + 1] - start > n_basmala
+                and strip_basmala(norm)[1]
+            ):
+                start += n_basmala
+            
+            # Kısa ayetlerde (örn. "الم") başlangıç sonraki ayetlere taşar
+            stop = min(start + OPENING_WORDS, surah_ends[idx])
+            openings.append(_opening_key(" ".join(corpus_words.texts(start, stop))))
+        
+        _openings = openings
+    
+    return _openings
+
+def _get_opening_groups() -> Tuple[Tuple[List[int], List[str]], Tuple[List[int], List[str]]]:
+    """
+    Boş olmayan başlangıç anahtarlarını sure başı ve diğer ayetler olarak ayırır (lazy, bir kez)
+    
+    Returns:
+        ((sure başı index'leri, anahtarları), (diğer index'ler, anahtarları))
+    """
+    global _opening_groups
+    
+    if _opening_groups is None:
+        openings = get_opening_index()
+        surah_starts = get_corpus().ayah == 1
+        groups = ([], []), ([], [])
+        for idx, opening in enumerate(openings):
+            if opening:
+                indices, keys = groups[0] if surah_starts[idx] else groups[1]
+                indices.append(idx)
+                keys.append(opening)
+        _opening_groups = groups
     
-    # Top K al
-    return scored[:top_k]
+    return _opening_groups
 
+def _score_openings(key: str, openings: List[str], score_cutoff: float = 0) -> np.ndarray:
+    """Anahtarı başlangıçların aynı uzunluktaki önekleriyle skorlar (cutoff altı = 0)"""
+    if not openings:
+        return np.zeros(0)
+    return process.cdist(
+        [key],
+        [opening[:len(key)] for opening in openings],
+        scorer=fuzz.ratio,
+        dtype=np.float64,
+        score_cutoff=score_cutoff
+    )[0]
+
+def _top_openings(scores: np.ndarray, indices: List[int], top_k: int) -> List[Tuple[float, int]]:
+    """En iyi top_k (skor, ayet index'i); eşit skorlar ayet sırasıyla seçilir"""
+    k = min(top_k, len(scores))
+    if k <= 0:
+        return []
+    kth_score = np.partition(scores, -k)[-k]
+    candidates = np.flatnonzero(scores >= kth_score)
+    best = candidates[np.argsort(-scores[candidates], kind="stable")][:k]
+    return [(float(scores[i]), indices[i]) for i in best.tolist()]
+
+def match_openings(
+    transcript_norm: str,
+    top_k: int = 3,
+    surah_start_bonus: float = 5.0,
+    basmala_bonus: float = 10.0
+) -> List[Dict]:
+    """
+    Kısa (2-3 sn) bir başlangıç transkriptini ayet başlangıçlarıyla eşleştirir
+    
+    Transkript yalnızca ayetin aynı uzunluktaki başıyla karşılaştırılır (önek eşleşmesi).
+    Sure başlarına öncelik verilir; transkript besmeleyle başlıyorsa bu öncelik artar.
+    
+    Args:
+        transcript_norm: Normalize edilmiş kısa transcript
+        top_k: En iyi kaç sonuç döndürülecek
+        surah_start_bonus: Sure başı ayetlere eklenen skor
+        basmala_bonus: Besmele duyulduysa sure başlarına eklenen skor
+    
+    Returns:
+        match_verses formatında liste; skor 0-100 arasına kırpılır.
+        Sadece besmele duyulduysa (sure ayırt edilemez) boş liste döner.
+    """
+    if not transcript_norm or not transcript_norm.strip():
+        return []
+    
+    text, had_basmala = strip_basmala(transcript_norm)
+    if not text.strip():
+        return []
+    
+    key = _opening_key(text)
+    bonus = basmala_bonus if had_basmala else surah_start_bonus
+    (start_idx, start_keys), (other_idx, other_keys) = _get_opening_groups()
+    
+    # Sure başları (bonuslu) ve diğerleri ayrı skorlanır; transkript her başlangıcın
+    # aynı uzunluktaki önekiyle karşılaştırılır
+    start_scores = np.minimum(100.0, _score_openings(key, start_keys) + bonus)
+    scored = _top_openings(start_scores, start_idx, top_k)
+    # Diğerleri ancak k. en iyi sure başı skoruna ulaşırsa ilk top_k'ya girebilir
+    # (eşitler de girer; rapidfuzz cutoff'u mesafeye çevirirken yuvarladığı için küçük pay)
+    cutoff = min(score for score, _ in scored) - 1e-6 if len(scored) >= top_k else 0
+    scored += _top_openings(_score_openings(key, other_keys, cutoff), other_idx, top_k)
+    
+    # Eşit skorlarda ayet sırası korunur
+    scored.sort(key=lambda x: (-x[0], x[1]))
+    verses = get_verses()
+    return [
+        {
+            "surah": verses[idx]["surah"],
+            "ayah": verses[idx]["ayah"],
+            "text_ar": verses[idx]["text_ar"],
+            "score": score
+        }
+        for score, idx in scored[:top_k]
+    ]
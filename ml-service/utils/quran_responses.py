@@ -0,0 +1,233 @@
+"""
+/quran/* okuma endpoint'leri için önceden serileştirilmiş yanıtlar
+
+Kuran metni çalışma sırasında değişmediği için /quran/meta ve /quran/surah/{n} gövdeleri
+başlangıçta bir kez JSON'a çevrilir, gzip (ve kuruluysa brotli) varyantlarıyla birlikte
+bellekte tutulur. /quran/context için her ayetin JSON parçası hazırdır; yanıt (sure, ayet)
+indeksinden O(1) bulunan dilimin parçalarının birleştirilmesiyle oluşur.
+
+Yanıtlar içerikten türetilen güçlü ETag ve kısa max-age'li Cache-Control ile döner; süre
+dolunca istemci If-None-Match ile doğrular ve eşleşirse 304 gönderilir. URL'ler içerik
+sürümü taşımadığı için "immutable" kullanılmaz (metin değişirse en geç max-age sonra görülür).
+Ayeti bulunamayan (boş) /quran/context yanıtları hiç cache'lenmez.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from starlette.responses import Response
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+except ImportError:  # brotli opsiyonel; yoksa sadece gzip
+    brotli = None
+
+# Tarayıcı / CDN cache süresi (sn); sonrasında ETag ile yeniden doğrulanır
+CACHE_MAX_AGE = int(os.environ.get("QURAN_CACHE_MAX_AGE", "3600"))
+CACHE_CONTROL = f"public, max-age={CACHE_MAX_AGE}"
+# Boş / geçersiz yanıtlar (örn. aralık dışı ayet) cache'lenmez
+NO_STORE = "no-store"
+# Bu boyuttan küçük gövdeler sıkıştırılmaz
+MIN_COMPRESS_BYTES = 512
+# Bellekte tutulan /quran/context yanıtı sayısı (LRU)
+CONTEXT_CACHE_SIZE = 2048
+
+def _dumps(content) -> bytes:
+    # FastAPI JSONResponse ile aynı biçim
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    """Accept-Encoding header'ını {kodlama: q} sözlüğüne çevirir"""
+    result = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        result[coding.strip().lower()] = q
+    return result
+
+class CachedBody:
+    """Tek yanıt gövdesi: ham + sıkıştırılmış varyantlar ve ETag'ler"""
+    
+    __slots__ = ("identity", "gzip", "br", "etag", "cache_control")
+    
+    def __init__(
+        self,
+        body: bytes,
+        gzip_level: int = 9,
+        brotli_quality: int = 11,
+        cache_control: str = CACHE_CONTROL
+    ):
+        self.identity = body
+        self.cache_control = cache_control
+        self.gzip: Optional[bytes] = None
+        self.br: Optional[bytes] = None
+        if len(body) >= MIN_COMPRESS_BYTES:
+            self.gzip = gzip.compress(body, compresslevel=gzip_level, mtime=0)
+            if brotli is not None:
+                self.br = brotli.compress(body, quality=brotli_quality)
+        self.etag = hashlib.sha256(body).hexdigest()[:20]
+    
+    def variant(self, accept_encoding: str) -> Tuple[bytes, Optional[str], str]:
+        """
+        İstemcinin kabul ettiği en küçük varyant
+        
+        Returns:
+            (gövde, Content-Encoding veya None, ETag) - her varyantın ETag'i farklıdır
+        """
+        accepted = accepted_encodings(accept_encoding) if accept_encoding else {}
+        if self.br is not None and accepted.get("br", 0) > 0:
+            return self.br, "br", f'"{self.etag}-br"'
+        if self.gzip is not None and (accepted.get("gzip", 0) > 0 or accepted.get("x-gzip", 0) > 0):
+            return self.gzip, "gzip", f'"{self.etag}-gz"'
+        return self.identity, None, f'"{self.etag}"'
+    
+    def matches(self, if_none_match: str) -> bool:
+        """If-None-Match herhangi bir varyantın ETag'ini içeriyor mu"""
+        if if_none_match.strip() == "*":
+            return True
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag.startswith("W/"):
+                tag = tag[2:]
+            tag = tag.strip('"')
+            if tag == self.etag or tag.startswith(self.etag + "-"):
+                return True
+        return False
+    
+    def sizes(self) -> Dict[str, Optional[int]]:
+        return {
+            "identity": len(self.identity),
+            "gzip": len(self.gzip) if self.gzip is not None else None,
+            "br": len(self.br) if self.br is not None else None
+        }
+
+def cached_response(body: CachedBody, headers) -> Response:
+    """
+    Hazır gövdeden yanıt (ETag / 304, içerik pazarlığı, gövdenin Cache-Control'ü)
+    
+    Args:
+        headers: İstek header'ları (request.headers)
+    """
+    content, encoding, etag = body.variant(headers.get("accept-encoding", ""))
+    response_headers = {
+        "ETag": etag,
+        "Cache-Control": body.cache_control,
+        "Vary": "Accept-Encoding"
+    }
+    if_none_match = headers.get("if-none-match")
+    if if_none_match and body.matches(if_none_match):
+        return Response(status_code=304, headers=response_headers)
+    if encoding is not None:
+        response_headers["Content-Encoding"] = encoding
+    return Response(content, media_type="application/json", headers=response_headers)
+
+class QuranResponses:
+    """Kuran okuma yanıtlarının bellek içi anlık görüntüsü (başlangıçta bir kez oluşturulur)"""
+    
+    def __init__(self, verses_by_surah: Dict[int, List[Dict]], surah_meta: List[Dict]):
+        """
+        Args:
+            verses_by_surah: get_verses_by_surah() çıktısı
+            surah_meta: get_surah_meta() çıktısı
+        """
+        self.meta = CachedBody(_dumps({"surahs": surah_meta}))
+        
+        meta_by_no = {m["surah_no"]: m for m in surah_meta}
+        self._surahs: Dict[int, CachedBody] = {}
+        # Sure başına ayet JSON parçaları ve (sure, ayet) -> parça index'i
+        self._fragments: Dict[int, List[bytes]] = {}
+        self._ayah_index: Dict[Tuple[int, int], int] = {}
+        
+        for surah_no, verses in verses_by_surah.items():
+            info = meta_by_no.get(surah_no)
+            self._surahs[surah_no] = CachedBody(_dumps({
+                "surah_no": surah_no,
+                "name_ar": info["name_ar"] if info else "",
+                "name_tr": info["name_tr"] if info else "",
+                "ayahs": [{"ayah_no": v["ayah"], "text_ar": v["text_ar"]} for v in verses]
+            }))
+            self._fragments[surah_no] = [
+                _dumps({"surah_no": surah_no, "ayah_no": v["ayah"], "text_ar": v["text_ar"]})
+                for v in verses
+            ]
+            for idx, verse in enumerate(verses):
+                self._ayah_index[(surah_no, verse["ayah"])] = idx
+        
+        self._context_cache: "OrderedDict[Tuple, CachedBody]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def surah(self, surah_no: int) -> Optional[CachedBody]:
+        return self._surahs.get(surah_no)
+    
+    def context(self, surah_no: int, ayah_no: int, before: int = 2, after: int = 10) -> CachedBody:
+        """get_context ile aynı içerik; ayet bulunamazsa items boş (ve cache'lenmez)"""
+        key = (surah_no, ayah_no, before, after)
+        with self._lock:
+            body = self._context_cache.get(key)
+            if body is not None:
+                self._context_cache.move_to_end(key)
+                return body
+        
+        idx = self._ayah_index.get((surah_no, ayah_no))
+        items = b""
+        if idx is not None:
+            fragments = self._fragments[surah_no]
+            start_idx = max(0, idx - before)
+            end_idx = min(len(fragments), idx + after + 1)
+            items = b",".join(fragments[start_idx:end_idx])
+        
+        # Sık istenen küçük gövdeler: hızlı sıkıştırma seviyeleri
+        body = CachedBody(
+            b'{"surah_no":%d,"ayah_no":%d,"items":[%s]}' % (surah_no, ayah_no, items),
+            gzip_level=6,
+            brotli_quality=5,
+            cache_control=CACHE_CONTROL if idx is not None else NO_STORE
+        )
+        with self._lock:
+            self._context_cache[key] = body
+            if len(self._context_cache) > CONTEXT_CACHE_SIZE:
+                self._context_cache.popitem(last=False)
+        return body
+    
+    def status(self) -> Dict:
+        bodies = [self.meta] + list(self._surahs.values())
+        return {
+            "surahs": len(self._surahs),
+            "bytes": sum(len(b.identity) for b in bodies),
+            "gzip_bytes": sum(len(b.gzip) for b in bodies if b.gzip is not None),
+            "br_bytes": sum(len(b.br) for b in bodies if b.br is not None) if brotli is not None else None,
+            "context_cached": len(self._context_cache)
+        }
+
+_responses: Optional[QuranResponses] = None
+_build_lock = threading.Lock()
+
+def get_quran_responses() -> QuranResponses:
+    """Anlık görüntüyü döndürür (ilk çağrıda oluşturur; başlangıçta executor'da çağrılır)"""
+    global _responses
+    if _responses is None:
+        with _build_lock:
+            if _responses is None:
+                from utils.quran_index import get_verses_by_surah, get_surah_meta
+                _responses = QuranResponses(get_verses_by_surah(), get_surah_meta())
+                status = _responses.status()
+                logger.info(
+                    f"✓ /quran yanıtları hazır: {status['surahs']} sure, "
+                    f"{status['bytes'] // 1024} KB (gzip {status['gzip_bytes'] // 1024} KB)"
+                )
+    return _responses
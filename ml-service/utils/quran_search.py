@@ -0,0 +1,248 @@
+"""
+Kuran metninde yazılı arama (/quran/search): exact, prefix ve fuzzy modları
+
+Tüm Kuran'ın düz kelime dizisi (get_corpus_words) üzerinde önceden hesaplanan indeks:
+- Sözlük: normalize kelime tipleri alfabetik sıralı; her tipin geçtiği kelime pozisyonları
+  tek bir dizide tip sırasıyla ardışık tutulur (CSR). Bir önekle başlayan tüm tipler
+  sözlükte ardışık olduğundan öneğin pozisyonları tek bir dilimdir.
+- Q-gram indeksi: sözlük tiplerinin bigram'ları (kelime sınırı işaretli); fuzzy modda aday
+  tipler ortak bigram sayısıyla bulunur, sadece adaylar rapidfuzz ile skorlanır.
+
+Çok kelimeli sorgular ardışık kelime dizisi (ifade) olarak aranır; eşleşme ayet sınırını
+geçebilir ama sure sınırını geçmez. Sonuçlar (sure, ayet, kelime) aralığı ve ayet
+metinlerindeki (text_ar) karakter offset'leriyle döner.
+"""
+
+import math
+import re
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from rapidfuzz import fuzz
+from utils.arabic_norm import normalize_ar
+from utils.quran_corpus import CorpusWords
+import logging
+
+logger = logging.getLogger(__name__)
+
+SEARCH_MODES = ("exact", "prefix", "fuzzy")
+# Fuzzy: kelime benzerliği alt sınırı (0-100) ve sorgu kelimesi başına en fazla aday tip
+FUZZY_MIN_SCORE = 70.0
+FUZZY_MAX_TYPES = 64
+# Fuzzy aday eşiği: sorgunun bigram'larının bu oranı tipte de olmalı
+FUZZY_MIN_GRAM_RATIO = 0.4
+
+def search_key(text: str) -> str:
+    """Arama anahtarı: normalize + elif-i vasl sadeleştirme (klavyede ٱ yazılmaz)"""
+    return normalize_ar(text).replace("ٱ", "ا")
+
+def _bigrams(word: str) -> List[str]:
+    padded = f"#{word}#"
+    return [padded[i:i + 2] for i in range(len(padded) - 1)]
+
+class QuranSearchIndex:
+    """Kelime pozisyonu, önek ve q-gram indeksi (bir kez oluşturulur, salt okunur)"""
+    
+    def __init__(self, verses: Sequence, corpus_words: CorpusWords, verse_word_offsets: np.ndarray):
+        """
+        Args:
+            verses: get_verses()
+            corpus_words, verse_word_offsets: get_corpus_words()
+        """
+        self._verses = verses
+        self._offsets = np.asarray(verse_word_offsets, dtype=np.int64)
+        
+        keys = [word.replace("ٱ", "ا") for word in corpus_words.texts()]
+        self.vocab: List[str] = sorted(set(keys))
+        type_ids = {word: i for i, word in enumerate(self.vocab)}
+        token_types = np.fromiter((type_ids[k] for k in keys), dtype=np.int32, count=len(keys))
+        
+        # CSR: tip i'nin pozisyonları postings[type_starts[i]:type_starts[i + 1]] (artan sırada)
+        self._postings = np.argsort(token_types, kind="stable").astype(np.int32)
+        self._type_starts = np.searchsorted(
+            token_types[self._postings], np.arange(len(self.vocab) + 1)
+        ).astype(np.int64)
+        
+        # Pozisyon -> ayet index'i / sure no / ayet içi kelime index'i (kelime dizisinin sütunları)
+        self._token_verse = corpus_words.verse
+        self._token_surah = np.asarray([v["surah"] for v in verses], dtype=np.int16)[self._token_verse]
+        self._token_local = corpus_words.position
+        
+        # Bigram -> tip id'leri
+        grams: Dict[str, List[int]] = {}
+        for type_id, word in enumerate(self.vocab):
+            for gram in set(_bigrams(word)):
+                grams.setdefault(gram, []).append(type_id)
+        self._grams = {gram: np.asarray(ids, dtype=np.int32) for gram, ids in grams.items()}
+        
+        # Ayet metnindeki kelimelerin karakter aralıkları (highlight; ilk kullanımda)
+        self._char_spans: Dict[int, List[Tuple[int, int]]] = {}
+        self._lock = threading.Lock()
+        
+        logger.info(
+            f"✓ Arama indeksi hazır: {len(keys)} kelime, {len(self.vocab)} tip, {len(self._grams)} bigram"
+        )
+    
+    def _type_positions(self, first_type: int, last_type: int) -> np.ndarray:
+        """[first_type, last_type) tiplerinin pozisyonları (tek tipte zaten sıralı)"""
+        positions = self._postings[self._type_starts[first_type]:self._type_starts[last_type]]
+        if last_type - first_type > 1:
+            positions = np.sort(positions)
+        return positions
+    
+    def _exact_type(self, word: str) -> Optional[int]:
+        i = bisect_left(self.vocab, word)
+        if i < len(self.vocab) and self.vocab[i] == word:
+            return i
+        return None
+    
+    def _prefix_types(self, prefix: str) -> Tuple[int, int]:
+        return bisect_left(self.vocab, prefix), bisect_left(self.vocab, prefix + "\uffff")
+    
+    def _fuzzy_types(self, word: str, min_score: float) -> List[Tuple[int, float]]:
+        """Q-gram adayları içinden benzerliği min_score'u geçen tipler (en iyi FUZZY_MAX_TYPES)"""
+        gram_ids = [self._grams[g] for g in set(_bigrams(word)) if g in self._grams]
+        if not gram_ids:
+            return []
+        shared = np.bincount(np.concatenate(gram_ids), minlength=len(self.vocab))
+        needed = max(1, math.ceil(len(_bigrams(word)) * FUZZY_MIN_GRAM_RATIO))
+        candidates = np.flatnonzero(shared >= needed)
+        
+        scored = []
+        for type_id in candidates:
+            score = fuzz.ratio(word, self.vocab[type_id], score_cutoff=min_score)
+            if score:
+                scored.append((int(type_id), score))
+        scored.sort(key=lambda x: -x[1])
+        return scored[:FUZZY_MAX_TYPES]
+    
+    def _token_matches(self, word: str, mode: str, is_last: bool) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Sorgu kelimesinin eşleştiği pozisyonlar (artan) ve kelime skorları (0-100)
+        """
+        if mode == "fuzzy":
+            types = self._fuzzy_types(word, FUZZY_MIN_SCORE)
+            if not types:
+                return np.zeros(0, dtype=np.int32), np.zeros(0)
+            positions = [self._type_positions(t, t + 1) for t, _ in types]
+            scores = [np.full(len(p), s) for p, (_, s) in zip(positions, types)]
+        elif mode == "prefix" and is_last:
+            # Son kelime yazılmaya devam ediyor: önekle başlayan tüm tipler
+            first, last = self._prefix_types(word)
+            if first == last:
+                return np.zeros(0, dtype=np.int32), np.zeros(0)
+            positions = [self._postings[self._type_starts[first]:self._type_starts[last]]]
+            # Tam kelimeye yakın tamamlamalar önce: skor = önek uzunluğu / kelime uzunluğu
+            lengths = np.asarray([len(self.vocab[t]) for t in range(first, last)], dtype=np.float64)
+            per_type = 100.0 * len(word) / lengths
+            scores = [np.repeat(per_type, np.diff(self._type_starts[first:last + 1]))]
+        else:
+            type_id = self._exact_type(word)
+            if type_id is None:
+                return np.zeros(0, dtype=np.int32), np.zeros(0)
+            positions = [self._type_positions(type_id, type_id + 1)]
+            scores = [np.full(len(positions[0]), 100.0)]
+        
+        positions = np.concatenate(positions)
+        scores = np.concatenate(scores)
+        order = np.argsort(positions, kind="stable")
+        return positions[order], scores[order]
+    
+    def _char_span(self, verse_idx: int, word_idx: int) -> Tuple[int, int]:
+        spans = self._char_spans.get(verse_idx)
+        if spans is None:
+            spans = [m.span() for m in re.finditer(r"\S+", self._verses[verse_idx]["text_ar"])]
+            with self._lock:
+                self._char_spans[verse_idx] = spans
+        return spans[word_idx]
+    
+    def _hit(self, start: int, n_words: int, score: float, mode: str) -> Dict:
+        """Pozisyon aralığından sonuç: ayet bazında highlight offset'leri"""
+        end = start + n_words - 1
+        start_verse = int(self._token_verse[start])
+        verse = self._verses[start_verse]
+        
+        highlights = []
+        for verse_idx in range(start_verse, int(self._token_verse[end]) + 1):
+            first = max(start, int(self._offsets[verse_idx])) - int(self._offsets[verse_idx])
+            last = min(end, int(self._offsets[verse_idx + 1]) - 1) - int(self._offsets[verse_idx])
+            highlights.append({
+                "ayah_no": self._verses[verse_idx]["ayah"],
+                "start": self._char_span(verse_idx, first)[0],
+                "end": self._char_span(verse_idx, last)[1]
+            })
+        
+        return {
+            "surah_no": verse["surah"],
+            "ayah_no": verse["ayah"],
+            "word_index": int(self._token_local[start]),
+            "end": {
+                "ayah_no": self._verses[int(self._token_verse[end])]["ayah"],
+                "word_index": int(self._token_local[end])
+            },
+            "text_ar": verse["text_ar"],
+            "score": round(float(score), 1),
+            "match": mode,
+            "highlights": highlights
+        }
+    
+    def search(self, query: str, mode: str = "prefix", limit: int = 20) -> Optional[Dict]:
+        """
+        Sorgu kelimelerini ardışık ifade olarak arar
+        
+        Args:
+            query: Kullanıcının yazdığı metin (harekeli/harekesiz)
+            mode: "exact" (tam kelimeler), "prefix" (son kelime önek) veya "fuzzy"
+            limit: En fazla sonuç
+        
+        Returns:
+            {"query_norm", "total", "hits": [...]} (skor azalan, eşitse Kuran sırası);
+            sorguda aranabilir kelime yoksa None
+        """
+        words = search_key(query).split()
+        if not words:
+            return None
+        
+        n_total = len(self._token_verse)
+        starts, scores = self._token_matches(words[0], mode, len(words) == 1)
+        for i, word in enumerate(words[1:], 1):
+            if len(starts) == 0:
+                break
+            positions, word_scores = self._token_matches(word, mode, i == len(words) - 1)
+            if len(positions) == 0:
+                starts, scores = starts[:0], scores[:0]
+                break
+            idx = np.searchsorted(positions, starts + i)
+            found = idx < len(positions)
+            found[found] = positions[idx[found]] == starts[found] + i
+            starts, scores = starts[found], scores[found] + word_scores[idx[found]]
+        
+        if len(words) > 1 and len(starts):
+            # İfade sure sınırını geçmez
+            ends = starts + len(words) - 1
+            valid = ends < n_total
+            valid[valid] = self._token_surah[ends[valid]] == self._token_surah[starts[valid]]
+            starts, scores = starts[valid], scores[valid]
+        scores = scores / len(words)
+        
+        order = np.lexsort((starts, -scores))[:limit]
+        return {
+            "query_norm": " ".join(words),
+            "total": int(len(starts)),
+            "hits": [self._hit(int(starts[i]), len(words), scores[i], mode) for i in order]
+        }
+
+_index: Optional[QuranSearchIndex] = None
+_build_lock = threading.Lock()
+
+def get_search_index() -> QuranSearchIndex:
+    """Arama indeksini döndürür (ilk çağrıda oluşturur; başlangıçta executor'da çağrılır)"""
+    global _index
+    if _index is None:
+        with _build_lock:
+            if _index is None:
+                from utils.quran_index import get_verses, get_corpus_words
+                corpus_words, offsets = get_corpus_words()
+                _index = QuranSearchIndex(get_verses(), corpus_words, offsets)
+    return _index
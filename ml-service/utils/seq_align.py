@@ -10,7 +10,8 @@ import numpy as np
 
 def align_words(
     rec_words: List[Dict], 
-    tgt_words: List[Dict]
+    tgt_words: List[Dict],
+    free_target_ends: bool = False
 ) -> List[Tuple[Optional[int], Optional[int]]]:
     """
     ASR kelimeleri ile hedef kelimeleri hizalar (DP alignment)
@@ -18,6 +19,10 @@ def align_words(
     Args:
         rec_words: [{w: str, start_ms: float, end_ms: float}] - ASR çıktısı
         tgt_words: [{w: str, ayah_idx: int}] - Hedef Kuran kelimeleri
+        free_target_ends: Hedefin başındaki ve sonundaki hizalanmayan kelimeler cezasız
+            (live: ASR geçmişi hedef pencerenin ortasında bir aralıktır). Kapalıyken sondaki
+            okunmamış kelimeler her yerde aynı maliyette silindiğinden son ASR kelimeleri
+            hedefte ileride tekrar eden aynı kelimeye kayabilir.
     
     Returns:
         pairs: List of tuples (i_rec or None, i_tgt or None)
@@ -44,9 +49,9 @@ def align_words(
     # Base case: boş stringler
     dp[0][0] = 0
     
-    # İlk satır: sadece deletions
+    # İlk satır: sadece deletions (free_target_ends: baştaki hedef kelimeler cezasız)
     for j in range(1, n_tgt + 1):
-        dp[0][j] = dp[0][j-1] + 1  # deletion cost = 1
+        dp[0][j] = 0 if free_target_ends else dp[0][j-1] + 1  # deletion cost = 1
         prev[0][j] = (0, j-1, 'del')
     
     # İlk sütun: sadece insertions
@@ -86,6 +91,11 @@ def align_words(
     pairs = []
     i, j = n_rec, n_tgt
     
+    if free_target_ends and n_rec > 0:
+        # En düşük maliyetli en erken bitiş; sonrası okunmamış (deletion)
+        j = int(np.argmin(dp[n_rec]))
+        pairs.extend((None, k) for k in range(n_tgt - 1, j - 1, -1))
+    
     while i > 0 or j > 0:
         if prev[i][j] is None:
             break
@@ -107,3 +117,68 @@ def align_words(
     
     return pairs
 
+def align_words_blockwise(
+    rec_words: List[Dict],
+    tgt_words: List[Dict],
+    block_size: int = 120,
+    lookahead: Optional[int] = None
+) -> List[Tuple[Optional[int], Optional[int]]]:
+    """
+    Uzun kayıtlar için blok bazında alignment (align_words ile aynı çıktı formatı)
+    
+    ASR kelimeleri block_size'lık bloklar halinde, hedefte son güvenilir eşleşmeden
+    sonraki lookahead kelimelik bölgeye hizalanır. Böylece sure ölçeğindeki bir hedefte
+    maliyet O(n_rec * lookahead) olur (tam DP: O(n_rec * n_tgt)).
+    
+    Args:
+        rec_words: ASR kelimeleri (zamana göre sıralı)
+        tgt_words: Hedef kelimeler
+        block_size: Blok başına ASR kelime sayısı
+        lookahead: Blok başına hedef bölge uzunluğu (default: 2 * block_size)
+    """
+    lookahead = lookahead or block_size * 2
+    n_rec = len(rec_words)
+    n_tgt = len(tgt_words)
+    
+    pairs = []
+    tgt_pos = 0
+    
+    for block_start in range(0, n_rec, block_size):
+        block = rec_words[block_start:block_start + block_size]
+        region = tgt_words[tgt_pos:tgt_pos + lookahead]
+        
+        if not region:
+            pairs.extend((block_start + i, None) for i in range(len(block)))
+            continue
+        
+        local_pairs = align_words(block, region)
+        
+        # Son güvenilir eşleşme (aynı veya çok benzer kelime) bir sonraki bloğun başlangıcı olur
+        anchor = None
+        for i_rec, i_tgt in local_pairs:
+            if i_rec is None or i_tgt is None:
+                continue
+            rec_w = normalize_ar(block[i_rec].get("w", ""))
+            tgt_w = normalize_ar(region[i_tgt].get("w", ""))
+            if rec_w == tgt_w or fuzz.ratio(rec_w, tgt_w) >= 85:
+                anchor = i_tgt
+        
+        consumed = anchor + 1 if anchor is not None else 0
+        
+        for i_rec, i_tgt in local_pairs:
+            if i_tgt is not None and i_tgt >= consumed:
+                # Tüketilmeyen hedef kelimeler sonraki blokta tekrar denenir
+                if i_rec is not None:
+                    pairs.append((block_start + i_rec, None))
+                continue
+            pairs.append((
+                block_start + i_rec if i_rec is not None else None,
+                tgt_pos + i_tgt if i_tgt is not None else None
+            ))
+        
+        tgt_pos += consumed
+    
+    # Kalan hedef kelimeler: deletion
+    pairs.extend((None, j) for j in range(tgt_pos, n_tgt))
+    
+    return pairs
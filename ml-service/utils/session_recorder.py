@@ -0,0 +1,199 @@
+"""
+Live oturum kaydı: gelen PCM ve her tick'in ASR kelimeleri / eşleşmesi / timeline'ı
+oturum başına tek, sadece sona eklenen (append-only) bir dosyaya yazılır
+
+Dosya formatı (.qlr):
+    MAGIC (4 byte) + kayıtlar
+    kayıt = tip (uint8) + uzunluk (uint32, little-endian) + gövde
+        REC_META: JSON (sample_rate, window_sec, target_ayahs, ... start config'i)
+        REC_PCM:  ham PCM16 mono (geldiği gibi)
+        REC_TICK: JSON (samples, window_samples, elapsed_ms, words, transcript, result, timing)
+
+Yarıda kalmış son kayıt (process çöktüyse) okurken atlanır. SessionReader dosyayı mmap ile
+açar; PCM pencereleri kopyalanmadan kayıtlardan dilimlenir (sadece istenen pencere kopyalanır).
+"""
+
+import json
+import mmap
+import os
+import struct
+import time
+import uuid
+from bisect import bisect_right
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"QLR1"
+REC_META = 1
+REC_PCM = 2
+REC_TICK = 3
+
+_HEADER = struct.Struct("<BI")
+
+def _json_default(value):
+    # numpy skalerleri (skorlar, ms değerleri)
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+def _dumps(record: Dict) -> bytes:
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=_json_default).encode("utf-8")
+
+class SessionRecorder:
+    """
+    Tek live oturumunu dosyaya yazar (event loop'tan çağrılır)
+    
+    PCM küçük parçalar halinde tamponlu yazılır; tick kayıtlarından sonra flush edilir,
+    böylece process çökse bile son tick'e kadar olan kısım replay edilebilir.
+    """
+    
+    def __init__(self, directory: str, meta: Dict, session_id: Optional[str] = None):
+        """
+        Args:
+            directory: Kayıt dizini (yoksa oluşturulur)
+            meta: Oturum ayarları (start mesajı + sunucu tarafı değerler)
+            session_id: Dosya adı (varsayılan: zaman + rastgele ek)
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.session_id = session_id or f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self.path = str(Path(directory) / f"{self.session_id}.qlr")
+        self._file = open(self.path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+        self.samples = 0
+        self.ticks = 0
+        self._write(REC_META, _dumps({**meta, "session_id": self.session_id, "started_at": time.time()}))
+    
+    def _write(self, record_type: int, payload: bytes) -> None:
+        self._file.write(_HEADER.pack(record_type, len(payload)))
+        self._file.write(payload)
+    
+    def write_pcm(self, pcm_bytes: bytes) -> None:
+        """Pipeline'a giren PCM16 (sıkıştırılmış stream'de çözülmüş hali)"""
+        if self._file is None or not pcm_bytes:
+            return
+        self._write(REC_PCM, bytes(pcm_bytes))
+        self.samples += len(pcm_bytes) // 2
+    
+    def write_tick(self, tick: Dict) -> None:
+        """Tick kaydı (samples: tick anındaki toplam sample sayısı)"""
+        if self._file is None:
+            return
+        self._write(REC_TICK, _dumps(tick))
+        self._file.flush()
+        self.ticks += 1
+    
+    def close(self) -> None:
+        if self._file is None:
+            return
+        try:
+            self._file.close()
+        except OSError as e:
+            logger.warning(f"Oturum kaydı kapatılamadı ({self.path}): {e}")
+        self._file = None
+        logger.info(f"✓ Oturum kaydedildi: {self.path} ({self.samples} sample, {self.ticks} tick)")
+
+class SessionReader:
+    """
+    Kayıtlı oturumu mmap ile okur
+    
+    Açılışta kayıtlar bir kez taranır (gövdeler okunmaz); tick JSON'ları iterasyon
+    sırasında parse edilir, PCM istenen aralık için dilimlenir.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size < len(MAGIC):
+            self._file.close()
+            raise ValueError(f"Geçersiz oturum kaydı: {path}")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"Geçersiz oturum kaydı: {path}")
+        
+        self.meta: Dict = {}
+        # PCM kayıtları: gövde offset'leri ve byte uzunlukları, stream içindeki başlangıç byte'ı
+        self._pcm_offsets: List[int] = []
+        self._pcm_lengths: List[int] = []
+        self._pcm_starts: List[int] = []
+        self._tick_spans: List[tuple] = []
+        self.pcm_bytes = 0
+        self._scan(size)
+    
+    def _scan(self, size: int) -> None:
+        pos = len(MAGIC)
+        while pos + _HEADER.size <= size:
+            record_type, length = _HEADER.unpack_from(self._mm, pos)
+            body = pos + _HEADER.size
+            if body + length > size:
+                logger.warning(f"Yarım kayıt atlandı ({self.path}, offset {pos})")
+                break
+            if record_type == REC_META:
+                self.meta = json.loads(self._mm[body:body + length])
+            elif record_type == REC_PCM:
+                self._pcm_offsets.append(body)
+                self._pcm_lengths.append(length)
+                self._pcm_starts.append(self.pcm_bytes)
+                self.pcm_bytes += length
+            elif record_type == REC_TICK:
+                self._tick_spans.append((body, length))
+            pos = body + length
+    
+    @property
+    def sample_rate(self) -> int:
+        return int(self.meta.get("sample_rate", 16000))
+    
+    @property
+    def samples(self) -> int:
+        return self.pcm_bytes // 2
+    
+    def __len__(self) -> int:
+        return len(self._tick_spans)
+    
+    def ticks(self) -> Iterator[Dict]:
+        """Tick kayıtları (yazıldıkları sırayla)"""
+        for body, length in self._tick_spans:
+            yield json.loads(self._mm[body:body + length])
+    
+    def pcm(self, start_sample: int, end_sample: int) -> np.ndarray:
+        """[start_sample, end_sample) aralığındaki PCM16 (kopya; mmap kapansa da geçerli)"""
+        start = max(0, start_sample) * 2
+        end = min(self.pcm_bytes, end_sample * 2)
+        if end <= start:
+            return np.zeros(0, dtype=np.int16)
+        
+        out = bytearray(end - start)
+        view = memoryview(self._mm)
+        try:
+            i = max(0, bisect_right(self._pcm_starts, start) - 1)
+            written = 0
+            while written < len(out) and i < len(self._pcm_starts):
+                chunk_start = self._pcm_starts[i]
+                lo = max(start, chunk_start) - chunk_start
+                hi = min(end, chunk_start + self._pcm_lengths[i]) - chunk_start
+                if hi > lo:
+                    offset = self._pcm_offsets[i]
+                    out[written:written + hi - lo] = view[offset + lo:offset + hi]
+                    written += hi - lo
+                i += 1
+        finally:
+            view.release()
+        return np.frombuffer(out, dtype=np.int16)
+    
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
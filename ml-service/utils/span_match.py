@@ -0,0 +1,139 @@
+"""
+Sure bazında sürekli metin üzerinde span eşleştirme
+
+match_verses transcript'i her ayetle ayrı ayrı karşılaştırır; 10 sn'lik pencere genelde bir
+ayetin sonunu ve sonrakinin başını içerdiğinden her ayetin partial_ratio skoru düşer.
+Burada her surenin normalize ayetleri tek metin olarak birleştirilir; transcript her sure
+metninde tek geçişte (partial_ratio_alignment) hizalanır ve en iyi span'in başladığı
+karakter, önceden hesaplanan karakter -> kelime haritasıyla (ayet, ayet içi kelime)
+konumuna çevrilir.
+"""
+
+import threading
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from rapidfuzz import fuzz
+from utils.quran_corpus import CorpusWords
+import logging
+
+logger = logging.getLogger(__name__)
+
+def span_key(text_norm: str) -> str:
+    """Karşılaştırma anahtarı (elif-i vasl sadeleştirilir; ASR ٱ üretmez)"""
+    return text_norm.replace("ٱ", "ا")
+
+class SurahSpanIndex:
+    """Sure metinleri ve karakter -> global kelime pozisyonu haritaları (salt okunur)"""
+    
+    def __init__(self, verses: Sequence, corpus_words: CorpusWords, verse_word_offsets: np.ndarray):
+        """
+        Args:
+            verses: get_verses()
+            corpus_words, verse_word_offsets: get_corpus_words()
+        """
+        self._verses = verses
+        self._corpus_words = corpus_words
+        # Global kelime pozisyonu -> ayet index'i
+        self._token_verse = corpus_words.verse
+        
+        self.surahs: List[int] = []
+        self._texts: List[str] = []
+        # Sure metnindeki her karakterin kelimesi (boşluk -> sonraki kelime)
+        self._char_words: List[np.ndarray] = []
+        
+        # Sure sınırları: kelimelerin sure numarasının değiştiği pozisyonlar
+        verse_surah = np.fromiter((v["surah"] for v in verses), dtype=np.int16, count=len(verses))
+        token_surah = verse_surah[self._token_verse]
+        bounds = [0, *(np.flatnonzero(np.diff(token_surah)) + 1).tolist(), len(corpus_words)] if len(corpus_words) else [0]
+        
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            surah_no = int(token_surah[start])
+            keys = [span_key(w) for w in corpus_words.texts(start, end)]
+            lengths = np.fromiter((len(k) + 1 for k in keys), dtype=np.int64, count=len(keys))
+            # Her kelime + ardından gelen boşluk; sondaki boşluk metinde yok
+            char_words = np.repeat(np.arange(start, end, dtype=np.int32), lengths)[:-1]
+            char_words[np.cumsum(lengths)[:-1] - 1] += 1
+            
+            self.surahs.append(surah_no)
+            self._texts.append(" ".join(keys))
+            self._char_words.append(char_words)
+        
+        logger.info(f"✓ Span indeksi hazır: {len(self.surahs)} sure, {sum(len(t) for t in self._texts)} karakter")
+    
+    def _position(self, surah_idx: int, char: int) -> int:
+        char_words = self._char_words[surah_idx]
+        return int(char_words[min(max(char, 0), len(char_words) - 1)])
+    
+    def _span(self, surah_idx: int, alignment, score: float) -> Dict:
+        start = self._position(surah_idx, alignment.dest_start)
+        # Span son karakteri (boşlukta bitiyorsa önceki kelime)
+        end = max(start, self._position(surah_idx, alignment.dest_end - 1))
+        if self._texts[surah_idx][min(alignment.dest_end - 1, len(self._texts[surah_idx]) - 1)] == " ":
+            end = max(start, end - 1)
+        
+        verse = self._verses[int(self._token_verse[start])]
+        end_word = self._corpus_words[end]
+        return {
+            "surah": verse["surah"],
+            "ayah": verse["ayah"],
+            "text_ar": verse["text_ar"],
+            "score": score,
+            "word_index": self._corpus_words[start]["ayah_local_index"],
+            "end_ayah": end_word["ayah_no"],
+            "end_word_index": end_word["ayah_local_index"]
+        }
+    
+    def match(self, transcript_norm: str, top_k: int = 1, surahs: Optional[List[int]] = None) -> List[Dict]:
+        """
+        Transcript'in en iyi eşleştiği span'ler (sure başına en iyi span)
+        
+        Args:
+            transcript_norm: Normalize edilmiş transcript
+            top_k: En iyi kaç sure
+            surahs: Sadece bu sureler (None = tümü)
+        
+        Returns:
+            match_verses formatı + span konumu:
+            [{"surah", "ayah", "text_ar", "score", "word_index", "end_ayah", "end_word_index"}, ...]
+            (ayah/word_index: span'in başladığı ayet ve ayet içi kelime). Eşit skorda Kuran sırası.
+        """
+        if not transcript_norm or not transcript_norm.strip():
+            return []
+        query = span_key(" ".join(transcript_norm.split()))
+        wanted = set(surahs) if surahs is not None else None
+        
+        found = []  # (skor, sure index'i, alignment)
+        cutoff = 0.0
+        for surah_idx, text in enumerate(self._texts):
+            if wanted is not None and self.surahs[surah_idx] not in wanted:
+                continue
+            # En iyi top_k'ya giremeyecek sureler erken elenir
+            alignment = fuzz.partial_ratio_alignment(query, text, score_cutoff=cutoff)
+            if alignment is None or alignment.score <= 0:
+                continue
+            found.append((alignment.score, surah_idx, alignment))
+            if len(found) >= top_k:
+                found.sort(key=lambda x: (-x[0], x[1]))
+                del found[top_k:]
+                cutoff = found[-1][0]
+        
+        found.sort(key=lambda x: (-x[0], x[1]))
+        return [self._span(surah_idx, alignment, score) for score, surah_idx, alignment in found[:top_k]]
+
+_index: Optional[SurahSpanIndex] = None
+_build_lock = threading.Lock()
+
+def get_span_index() -> SurahSpanIndex:
+    """Span indeksini döndürür (ilk çağrıda oluşturur)"""
+    global _index
+    if _index is None:
+        with _build_lock:
+            if _index is None:
+                from utils.quran_index import get_verses, get_corpus_words
+                corpus_words, offsets = get_corpus_words()
+                _index = SurahSpanIndex(get_verses(), corpus_words, offsets)
+    return _index
+
+def match_span(transcript_norm: str, top_k: int = 1, surahs: Optional[List[int]] = None) -> List[Dict]:
+    """SurahSpanIndex.match kısayolu (global indeks)"""
+    return get_span_index().match(transcript_norm, top_k, surahs)
@@ -0,0 +1,205 @@
+"""
+Hafif span tracing: istek/tick başına span listesi, Server-Timing header'ı ve
+eşiği aşan isteklerin döndürülen (rotating) JSONL log'u
+
+Aktif trace bir ContextVar'da tutulur; executor thread'lerine taşınmadığı için thread'de
+çalışan kod trace nesnesini dışarıdan alıp trace.record() çağırır.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class Trace:
+    """Tek istek veya live tick'in span'leri (başlangıca göre ms)"""
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.perf_counter()
+        self.wall_start = time.time()
+        self.spans: List[Dict] = []
+        self._lock = threading.Lock()
+    
+    def record(self, name: str, start: float, end: float, **attrs) -> None:
+        """perf_counter zamanlarıyla span ekler (thread-safe)"""
+        span = {
+            "name": name,
+            "start_ms": round((start - self.started) * 1000, 2),
+            "dur_ms": round((end - start) * 1000, 2),
+            **attrs
+        }
+        with self._lock:
+            self.spans.append(span)
+    
+    @contextmanager
+    def span(self, name: str, **attrs):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter(), **attrs)
+    
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self.started) * 1000, 2)
+    
+    def summary(self) -> Dict[str, Dict]:
+        """Span adına göre toplam süre ve sayı (ilk görülme sırasıyla)"""
+        with self._lock:
+            spans = list(self.spans)
+        result: Dict[str, Dict] = {}
+        for span in spans:
+            entry = result.setdefault(span["name"], {"ms": 0.0, "count": 0})
+            entry["ms"] = round(entry["ms"] + span["dur_ms"], 2)
+            entry["count"] += 1
+        return result
+    
+    def server_timing(self) -> str:
+        """Server-Timing header değeri (aynı isimli span'ler toplanır)"""
+        parts = []
+        for name, entry in self.summary().items():
+            part = f"{name};dur={entry['ms']}"
+            if entry["count"] > 1:
+                part += f';desc="{entry["count"]}x"'
+            parts.append(part)
+        parts.append(f"total;dur={self.elapsed_ms()}")
+        return ", ".join(parts)
+    
+    def to_record(self, **extra) -> Dict:
+        """Slow log kaydı: toplam süre + tüm span'ler"""
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            "ts": round(self.wall_start, 3),
+            "name": self.name,
+            "total_ms": self.elapsed_ms(),
+            **extra,
+            "summary": self.summary(),
+            "spans": spans
+        }
+
+current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+
+def record_span(name: str, start: float, end: float, **attrs) -> None:
+    """Aktif trace varsa span ekler"""
+    trace = current_trace.get()
+    if trace is not None:
+        trace.record(name, start, end, **attrs)
+
+@contextmanager
+def span(name: str, **attrs):
+    """with span("find_best_match"): ... (aktif trace yoksa sadece blok çalışır)"""
+    trace = current_trace.get()
+    if trace is None:
+        yield
+        return
+    with trace.span(name, **attrs):
+        yield
+
+@contextmanager
+def tracing(name: str):
+    """Yeni trace başlatır ve blok boyunca aktif yapar"""
+    trace = Trace(name)
+    token = current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        current_trace.reset(token)
+
+class SlowLog:
+    """Eşiği aşan trace'leri döndürülen JSONL dosyasına yazar"""
+    
+    def __init__(self, path: str, threshold_ms: float, max_bytes: int = 10 * 1024 * 1024, backups: int = 5):
+        """
+        Args:
+            path: JSONL dosyası (dizin yoksa oluşturulur)
+            threshold_ms: Bu süreden uzun trace'ler yazılır (0 = kapalı)
+            max_bytes: Dosya bu boyutu aşınca döndürülür (path.1, path.2, ...)
+            backups: Saklanacak eski dosya sayısı
+        """
+        self.path = path
+        self.threshold_ms = threshold_ms
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._logger: Optional[logging.Logger] = None
+        self._lock = threading.Lock()
+    
+    def _get_logger(self) -> logging.Logger:
+        with self._lock:
+            if self._logger is None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                handler = RotatingFileHandler(
+                    self.path, maxBytes=self.max_bytes, backupCount=self.backups, encoding="utf-8"
+                )
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                slow_logger = logging.getLogger(f"{__name__}.slow")
+                slow_logger.propagate = False
+                slow_logger.setLevel(logging.INFO)
+                slow_logger.addHandler(handler)
+                self._logger = slow_logger
+        return self._logger
+    
+    def maybe_write(self, trace: Trace, threshold_ms: Optional[float] = None, **extra) -> bool:
+        """Trace eşiği aştıysa kaydeder"""
+        threshold_ms = self.threshold_ms if threshold_ms is None else threshold_ms
+        if threshold_ms <= 0 or trace.elapsed_ms() < threshold_ms:
+            return False
+        try:
+            record = trace.to_record(**extra)
+            self._get_logger().info(json.dumps(record, ensure_ascii=False, default=str))
+            return True
+        except OSError as e:
+            logger.warning(f"Slow log yazılamadı: {e}")
+            return False
+
+class TracingMiddleware:
+    """
+    ASGI middleware: HTTP isteği başına trace açar, yanıta Server-Timing ekler,
+    yavaş istekleri SlowLog'a yazar
+    
+    Header yanıt başlarken yazılır; stream yanıtlarda o ana kadarki span'leri içerir,
+    slow log ise gövde tamamen gönderildikten sonra yazılır.
+    """
+    
+    def __init__(self, app, slow_log: Optional[SlowLog] = None, skip=("/metrics",)):
+        self.app = app
+        self.slow_log = slow_log
+        self.skip = set(skip)
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip:
+            await self.app(scope, receive, send)
+            return
+        
+        from utils.metrics import current_endpoint
+        
+        status = {"code": 500}
+        with tracing(f"{scope.get('method', '')} {scope['path']}") as trace:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    status["code"] = message["status"]
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", trace.server_timing().encode("latin-1")))
+                    message = {**message, "headers": headers}
+                await send(message)
+            
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                if self.slow_log is not None:
+                    self.slow_log.maybe_write(
+                        trace,
+                        kind="http",
+                        endpoint=current_endpoint.get(),
+                        method=scope.get("method"),
+                        path=scope["path"],
+                        query=scope.get("query_string", b"").decode("latin-1"),
+                        status=status["code"]
+                    )
@@ -2,20 +2,51 @@
 Tracking pipeline: ASR word timestamps + sequence alignment + ayet timeline
 """
 
-from typing import List, Dict, Optional
-from utils.quran_index import get_verses
+from typing import List, Dict, Optional, Callable, Sequence, Tuple, Union
+import numpy as np
+from rapidfuzz import fuzz
+from utils.quran_index import (
+    get_verses,
+    get_verse_index,
+    get_corpus_words,
+    get_corpus,
+    match_verses,
+    match_openings,
+    OPENING_WORDS
+)
 from utils.arabic_norm import normalize_ar
+from utils.quran_corpus import VerseRange, WordRange
+from utils.verse_retrieval import retrieve_verses
 from utils.seq_align import align_words
+from utils.budget import Deadline, budget_decode_options, STOP_CONFIDENT, STOP_ENOUGH_TEXT
 from faster_whisper import WhisperModel
 import logging
 
 logger = logging.getLogger(__name__)
 
+def _window_slice(start_idx: int, end_idx: int, start_word: int = 0) -> Tuple[Sequence, Sequence]:
+    """
+    Global ayet index aralığı için (tgt_words, ayahs) döndürür (kopyasız dilim)
+    
+    tgt_words kelime görünümleri (WordRange), ayahs ayet görünümleridir
+    (ayah["surah_no"], ayah["ayah_no"], ayah["text_ar"]).
+    start_word: İlk ayette hedefin başladığı kelime (öncesindeki kelimeler hizalanmaz)
+    """
+    verses = get_verses()
+    corpus_words, offsets = get_corpus_words()
+    start_word = max(0, min(start_word, offsets[start_idx + 1] - offsets[start_idx] - 1))
+    
+    ayahs = verses[start_idx:end_idx]
+    tgt_words = corpus_words[offsets[start_idx] + start_word:offsets[end_idx]]
+    
+    return tgt_words, ayahs
+
 def build_target_window(
     best_surah: int,
     best_ayah: int,
-    window_ayahs: int = 12
-) -> tuple[List[Dict], List[Dict]]:
+    window_ayahs: int = 12,
+    start_word: int = 0
+) -> Tuple[Sequence, Sequence]:
     """
     Başlangıç ayetinden itibaren N ayetlik pencere oluşturur
     
@@ -23,70 +54,230 @@ def build_target_window(
         best_surah: Başlangıç surah numarası
         best_ayah: Başlangıç ayah numarası
         window_ayahs: Kaç ayet alınacak
+        start_word: Başlangıç ayetinde okumanın başladığı kelime (match_span word_index'i)
     
     Returns:
         (tgt_words, ayahs):
-        - tgt_words: [{w: str, ayah_no: int, surah_no: int, ayah_local_index: int}]
-        - ayahs: [{surah_no: int, ayah_no: int, text_ar: str}]
+        - tgt_words: Kelime görünümleri ({w, ayah_no, surah_no, ayah_local_index} anahtarlarıyla okunur)
+        - ayahs: Ayet görünümleri ({surah_no, ayah_no, text_ar} anahtarlarıyla okunur)
     """
     verses = get_verses()
     
     if not verses:
         return [], []
     
-    # İlgili ayeti bul
-    start_idx = None
-    for idx, verse in enumerate(verses):
-        if verse["surah"] == best_surah and verse["ayah"] == best_ayah:
-            start_idx = idx
-            break
+    # İlgili ayeti bul (O(1) index)
+    start_idx = get_verse_index(best_surah, best_ayah)
     
     if start_idx is None:
         logger.warning(f"Ayet bulunamadı: Surah {best_surah}, Ayah {best_ayah}")
         return [], []
     
-    # N ayet al
-    window_verses = verses[start_idx:start_idx + window_ayahs]
+    # N ayet al (önceden hesaplanmış kelime dizisinden dilim)
+    end_idx = min(len(verses), start_idx + window_ayahs)
+    tgt_words, ayahs = _window_slice(start_idx, end_idx, start_word)
+    
+    logger.info(f"Target window: {len(ayahs)} ayet, {len(tgt_words)} kelime")
+    return tgt_words, ayahs
+
+class SlidingTargetWindow:
+    """
+    Live takip için kayan hedef pencere
+    
+    Okuyucu pencerenin sonuna yaklaştıkça pencere ileri kayar; böylece
+    ilk N ayetten sonra da global re-search gerekmeden takip sürer.
+    """
+    
+    def __init__(
+        self,
+        best_surah: int,
+        best_ayah: int,
+        window_ayahs: int = 12,
+        advance_margin: int = 3,
+        keep_behind: int = 2,
+        start_word: int = 0
+    ):
+        """
+        Args:
+            best_surah, best_ayah: Başlangıç ayeti
+            start_word: Başlangıç ayetinde okumanın başladığı kelime (sadece ilk pencere)
+            window_ayahs: Penceredeki ayet sayısı
+            advance_margin: Current ayet pencere sonuna bu kadar yaklaşınca kaydır
+            keep_behind: Kaydırmadan sonra current ayetin gerisinde tutulacak ayet sayısı
+        """
+        self.window_ayahs = max(1, window_ayahs)
+        self.advance_margin = max(1, min(advance_margin, self.window_ayahs - 1))
+        self.keep_behind = max(0, min(keep_behind, self.window_ayahs - 1))
+        
+        self.n_verses = len(get_verses())
+        start_idx = get_verse_index(best_surah, best_ayah)
+        self.start_idx = start_idx if start_idx is not None else 0
+        self.end_idx = min(self.n_verses, self.start_idx + self.window_ayahs)
+        self.valid = start_idx is not None
+        
+        self.tgt_words, self.ayahs = _window_slice(
+            self.start_idx, self.end_idx, start_word if self.valid else 0
+        )
     
-    # Ayet listesi
-    ayahs = [
-        {
-            "surah_no": v["surah"],
-            "ayah_no": v["ayah"],
-            "text_ar": v["text_ar"]
+    @property
+    def info(self) -> Dict:
+        """Pencere özeti (update mesajı için)"""
+        if not self.ayahs:
+            return {}
+        return {
+            "start_surah": self.ayahs[0]["surah_no"],
+            "start_ayah": self.ayahs[0]["ayah_no"],
+            "count": len(self.ayahs)
         }
-        for v in window_verses
-    ]
-    
-    # Kelimelere böl
-    tgt_words = []
-    for v in window_verses:
-        # Normalize et ve kelimelere böl
-        text_norm = normalize_ar(v["text_ar"])
-        words = [w.strip() for w in text_norm.split() if w.strip()]
+    
+    def maybe_advance(self, current_surah: int, current_ayah: int) -> Optional[Tuple[int, int]]:
+        """
+        Current ayet pencere sonuna yaklaştıysa pencereyi ileri kaydırır
         
-        # Her kelime için entry oluştur
-        for word_idx, word in enumerate(words):
-            tgt_words.append({
-                "w": word,
-                "ayah_no": v["ayah"],
-                "surah_no": v["surah"],
-                "ayah_local_index": word_idx
-            })
+        Returns:
+            None (kaydırma yok) veya (surah_no, ayah_no): pencereden düşen son ayet.
+            Çağıran taraf bu ayete kadar hizalanmış kelimeleri bırakmalıdır.
+        """
+        current_idx = get_verse_index(current_surah, current_ayah)
+        if current_idx is None or not (self.start_idx <= current_idx < self.end_idx):
+            return None
+        
+        # Pencere sonuna yeterince yaklaşılmadı veya Kuran'ın sonundayız
+        if current_idx < self.end_idx - self.advance_margin or self.end_idx >= self.n_verses:
+            return None
+        
+        new_start = current_idx - self.keep_behind
+        if new_start <= self.start_idx:
+            return None
+        
+        dropped = self.ayahs[new_start - self.start_idx - 1]
+        
+        self.start_idx = new_start
+        self.end_idx = min(self.n_verses, new_start + self.window_ayahs)
+        self.tgt_words, self.ayahs = _window_slice(self.start_idx, self.end_idx)
+        
+        logger.info(
+            f"Target window kaydırıldı: {self.ayahs[0]['surah_no']}:{self.ayahs[0]['ayah_no']} "
+            f"({len(self.ayahs)} ayet)"
+        )
+        return dropped["surah_no"], dropped["ayah_no"]
+
+def reanchor_search(
+    transcript_norm: str,
+    last_surah: int,
+    last_ayah: int,
+    before: int = 5,
+    after: int = 20,
+    min_score: float = 85
+) -> Tuple[Optional[Dict], Optional[str]]:
+    """
+    Zıplama sonrası kademeli yeniden konumlandırma
     
-    logger.info(f"Target window: {len(ayahs)} ayet, {len(tgt_words)} kelime")
-    return tgt_words, ayahs
+    Önce son doğrulanmış konumun çevresinde, sonra mevcut ve sonraki surede,
+    en son tüm Kuran'da arar. İlk kademede min_score geçilirse orada durur.
+    
+    Args:
+        transcript_norm: Son tanınan kelimelerden oluşan normalize metin
+        last_surah, last_ayah: Son doğrulanmış konum
+        before, after: Yakın çevre (ayet sayısı)
+        min_score: Bir kademenin kabul edilmesi için gereken skor
+    
+    Returns:
+        (match, tier): match_verses formatında en iyi eşleşme ve
+        "local" / "surah" / "global" kademe adı. Eşleşme yoksa (None, None).
+    """
+    if not transcript_norm or not transcript_norm.strip():
+        return None, None
+    
+    verses = get_verses()
+    
+    # 1. Yakın çevre (sonraki surenin başı da genelde bu aralığa girer)
+    center = get_verse_index(last_surah, last_ayah)
+    if center is not None:
+        lo = max(0, center - before)
+        hi = min(len(verses), center + after + 1)
+        matches = match_verses(transcript_norm, verses[lo:hi], top_k=1)
+        if matches and matches[0]["score"] >= min_score:
+            return matches[0], "local"
+    
+    # 2. Mevcut ve sonraki sure (ardışık aralık, kopyasız)
+    surah_verses = get_corpus().surah_range(last_surah, last_surah + 1)
+    matches = match_verses(transcript_norm, surah_verses, top_k=1)
+    if matches and matches[0]["score"] >= min_score:
+        return matches[0], "surah"
+    
+    # 3. Tüm Kuran (iki aşamalı: önce kelime örtüşen bloklar)
+    matches = retrieve_verses(transcript_norm, top_k=1)
+    if matches:
+        return matches[0], "global"
+    
+    return None, None
+
+def identify_start(
+    rec_words: List[Dict],
+    head_words: int = 40,
+    top_k: int = 5
+) -> Optional[Dict]:
+    """
+    Uzun bir kaydın başlangıç ayetini bulur
+    
+    Adaylar açılış indeksinden (ilk OPENING_WORDS kelime) ve match_verses'ten
+    toplanır; her aday, kaydın ilk head_words kelimesi ile o ayetten başlayan
+    aynı uzunluktaki hedef metin karşılaştırılarak doğrulanır. Böylece kısa
+    ayetlerin (örn. besmele) ve ortak açılışların yanlış eşleşmesi önlenir.
+    
+    Args:
+        rec_words: ASR kelimeleri ({w: normalize, ...}, zamana göre sıralı)
+        head_words: Doğrulamada kullanılan kelime sayısı
+        top_k: Kaynak başına aday sayısı
+    
+    Returns:
+        match_verses formatında en iyi eşleşme (score = bağlam skoru) veya None
+    """
+    head = [w["w"] for w in rec_words[:head_words]]
+    if not head:
+        return None
+    
+    candidates = match_openings(" ".join(head[:OPENING_WORDS]), top_k=top_k)
+    candidates += match_verses(" ".join(head[:16]), top_k=top_k)
+    
+    corpus_words, verse_word_offsets = get_corpus_words()
+    head_text = " ".join(head)
+    
+    best = None
+    seen = set()
+    for cand in candidates:
+        key = (cand["surah"], cand["ayah"])
+        if key in seen:
+            continue
+        seen.add(key)
+        
+        idx = get_verse_index(*key)
+        if idx is None:
+            continue
+        start = verse_word_offsets[idx]
+        tgt_text = " ".join(corpus_words[start:start + len(head)].texts())
+        score = fuzz.ratio(head_text, tgt_text)
+        
+        if best is None or score > best["score"]:
+            best = {**cand, "score": score}
+    
+    return best
 
 def asr_words_with_timestamps(
-    wav_path: str,
-    model: WhisperModel
+    wav_path: Union[str, np.ndarray],
+    model: WhisperModel,
+    deadline: Optional[Deadline] = None,
+    on_segment: Optional[Callable[[List[Dict], float], None]] = None
 ) -> List[Dict]:
     """
     ASR ile word-level timestamps çıkarır
     
     Args:
-        wav_path: WAV dosya yolu
+        wav_path: WAV dosya yolu (veya float32 16kHz mono ses)
         model: WhisperModel instance
+        deadline: Decode bütçesi; dolarsa segment döngüsü kesilir (kısmi sonuç)
+        on_segment: Her segmentten sonra (rec_words, decode edilen sn) ile çağrılır
     
     Returns:
         rec_words: [{w: str (norm), raw: str, start_ms: float, end_ms: float}]
@@ -96,9 +287,9 @@ def asr_words_with_timestamps(
     segments, info = model.transcribe(
         wav_path,
         language="ar",
-        beam_size=3,
         word_timestamps=True,
-        vad_filter=True
+        vad_filter=True,
+        **budget_decode_options(deadline, beam_size=3)
     )
     
     rec_words = []
@@ -118,24 +309,107 @@ def asr_words_with_timestamps(
                 "start_ms": word_info.start * 1000,  # saniye -> ms
                 "end_ms": word_info.end * 1000
             })
+        
+        if on_segment is not None:
+            on_segment(rec_words, segment.end)
+        
+        # Decode edilmiş segment korunur, sonraki segmentler atlanır
+        if deadline is not None and deadline.stop_reason():
+            logger.info(f"ASR kesildi: {deadline.stop_reason()}")
+            break
     
     logger.info(f"✓ {len(rec_words)} kelime timestamp ile çıkarıldı")
     return rec_words
 
+def transcribe_text(
+    model: WhisperModel,
+    audio: Union[str, np.ndarray],
+    beam_size: int,
+    deadline: Optional[Deadline] = None,
+    enough_words: Optional[int] = None,
+    on_segment: Optional[Callable[[str, Optional[float]], bool]] = None
+) -> Tuple[str, Optional[float], Optional[str]]:
+    """
+    Word timestamps olmadan transcript çıkarır
+    
+    Args:
+        audio: WAV dosya yolu veya float32 16kHz mono ses
+        deadline: Decode bütçesi (fallback/beam sınırı ve segment döngüsünü kesme)
+        enough_words: Bu kadar kelimeye ulaşınca decode durdurulur
+        on_segment: Her segmentten sonra (birikmiş transcript, avg_logprob) ile çağrılır;
+            True dönerse decode durdurulur
+    
+    Returns:
+        (transcript_ar, avg_logprob, stop_reason):
+        - avg_logprob: segment uzunluğuyla ağırlıklı ortalama
+        - stop_reason: None (tamamı decode edildi), "deadline", "cancelled",
+          "enough_text" veya "confident"
+    """
+    segments, info = model.transcribe(
+        audio,
+        language="ar",
+        vad_filter=True,
+        **budget_decode_options(deadline, beam_size)
+    )
+    
+    transcript_parts = []
+    logprob_sum = 0.0
+    duration_sum = 0.0
+    n_words = 0
+    stop_reason = None
+    for segment in segments:
+        transcript_parts.append(segment.text.strip())
+        n_words += len(segment.text.split())
+        duration = max(segment.end - segment.start, 0.01)
+        logprob_sum += segment.avg_logprob * duration
+        duration_sum += duration
+        
+        if on_segment is not None and on_segment(" ".join(transcript_parts), logprob_sum / duration_sum):
+            stop_reason = STOP_CONFIDENT
+            break
+        
+        # Sonraki segmenti decode etmeden önce bütçeyi kontrol et
+        if deadline is not None and deadline.stop_reason():
+            stop_reason = deadline.stop_reason()
+            break
+        if enough_words and n_words >= enough_words:
+            stop_reason = STOP_ENOUGH_TEXT
+            break
+    
+    avg_logprob = logprob_sum / duration_sum if duration_sum > 0 else None
+    return " ".join(transcript_parts), avg_logprob, stop_reason
+
+# Eşleşmesiz ayetlere komşu yoksa verilen varsayılan süre (ms)
+DEFAULT_AYAH_MS = 1000
+
+def _ms(value: float):
+    """Timeline zaman değeri (tam sayıysa int, değilse 1 ondalık)"""
+    value = float(value)
+    return int(value) if value.is_integer() else round(value, 1)
+
 def build_ayah_timeline(
     pairs: List[tuple],
     rec_words: List[Dict],
     tgt_words: List[Dict],
-    ayahs: List[Dict]
+    ayahs: Sequence,
+    word_confidence: bool = False
 ) -> List[Dict]:
     """
-    Alignment'dan ayet bazında timeline oluşturur
+    Alignment'dan ayet bazında timeline oluşturur (vektörel, O(n))
+    
+    - Eşleşen kelimeler ayet index'ine göre gruplanır; ayet aralığı grup min/max'ı (reduceat)
+    - Eşleşen ayetlerin aralıkları sırayla monotonik ve örtüşmesiz yapılır: her ayet
+      öncekinin bitişinden önce başlayamaz
+    - Eşleşmesiz ayetler tek ileri/geri geçişte bulunan komşu eşleşmelerden doldurulur:
+      iki komşu varsa aradaki boşluk eşit bölünür, tek komşu varsa DEFAULT_AYAH_MS'lik
+      ardışık aralıklar verilir
     
     Args:
         pairs: align_words çıktısı
         rec_words: ASR kelimeleri
         tgt_words: Hedef kelimeler
         ayahs: Ayet listesi
+        word_confidence: Ayet başına kelime bazında hizalama güveni de döndürülsün mü
     
     Returns:
         timeline: [
@@ -145,112 +419,136 @@ def build_ayah_timeline(
                 text_ar: str,
                 start_ms: float,
                 end_ms: float,
-                matched_ratio: float
+                matched_ratio: float,
+                # word_confidence=True ise:
+                confidence: float,  # ayet kelimeleri üzerinden ortalama (eşleşmeyen = 0)
+                words: [{word_index, start_ms, end_ms, confidence}]  # eşleşen kelimeler
             }
         ]
     """
-    # Her ayet için timestamp'leri topla
-    ayah_timestamps = {}  # (surah, ayah) -> [start_ms, end_ms, ...]
-    ayah_word_counts = {}  # (surah, ayah) -> total_words, matched_words
-    
-    for ayah in ayahs:
-        key = (ayah["surah_no"], ayah["ayah_no"])
-        ayah_timestamps[key] = []
-        ayah_word_counts[key] = {"total": 0, "matched": 0}
-    
-    # Tgt words'den ayet bazında kelime sayısı
-    for tgt_w in tgt_words:
-        key = (tgt_w["surah_no"], tgt_w["ayah_no"])
-        ayah_word_counts[key]["total"] += 1
-    
-    # Pairs üzerinden geç, eşleşmeleri bul
-    for i_rec, i_tgt in pairs:
-        if i_tgt is not None and i_rec is not None:
-            # Eşleşme var
-            tgt_w = tgt_words[i_tgt]
-            rec_w = rec_words[i_rec]
-            
-            key = (tgt_w["surah_no"], tgt_w["ayah_no"])
-            ayah_timestamps[key].append(rec_w["start_ms"])
-            ayah_timestamps[key].append(rec_w["end_ms"])
-            ayah_word_counts[key]["matched"] += 1
+    n = len(ayahs)
+    if n == 0:
+        return []
     
-    # Timeline oluştur
-    timeline = []
+    # Hedef kelime -> ayet pozisyonu (korpus dilimlerinde ayet sütunundan, vektörel)
+    if isinstance(tgt_words, WordRange) and isinstance(ayahs, VerseRange):
+        tgt_ayah = tgt_words.verses().astype(np.int64) - ayahs.start
+    else:
+        ayah_pos = {(ayah["surah_no"], ayah["ayah_no"]): i for i, ayah in enumerate(ayahs)}
+        tgt_ayah = np.fromiter(
+            (ayah_pos[(w["surah_no"], w["ayah_no"])] for w in tgt_words),
+            dtype=np.int64,
+            count=len(tgt_words)
+        )
+    totals = np.bincount(tgt_ayah, minlength=n)
     
-    for ayah in ayahs:
-        key = (ayah["surah_no"], ayah["ayah_no"])
-        timestamps = ayah_timestamps[key]
-        word_count = ayah_word_counts[key]
+    # Eşleşmeler (insertion / deletion hariç)
+    matched = np.asarray(
+        [(i_rec, i_tgt) for i_rec, i_tgt in pairs if i_rec is not None and i_tgt is not None],
+        dtype=np.int64
+    ).reshape(-1, 2)
+    rec_idx, tgt_idx = matched[:, 0], matched[:, 1]
+    word_start = np.fromiter((rec_words[i]["start_ms"] for i in rec_idx), dtype=np.float64, count=len(rec_idx))
+    word_end = np.fromiter((rec_words[i]["end_ms"] for i in rec_idx), dtype=np.float64, count=len(rec_idx))
+    word_ayah = tgt_ayah[tgt_idx]
+    counts = np.bincount(word_ayah, minlength=n)
+    has = counts > 0
+    
+    # Ayet bazında gruplama: min(start, end) / max(start, end)
+    start = np.full(n, np.nan)
+    end = np.full(n, np.nan)
+    if len(word_ayah):
+        order = np.argsort(word_ayah, kind="stable")
+        group_starts = (np.cumsum(counts) - counts)[has]
+        start[has] = np.minimum.reduceat(np.minimum(word_start, word_end)[order], group_starts)
+        end[has] = np.maximum.reduceat(np.maximum(word_start, word_end)[order], group_starts)
         
-        if timestamps:
-            start_ms = min(timestamps)
-            end_ms = max(timestamps)
-        else:
-            # Eşleşme yok, komşu ayetlerden interpolasyon
-            start_ms = None
-            end_ms = None
+        # Monotonik, örtüşmesiz: bitişler kümülatif max, başlangıç önceki bitişten önce olamaz
+        known = np.flatnonzero(has)
+        ends = np.maximum.accumulate(end[known])
+        start[known] = np.maximum(start[known], np.concatenate(([-np.inf], ends[:-1])))
+        end[known] = ends
+    
+    # Boşluk doldurma: her ayet için önceki / sonraki eşleşen ayet (tek ileri ve geri geçiş)
+    idx = np.arange(n)
+    prev_known = np.maximum.accumulate(np.where(has, idx, -1))
+    next_known = np.minimum.accumulate(np.where(has, idx, n)[::-1])[::-1]
+    empty = ~has
+    if empty.any():
+        p = prev_known[empty]
+        q = next_known[empty]
+        i = idx[empty]
+        has_prev = p >= 0
+        has_next = q < n
+        prev_end = np.where(has_prev, end[np.maximum(p, 0)], 0.0)
+        next_start = np.where(has_next, start[np.minimum(q, n - 1)], 0.0)
         
-        matched_ratio = (
-            word_count["matched"] / word_count["total"]
-            if word_count["total"] > 0
-            else 0.0
-        )
+        # İki komşu: boşluk eşit bölünür (k = boşluktaki ayet sayısı, j = sıradaki yer)
+        k = q - p - 1
+        j = i - p
+        step = (next_start - prev_end) / np.maximum(k, 1)
+        fill_start = prev_end + (j - 1) * step
+        fill_end = prev_end + j * step
+        
+        # Sadece önceki: önceki bitişten itibaren ardışık varsayılan aralıklar
+        only_prev = has_prev & ~has_next
+        fill_start = np.where(only_prev, prev_end + (j - 1) * DEFAULT_AYAH_MS, fill_start)
+        fill_end = np.where(only_prev, prev_end + j * DEFAULT_AYAH_MS, fill_end)
+        
+        # Sadece sonraki: sonraki başlangıçtan geriye doğru (0'ın altına inmez)
+        only_next = ~has_prev & has_next
+        back = q - i
+        fill_start = np.where(only_next, np.maximum(0, next_start - back * DEFAULT_AYAH_MS), fill_start)
+        fill_end = np.where(only_next, np.maximum(0, next_start - (back - 1) * DEFAULT_AYAH_MS), fill_end)
+        
+        # Hiç eşleşme yok: baştan ardışık varsayılan aralıklar
+        none = ~has_prev & ~has_next
+        fill_start = np.where(none, i * DEFAULT_AYAH_MS, fill_start)
+        fill_end = np.where(none, (i + 1) * DEFAULT_AYAH_MS, fill_end)
         
-        timeline.append({
+        start[empty] = fill_start
+        end[empty] = fill_end
+    
+    matched_ratio = np.divide(counts, totals, out=np.zeros(n), where=totals > 0)
+    
+    words_by_ayah = None
+    if word_confidence:
+        # Kelime güveni: ASR kelimesi ile hedef kelimenin benzerliği (0-1; "w" ikisinde de normalize)
+        scores = np.fromiter(
+            (
+                fuzz.ratio(rec_words[r]["w"], tgt_words[t]["w"]) / 100
+                for r, t in zip(rec_idx.tolist(), tgt_idx.tolist())
+            ),
+            dtype=np.float64,
+            count=len(rec_idx)
+        )
+        confidence = np.divide(
+            np.bincount(word_ayah, weights=scores, minlength=n), totals,
+            out=np.zeros(n), where=totals > 0
+        )
+        words_by_ayah = [[] for _ in range(n)]
+        for k_word in np.argsort(tgt_idx, kind="stable").tolist():
+            t = int(tgt_idx[k_word])
+            words_by_ayah[int(word_ayah[k_word])].append({
+                "word_index": tgt_words[t]["ayah_local_index"],
+                "start_ms": _ms(word_start[k_word]),
+                "end_ms": _ms(word_end[k_word]),
+                "confidence": round(float(scores[k_word]), 2)
+            })
+    
+    timeline = []
+    for i, ayah in enumerate(ayahs):
+        entry = {
             "surah_no": ayah["surah_no"],
             "ayah_no": ayah["ayah_no"],
             "text_ar": ayah["text_ar"],
-            "start_ms": start_ms,
-            "end_ms": end_ms,
-            "matched_ratio": round(matched_ratio, 2)
-        })
-    
-    # Interpolasyon: boş timestamp'leri doldur
-    for i in range(len(timeline)):
-        if timeline[i]["start_ms"] is None:
-            # Önceki ve sonraki ayetlerden interpolasyon
-            prev_end = None
-            next_start = None
-            
-            # Önceki ayet
-            for j in range(i - 1, -1, -1):
-                if timeline[j]["end_ms"] is not None:
-                    prev_end = timeline[j]["end_ms"]
-                    break
-            
-            # Sonraki ayet
-            for j in range(i + 1, len(timeline)):
-                if timeline[j]["start_ms"] is not None:
-                    next_start = timeline[j]["start_ms"]
-                    break
-            
-            # Interpolasyon
-            if prev_end is not None and next_start is not None:
-                # Eşit aralıklarla dağıt
-                gap = next_start - prev_end
-                n_empty = 1
-                for k in range(i + 1, len(timeline)):
-                    if timeline[k]["start_ms"] is None:
-                        n_empty += 1
-                    else:
-                        break
-                
-                step = gap / (n_empty + 1)
-                timeline[i]["start_ms"] = prev_end + step
-                timeline[i]["end_ms"] = prev_end + step * 2
-            elif prev_end is not None:
-                # Sadece önceki var, sonrakiye kadar uzat
-                timeline[i]["start_ms"] = prev_end
-                timeline[i]["end_ms"] = prev_end + 1000  # 1 saniye varsayılan
-            elif next_start is not None:
-                # Sadece sonraki var, öncekinden başlat
-                timeline[i]["start_ms"] = max(0, next_start - 1000)
-                timeline[i]["end_ms"] = next_start
-            else:
-                # Hiçbiri yok, varsayılan
-                timeline[i]["start_ms"] = 0
-                timeline[i]["end_ms"] = 1000
+            "start_ms": _ms(start[i]),
+            "end_ms": _ms(end[i]),
+            "matched_ratio": round(float(matched_ratio[i]), 2)
+        }
+        if words_by_ayah is not None:
+            entry["confidence"] = round(float(confidence[i]), 2)
+            entry["words"] = words_by_ayah[i]
+        timeline.append(entry)
     
     return timeline
-
@@ -0,0 +1,202 @@
+"""
+İki aşamalı (coarse-to-fine) ayet eşleştirme
+
+match_verses transcript'i 6236 ayetin hepsiyle partial_ratio ile karşılaştırır; kelime
+dağarcığı hiç örtüşmeyen surelerde de aynı iş yapılır. Burada:
+
+1. Kaba aşama: Her sure sabit boyutlu (yarı örtüşen) ayet bloklarına bölünür; her bloğun
+   kelime tipi kümesi önceden hesaplanır (tip -> blok listesi, CSR). Transcript'in kelime
+   tipleri üzerinden blok skoru = ortak tiplerin idf toplamı (tek bincount).
+2. İnce aşama: En iyi top_blocks bloğun ayetleri ve kısa ayetler match_verses ile skorlanır.
+
+Tam taramanın top-5'indeki kaçan ayetler çoğunlukla kısa ayetlerdir (≤ ~30 harf): partial_ratio
+bunları transcript'in bir parçasıyla harf düzeyinde eşleştirir, ortak kelime tipi gerekmez.
+Marj (cascade / erken çıkış kararları) bu ikinci adaydan hesaplandığı için kısa ayetler
+(~1600) her zaman ince aşamaya girer. Kısa transcript'lerde (≤ MIN_QUERY_CHARS) uzun ayetler de
+aynı şekilde eşleşir ve kelime kanıtı zayıftır; bunlar ve sözlükte hiç kelimesi olmayan
+transcript'ler tam taramaya düşer. scripts/bench_retrieval.py (5-20 kelime, %20 gürültü):
+top-1 0.997, recall@5 ~0.95, güven kararı uyuşması ≥0.997; ortalama ~4x daha az skorlama.
+top_blocks=0 tam taramadır.
+"""
+
+import os
+import threading
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from utils.quran_corpus import CorpusWords, VerseRange
+from utils.quran_index import get_verses, match_verses
+from utils.span_match import span_key
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Blok boyutu (ayet) ve ince aşamaya giren blok sayısı (0 = tam tarama)
+BLOCK_AYAHS = int(os.environ.get("RETRIEVAL_BLOCK_AYAHS", "16"))
+TOP_BLOCKS = int(os.environ.get("RETRIEVAL_TOP_BLOCKS", "12"))
+# Her zaman skorlanan kısa ayetler ve tam taramaya düşen kısa transcript'ler (harf)
+SHORT_VERSE_CHARS = int(os.environ.get("RETRIEVAL_SHORT_VERSE_CHARS", "30"))
+MIN_QUERY_CHARS = int(os.environ.get("RETRIEVAL_MIN_QUERY_CHARS", "40"))
+
+class BlockRetriever:
+    """Ayet blokları ve kelime tipi -> blok indeksi (bir kez oluşturulur, salt okunur)"""
+    
+    def __init__(
+        self,
+        verses: Sequence,
+        corpus_words: CorpusWords,
+        verse_word_offsets: np.ndarray,
+        block_ayahs: int = BLOCK_AYAHS,
+        short_verse_chars: int = SHORT_VERSE_CHARS,
+        min_query_chars: int = MIN_QUERY_CHARS
+    ):
+        """
+        Args:
+            verses: get_verses()
+            corpus_words, verse_word_offsets: get_corpus_words()
+            block_ayahs: Blok boyutu; bloklar yarı örtüşür (adım = block_ayahs // 2)
+            short_verse_chars: Bu uzunluğa kadar (normalize) ayetler her zaman ince aşamaya girer
+            min_query_chars: Bu uzunluğa kadar transcript'lerde tam tarama yapılır
+        """
+        self._verses = verses
+        self.block_ayahs = max(1, block_ayahs)
+        self.min_query_chars = min_query_chars
+        norms = verses.norms() if isinstance(verses, VerseRange) else [verse["norm"] for verse in verses]
+        self._short_verses = np.fromiter(
+            (len(norm) <= short_verse_chars for norm in norms), dtype=bool, count=len(norms)
+        )
+        offsets = np.asarray(verse_word_offsets, dtype=np.int64)
+        
+        keys = [span_key(word) for word in corpus_words.texts()]
+        self._type_ids: Dict[str, int] = {}
+        token_types = np.fromiter(
+            (self._type_ids.setdefault(k, len(self._type_ids)) for k in keys),
+            dtype=np.int32,
+            count=len(keys)
+        )
+        
+        # Sure içinde kalan bloklar: [start, end) global ayet index'leri
+        step = max(1, self.block_ayahs // 2)
+        starts, ends = [], []
+        surah_start = 0
+        for i in range(1, len(verses) + 1):
+            if i < len(verses) and verses[i]["surah"] == verses[surah_start]["surah"]:
+                continue
+            for block_start in range(surah_start, i, step):
+                block_end = min(i, block_start + self.block_ayahs)
+                starts.append(block_start)
+                ends.append(block_end)
+                if block_end == i:
+                    break
+            surah_start = i
+        self._block_starts = np.asarray(starts, dtype=np.int32)
+        self._block_ends = np.asarray(ends, dtype=np.int32)
+        
+        # Blok başına tekil tipler -> tip sırasına göre CSR (tip i'nin blokları)
+        block_types = [
+            np.unique(token_types[offsets[start]:offsets[end]])
+            for start, end in zip(starts, ends)
+        ]
+        all_types = np.concatenate(block_types)
+        all_blocks = np.repeat(
+            np.arange(len(starts), dtype=np.int32), [len(t) for t in block_types]
+        )
+        order = np.argsort(all_types, kind="stable")
+        self._postings = all_blocks[order]
+        self._type_starts = np.searchsorted(
+            all_types[order], np.arange(len(self._type_ids) + 1)
+        ).astype(np.int64)
+        
+        df = np.diff(self._type_starts)
+        self._idf = np.log1p(len(starts) / np.maximum(df, 1))
+        
+        logger.info(
+            f"✓ Blok indeksi hazır: {len(starts)} blok ({self.block_ayahs} ayet), {len(self._type_ids)} tip, "
+            f"{int(self._short_verses.sum())} kısa ayet"
+        )
+    
+    @property
+    def n_blocks(self) -> int:
+        return len(self._block_starts)
+    
+    def block_scores(self, transcript_norm: str) -> Optional[np.ndarray]:
+        """Blok skorları (ortak kelime tiplerinin idf toplamı); bilinen kelime yoksa None"""
+        type_ids = {
+            self._type_ids[k] for k in (span_key(w) for w in transcript_norm.split())
+            if k in self._type_ids
+        }
+        if not type_ids:
+            return None
+        
+        blocks = [self._postings[self._type_starts[t]:self._type_starts[t + 1]] for t in type_ids]
+        weights = [np.full(len(b), self._idf[t]) for b, t in zip(blocks, type_ids)]
+        return np.bincount(
+            np.concatenate(blocks), weights=np.concatenate(weights), minlength=self.n_blocks
+        )
+    
+    def candidate_verses(self, transcript_norm: str, top_blocks: int = TOP_BLOCKS) -> Optional[np.ndarray]:
+        """
+        İnce aşamaya girecek ayetlerin global index'leri (artan)
+        
+        Returns:
+            None: top_blocks <= 0, kısa transcript, bilinen kelime yok veya bloklar zaten tüm
+            ayetleri kapsıyor
+        """
+        if top_blocks <= 0 or top_blocks >= self.n_blocks:
+            return None
+        if len(transcript_norm.strip()) <= self.min_query_chars:
+            return None
+        scores = self.block_scores(transcript_norm)
+        if scores is None:
+            return None
+        
+        top = np.argpartition(-scores, top_blocks - 1)[:top_blocks]
+        top = top[scores[top] > 0]
+        if len(top) == 0:
+            return None
+        
+        mask = self._short_verses.copy()
+        for block in top:
+            mask[self._block_starts[block]:self._block_ends[block]] = True
+        return np.flatnonzero(mask)
+    
+    def match(self, transcript_norm: str, top_k: int = 3, top_blocks: int = TOP_BLOCKS) -> List[Dict]:
+        """
+        match_verses ile aynı format; sadece aday bloklardaki ve kısa ayetler skorlanır
+        
+        Eşit skorlar match_verses'teki gibi Kuran sırasıyla döner.
+        """
+        if not transcript_norm or not transcript_norm.strip():
+            return []
+        candidates = self.candidate_verses(transcript_norm, top_blocks)
+        if candidates is None:
+            return match_verses(transcript_norm, self._verses, top_k=top_k)
+        return match_verses(transcript_norm, [self._verses[i] for i in candidates], top_k=top_k)
+
+_retriever: Optional[BlockRetriever] = None
+_build_lock = threading.Lock()
+
+def get_block_retriever() -> BlockRetriever:
+    """Blok indeksini döndürür (ilk çağrıda oluşturur; başlangıçta executor'da çağrılır)"""
+    global _retriever
+    if _retriever is None:
+        with _build_lock:
+            if _retriever is None:
+                from utils.quran_index import get_verses, get_corpus_words
+                corpus_words, offsets = get_corpus_words()
+                _retriever = BlockRetriever(get_verses(), corpus_words, offsets)
+    return _retriever
+
+def retrieve_verses(transcript_norm: str, top_k: int = 3, top_blocks: Optional[int] = None) -> List[Dict]:
+    """
+    Tüm Kuran'da iki aşamalı eşleştirme (match_verses(transcript, get_verses()) yerine)
+    
+    Args:
+        top_blocks: İnce aşamadaki blok sayısı (None = RETRIEVAL_TOP_BLOCKS, 0 = tam tarama)
+    """
+    top_blocks = TOP_BLOCKS if top_blocks is None else top_blocks
+    if top_blocks <= 0:
+        # Tam tarama: blok indeksi gerekmez
+        if not transcript_norm or not transcript_norm.strip():
+            return []
+        return match_verses(transcript_norm, get_verses(), top_k=top_k)
+    return get_block_retriever().match(transcript_norm, top_k, top_blocks)